@@ -17,102 +17,186 @@ import network
 import powerflow
 import fault
 import dynamic
+from database import Case
 
 class PSAT():
     def __init__(self):
+        self.case = Case()  # Every simulator holds its own case, activated during each method call
         return
     
-    def load_simulation_data(self, file, par_type):
+    def load_simulation_data(self, file, par_type, use_cache=True):
         '''
         Load basic raw, seq, dyr data for simulation.
         Args:
             (1) file, str, file path.
             (2) par_type, file type, 'powerflow' for .raw data, 'sequence' for .seq data, 'dynamic' for .dyr data.
+            (3) use_cache, bool, reuse the binary cache file.cache.npz saved next to the file while the file is unchanged.
         Rets: None    
         '''    
-        data_imexporter.load_simulation_data(file, par_type)
+        with self.case:
+            data_imexporter.load_simulation_data(file, par_type, use_cache)
+        return
+
+    def snapshot(self):
+        '''
+        Take a snapshot of the case, including device data, bus renumbering, Y matrixes, power flow solution and dynamic states.
+        Args: None
+        Rets:
+            token, snapshot token used by restore.
+        '''
+        token = self.case.copy()
+        return token
+        
+    def restore(self, token):
+        '''
+        Restore the case to a snapshot. A token can be restored many times.
+        Args:
+            token, snapshot token returned by snapshot.
+        Rets: None
+        '''
+        self.case = token.copy()
         return
 
     def get_simulator_parameter(self, par_type, par_name):
-        value = apis.get_simulator_parameter(par_type, par_name)
+        with self.case:
+            value = apis.get_simulator_parameter(par_type, par_name)
         return value
         
     def set_simulator_parameter(self, par_type, par_name, value):
-        apis.set_simulator_parameter(par_type, par_name, value)
+        with self.case:
+            apis.set_simulator_parameter(par_type, par_name, value)
         return
         
     def get_all_devices(self, device):
-        devices = apis.get_all_devices(device)
+        with self.case:
+            devices = apis.get_all_devices(device)
         return devices
     
     def get_device_data(self, device_index, device, par_name):
-        value = apis.get_device_data(device_index, device, par_name)
+        with self.case:
+            value = apis.get_device_data(device_index, device, par_name)
+        return value
+    
+    def get_device_data_array(self, device, par_name, device_index=None):
+        with self.case:
+            value = apis.get_device_data_array(device, par_name, device_index)
         return value
     
     def get_device_sequence_data(self, device_index, device, par_name):
-        value = apis.get_device_sequence_data(device_index, device, par_name)
+        with self.case:
+            value = apis.get_device_sequence_data(device_index, device, par_name)
         return value
         
     def set_device_data(self, device_index, device, par_name, value):
-        apis.set_device_data(device_index, device, par_name, value)
+        with self.case:
+            apis.set_device_data(device_index, device, par_name, value)
+        return
+    
+    def set_device_data_array(self, device, par_name, value, device_index=None):
+        with self.case:
+            apis.set_device_data_array(device, par_name, value, device_index)
         return
     
     def set_device_sequence_data(self, device_index, device, par_name, value):
-        apis.set_device_sequence_data(device_index, device, par_name, value)
+        with self.case:
+            apis.set_device_sequence_data(device_index, device, par_name, value)
         return
         
     def build_network_Y_matrix(self, par_type):      
-        network.build_network_Y_matrix(par_type)
+        with self.case:
+            network.build_network_Y_matrix(par_type)
         return
         
     def save_network_Y_matrix(self, file, par_type):
-        network.save_network_Y_matrix(file, par_type)
+        with self.case:
+            network.save_network_Y_matrix(file, par_type)
         return
         
-    def solve_powerflow(self, method):
-        powerflow.solve_powerflow(method)
+    def solve_powerflow(self, method, start='flat'):
+        with self.case:
+            powerflow.solve_powerflow(method, start)
         return
         
     def save_powerflow_result(self, file):
-        powerflow.save_powerflow_result(file)
+        with self.case:
+            powerflow.save_powerflow_result(file)
         return
+        
+    def get_powerflow_injection(self):
+        with self.case:
+            injection = powerflow.get_powerflow_injection()
+        return injection
+        
+    def solve_powerflow_batch(self, injections, method='NR', start='previous'):
+        with self.case:
+            result = powerflow.solve_powerflow_batch(injections, method, start)
+        return result
+        
+    def solve_contingency_analysis(self, outages=None, processes=1):
+        with self.case:
+            result_data = powerflow.solve_contingency_analysis(outages, processes)
+        return result_data
+        
+    def save_contingency_result(self, file, result_data):
+        powerflow.save_contingency_result(file, result_data)
+        return
+        
+    def calculate_ptdf(self, branches=None, file=None):
+        with self.case:
+            ptdf, branches = powerflow.calculate_ptdf(branches, file)
+        return ptdf, branches
+        
+    def calculate_lodf(self, branches=None, outages=None, file=None):
+        with self.case:
+            lodf, branches, outages = powerflow.calculate_lodf(branches, outages, file)
+        return lodf, branches, outages
     
     def solve_bus_asymmetry_fault(self, bus, par_type, Zf):
-        fault.solve_bus_asymmetry_fault(bus, par_type, Zf)
+        with self.case:
+            fault.solve_bus_asymmetry_fault(bus, par_type, Zf)
         return
     
     def save_fault_analysis_result(self, file):
-        fault.save_fault_analysis_result(file)
+        with self.case:
+            fault.save_fault_analysis_result(file)
         return
     
     def get_generator_related_model_data(self, generator, model_type, par_name):
-        value = apis.get_generator_related_model_data(generator, model_type, par_name)
+        with self.case:
+            value = apis.get_generator_related_model_data(generator, model_type, par_name)
         return value
 
     def set_generator_related_model_data(self, generator, model_type, par_name, value):
-        apis.set_generator_related_model_data(generator, model_type, par_name, value)
+        with self.case:
+            apis.set_generator_related_model_data(generator, model_type, par_name, value)
         return 
     
     def prepare_dynamic_output_meter(self, device_index, device, meter_type):
-        apis.prepare_dynamic_output_meter(device_index, device, meter_type)
+        with self.case:
+            apis.prepare_dynamic_output_meter(device_index, device, meter_type)
         return
         
     def start_dynamic_simulation(self):
-        dynamic.start_dynamic_simulation()
+        with self.case:
+            dynamic.start_dynamic_simulation()
         return
         
     def run_dynamic_simulation_to_time(self, stop_time):
-        dynamic.run_dynamic_simulation_to_time(stop_time)
+        with self.case:
+            dynamic.run_dynamic_simulation_to_time(stop_time)
         return
         
     def set_bus_fault(self, bus, Yf):
-        dynamic.set_bus_fault(bus, Yf)
+        with self.case:
+            dynamic.set_bus_fault(bus, Yf)
         return
         
     def clear_bus_fault(self, bus, Yf):
-        dynamic.clear_bus_fault(bus, Yf)
+        with self.case:
+            dynamic.clear_bus_fault(bus, Yf)
         return
     
     def trip_line(self, line):
-        dynamic.trip_line(line)
+        with self.case:
+            dynamic.trip_line(line)
         return
@@ -3,20 +3,29 @@ sys.path.append('..')
 
 
 from .apis_device import add_device
+from .apis_device import add_devices
 from .apis_device import get_all_devices
 from .apis_device import get_device_data
 from .apis_device import set_device_data
+from .apis_device import get_device_data_array
+from .apis_device import set_device_data_array
 
 from .apis_sequence import add_device_sequence_model
+from .apis_sequence import add_device_sequence_models
 from .apis_sequence import get_device_sequence_data
 from .apis_sequence import set_device_sequence_data
 
 from .apis_dynamic import get_model_state_variable_data, set_model_state_variable_data
+from .apis_dynamic import get_model_state_variable_array, set_model_state_variable_array
 
 from .apis_model import get_generator_related_model_data 
 from .apis_model import set_generator_related_model_data 
 from .apis_model import add_generator_related_model  
+from .apis_model import get_generator_related_models
+from .apis_model import get_generator_model_arrays, set_generator_model_arrays
 
 from .apis_system import get_simulator_parameter, set_simulator_parameter
 from .apis_system import get_system_base_data, set_system_base_data
+from .apis_system import get_system_bus_partition
+from .apis_system import get_system_Y_matrix_cache_statistics
 from .apis_system import prepare_dynamic_output_meter
\ No newline at end of file
@@ -2,8 +2,11 @@
 # Add a power flow device in database.
 import sys
 sys.path.append('..')
+import numpy as np
 
-from database import BusData, LoadData, ShuntData, GenData, LineData, TransData, HvdcData, WtGenData, PvUnitData
+from database import get_case
+
+from .apis_system import update_network_version
 
 
 def add_device(device_index, device):
@@ -14,6 +17,7 @@ def add_device(device_index, device):
         (2) device, str, device name.
     Rets: None
     '''
+    case = get_case()
     if device == 'TRANSFORMER':
         add_transformer(device_index)
         
@@ -43,6 +47,39 @@ def add_device(device_index, device):
         
     else:
         pass
+    case.BusIndex['device'].pop(device, None)  # renumbered bus index arrays of the device type are rebuilt on next use
+    if device in ('BUS', 'LOAD', 'SHUNT', 'LINE', 'TRANSFORMER'):
+        update_network_version()
+    return
+
+def add_devices(device_index, device, data=None):
+    '''
+    Add devices of a type in one call, an existing device is reset.
+    Args:
+        (1) device_index, list, device indexes.
+        (2) device, str, device type.
+        (3) data, dict, device data arrays in the order of device_index, keyed by parameter name. 
+            The default value is used for the parameter not given.
+    Rets: None
+    '''
+    case = get_case()
+    table = get_device_table(device)
+    if table is None:
+        print('device {} is wrong when add devices'.format(device))
+        return
+    
+    if data is not None:
+        for par_name in data.keys():
+            if par_name not in table.data:
+                print('par_name {} is not exit when add {} devices'.format(par_name, device.lower()))
+                return
+    
+    table.add_rows(list(device_index), data)
+    if device == 'BUS':
+        case.BusPartition.clear()
+    case.BusIndex['device'].pop(device, None)
+    if device in ('BUS', 'LOAD', 'SHUNT', 'LINE', 'TRANSFORMER'):
+        update_network_version()
     return
 
 def get_all_devices(device):
@@ -165,6 +202,87 @@ def set_device_data(device_index, device, par_name, value):
         pass
     return    
 
+def get_device_table(device):
+    '''
+    Get the data table of a device type.
+    Args:
+        device, str, device type.
+    Rets:
+        table, DeviceTable, device data table, None if the device type is wrong.
+    '''
+    case = get_case()
+    device_tables = {'BUS': case.BusData, 'LOAD': case.LoadData, 'SHUNT': case.ShuntData, 'GENERATOR': case.GenData, 'WT GENERATOR': case.WtGenData,
+        'PV UNIT': case.PvUnitData, 'LINE': case.LineData, 'TRANSFORMER': case.TransData, 'HVDC': case.HvdcData}
+    table = device_tables.get(device)
+    return table
+
+def get_device_data_array(device, par_name, device_index=None):
+    '''
+    Get a power flow data of all devices or a subset of devices in one array.
+    Args:
+        (1) device, str, device type.
+        (2) par_name, parameter name of device.
+        (3) device_index, list, device indexes, all devices in database order if None.
+            Pass the renumbered bus sequence to get bus data in renumbered order.
+    Rets:
+        value, array, device data values in the order of device_index.
+    '''
+    table = get_device_table(device)
+    if table is None:
+        print('device {} is wrong when get device data array'.format(device))
+        return
+        
+    if par_name not in table.data:
+        print('par_name {} is not exit when get {} data array'.format(par_name, device.lower()))
+        return
+    
+    if device_index is not None:
+        for index in device_index:
+            if index not in table.index:
+                print('{} {} is not exit when get {} data array'.format(device.lower(), index, device.lower()))
+                return
+    
+    value = table.get_array(par_name, device_index)
+    return value
+
+def set_device_data_array(device, par_name, value, device_index=None):
+    '''
+    Set a power flow data of all devices or a subset of devices from one array.
+    Args:
+        (1) device, str, device type.
+        (2) par_name, parameter name of device.
+        (3) value, array or scalar, device data values in the order of device_index.
+        (4) device_index, list, device indexes, all devices in database order if None.
+    Rets: None
+    '''
+    case = get_case()
+    table = get_device_table(device)
+    if table is None:
+        print('device {} is wrong when set device data array'.format(device))
+        return
+        
+    if par_name not in table.data:
+        print('par_name {} is not exit when set {} data array'.format(par_name, device.lower()))
+        return
+    
+    if device_index is not None:
+        for index in device_index:
+            if index not in table.index:
+                print('{} {} is not exit when set {} data array'.format(device.lower(), index, device.lower()))
+                return
+    
+    if table is case.BusData and par_name == 'IDE':
+        IDE = table.get_array(par_name, device_index)
+        table.set_array(par_name, value, device_index)
+        if np.any(table.get_array(par_name, device_index) != IDE):
+            case.BusPartition.clear()
+        return
+        
+    table.set_array(par_name, value, device_index)
+    if device in ('LOAD', 'SHUNT', 'LINE', 'TRANSFORMER'):
+        update_network_version()
+    return
+
 def add_bus(device_index):
     '''
     Add a bus network model to the database.
@@ -172,16 +290,9 @@ def add_bus(device_index):
         device_index, int, bus number
     Rets: None
     '''
-    columns_name = list(BusData)
-    columns_value = []
-    for column in columns_name:
-        columns_value.append(None)
-    BusData.loc[device_index] = columns_value
-    
-    set_bus_data(device_index, 'IDE', 0)  # initialize
-    set_bus_data(device_index, 'VM', 1.0)
-    set_bus_data(device_index, 'VA', 0.0)
-    set_bus_data(device_index, 'BASKV', 100.0)
+    case = get_case()
+    case.BusData.add_row(device_index)  # initialized with IDE 0, VM 1.0, VA 0.0, BASKV 100.0
+    case.BusPartition.clear()
     return
 
 def get_all_buses():
@@ -191,8 +302,8 @@ def get_all_buses():
     Rets: 
         buses, tuple, all bus number
     '''
-    index_values = BusData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.BusData.get_keys()
 
 def get_bus_data(device_index, par_name):
     '''
@@ -203,17 +314,16 @@ def get_bus_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(BusData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.BusData.data:
         print('par_name {} is not exit when get bus data'.format(par_name))
         return 
         
-    index_values = BusData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.BusData.index:
         print('bus {} is not exit when get bus data'.format(device_index))
         return
         
-    value = BusData.loc[device_index][par_name]
+    value = case.BusData.get_value(device_index, par_name)
     return value
 
 def set_bus_data(ibus, par_name, value):
@@ -225,17 +335,19 @@ def set_bus_data(ibus, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(BusData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.BusData.data:
         print('par_name {} is not exit when set bus data'.format(par_name))
         return 
         
-    index_values = BusData.index.values.tolist()
-    if ibus not in index_values:
+    if ibus not in case.BusData.index:
         print('bus {} is not exit when set bus data'.format(ibus))
         return
         
-    BusData.loc[ibus][par_name] = value
+    if par_name == 'IDE' and case.BusData.get_value(ibus, par_name) != value:
+        case.BusPartition.clear()  # bus type changed
+        
+    case.BusData.set_value(ibus, par_name, value)
     return 
 
 def add_load(device_index):
@@ -245,11 +357,8 @@ def add_load(device_index):
         device_index, int, load bus number.
     Rets: None
     '''
-    columns_name = list(LoadData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    LoadData.loc[device_index] = columns_value
+    case = get_case()
+    case.LoadData.add_row(device_index)
     return
     
 def get_all_loads():
@@ -259,8 +368,8 @@ def get_all_loads():
     Rets: 
         loads, tuple, all loads number
     '''
-    index_values = LoadData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.LoadData.get_keys()
 
 def get_load_data(device_index, par_name):
     '''
@@ -271,17 +380,16 @@ def get_load_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(LoadData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LoadData.data:
         print('par_name {} is not exit when get load data'.format(par_name))
         return 
         
-    index_values = LoadData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.LoadData.index:
         print('load {} is not exit when get load data'.format(device_index))
         return
         
-    value = LoadData.loc[device_index][par_name]
+    value = case.LoadData.get_value(device_index, par_name)
     
     return value
 
@@ -294,17 +402,17 @@ def set_load_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(LoadData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LoadData.data:
         print('par_name {} is not exit when set load data'.format(par_name))
         return 
         
-    index_values = LoadData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.LoadData.index:
         print('load {} is not exit when set load data'.format(device_index))
         return
         
-    LoadData.loc[device_index][par_name] = value
+    case.LoadData.set_value(device_index, par_name, value)
+    update_network_version()  # Y matrix is out of date
     return 
 
 def add_shunt(device_index):
@@ -314,11 +422,8 @@ def add_shunt(device_index):
         device_index, int, shunt bus number.
     Rets: None
     '''
-    columns_name = list(ShuntData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    ShuntData.loc[device_index] = columns_value
+    case = get_case()
+    case.ShuntData.add_row(device_index)
     return
 
 def get_all_shunts():
@@ -328,8 +433,8 @@ def get_all_shunts():
     Rets: 
         shunts, tuple, all shunts number
     '''
-    index_values = ShuntData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.ShuntData.get_keys()
     
 def get_shunt_data(device_index, par_name):
     '''
@@ -340,17 +445,16 @@ def get_shunt_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(ShuntData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.ShuntData.data:
         print('par_name {} is not exit when get shunt data'.format(par_name))
         return 
         
-    index_values = ShuntData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.ShuntData.index:
         print('shunt {} is not exit when get shunt data'.format(device_index))
         return
         
-    value = ShuntData.loc[device_index][par_name]
+    value = case.ShuntData.get_value(device_index, par_name)
     
     return value
 
@@ -363,17 +467,17 @@ def set_shunt_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(ShuntData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.ShuntData.data:
         print('par_name {} is not exit when set shunt data'.format(par_name))
         return 
         
-    index_values = ShuntData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.ShuntData.index:
         print('shunt {} is not exit when set shunt data'.format(device_index))
         return
         
-    ShuntData.loc[device_index][par_name] = value
+    case.ShuntData.set_value(device_index, par_name, value)
+    update_network_version()  # Y matrix is out of date
     return   
 
 def add_generator(device_index):
@@ -383,11 +487,8 @@ def add_generator(device_index):
         device_index, int, generator bus number.
     Rets: None
     '''
-    columns_name = list(GenData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    GenData.loc[device_index] = columns_value
+    case = get_case()
+    case.GenData.add_row(device_index)
     return
     
 def get_all_generators():
@@ -397,8 +498,8 @@ def get_all_generators():
     Rets: 
         generators, tuple, all generator number
     '''
-    index_values = GenData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.GenData.get_keys()
 
 def get_generator_data(device_index, par_name):
     '''
@@ -409,17 +510,16 @@ def get_generator_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(GenData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.GenData.data:
         print('par_name {} is not exit when get generator data'.format(par_name))
         return 
         
-    index_values = GenData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.GenData.index:
         print('generator {} is not exit when get generator data'.format(device_index))
         return
         
-    value = GenData.loc[device_index][par_name]
+    value = case.GenData.get_value(device_index, par_name)
     
     return value
 
@@ -432,17 +532,16 @@ def set_generator_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(GenData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.GenData.data:
         print('par_name {} is not exit when set generator data'.format(par_name))
         return 
         
-    index_values = GenData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.GenData.index:
         print('generator {} is not exit when set generator data'.format(device_index))
         return
         
-    GenData.loc[device_index][par_name] = value
+    case.GenData.set_value(device_index, par_name, value)
     return
 
 def add_wt_generator(device_index):
@@ -452,11 +551,8 @@ def add_wt_generator(device_index):
         device_index, int, generator bus number.
     Rets: None
     '''
-    columns_name = list(WtGenData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    WtGenData.loc[device_index] = columns_value
+    case = get_case()
+    case.WtGenData.add_row(device_index)
     return
 
 def get_all_wt_generators():
@@ -466,8 +562,8 @@ def get_all_wt_generators():
     Rets: 
         generators, tuple, all generator number
     '''
-    index_values = WtGenData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.WtGenData.get_keys()
 
 def get_wt_generator_data(device_index, par_name):
     '''
@@ -478,17 +574,16 @@ def get_wt_generator_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(WtGenData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.WtGenData.data:
         print('par_name {} is not exit when get wt generator data'.format(par_name))
         return 
         
-    index_values = WtGenData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.WtGenData.index:
         print('wt generator {} is not exit when get wt generator data'.format(device_index))
         return
         
-    value = WtGenData.loc[device_index][par_name]
+    value = case.WtGenData.get_value(device_index, par_name)
     
     return value
 
@@ -501,17 +596,16 @@ def set_wt_generator_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(WtGenData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.WtGenData.data:
         print('par_name {} is not exit when set wt generator data'.format(par_name))
         return 
         
-    index_values = WtGenData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.WtGenData.index:
         print('wt generator {} is not exit when set wt generator data'.format(device_index))
         return
         
-    WtGenData.loc[device_index][par_name] = value
+    case.WtGenData.set_value(device_index, par_name, value)
     return
 
 def add_pv_unit(device_index):
@@ -521,11 +615,8 @@ def add_pv_unit(device_index):
         device_index, int, generator bus number.
     Rets: None
     '''
-    columns_name = list(PvUnitData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    PvUnitData.loc[device_index] = columns_value
+    case = get_case()
+    case.PvUnitData.add_row(device_index)
     return
     
 def get_all_pv_units():
@@ -535,8 +626,8 @@ def get_all_pv_units():
     Rets: 
         index_values, tuple, all pv unit number
     '''
-    index_values = PvUnitData.index.values.tolist()
-    return tuple(index_values)
+    case = get_case()
+    return case.PvUnitData.get_keys()
 
 def get_pv_unit_data(device_index, par_name):
     '''
@@ -547,17 +638,16 @@ def get_pv_unit_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(PvUnitData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.PvUnitData.data:
         print('par_name {} is not exit when get wt generator data'.format(par_name))
         return 
         
-    index_values = PvUnitData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.PvUnitData.index:
         print('wt generator {} is not exit when get wt generator data'.format(device_index))
         return
         
-    value = PvUnitData.loc[device_index][par_name]
+    value = case.PvUnitData.get_value(device_index, par_name)
     
     return value
 
@@ -570,17 +660,16 @@ def set_pv_unit_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(PvUnitData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.PvUnitData.data:
         print('par_name {} is not exit when set pv unit data'.format(par_name))
         return 
         
-    index_values = PvUnitData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.PvUnitData.index:
         print('pv unit {} is not exit when set pv unit data'.format(device_index))
         return
         
-    PvUnitData.loc[device_index][par_name] = value
+    case.PvUnitData.set_value(device_index, par_name, value)
     return    
 
 def add_line(device_index):
@@ -590,11 +679,8 @@ def add_line(device_index):
         device_index, tuple, (ibus, jbus, ckt)
     Rets: None
     '''
-    columns_name = list(LineData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0)
-    LineData.loc[str(device_index)] = columns_value
+    case = get_case()
+    case.LineData.add_row(device_index)
     return 
     
 def get_all_lines():
@@ -604,10 +690,8 @@ def get_all_lines():
     Rets: 
         lines, tuple, all lines number
     '''
-    index_values = LineData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = eval(index_values[i])
-    return index_values
+    case = get_case()
+    return list(case.LineData.get_keys())
     
 def get_line_data(device_index, par_name):
     '''
@@ -618,19 +702,16 @@ def get_line_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(LineData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LineData.data:
         print('par_name {} is not exit when get line data'.format(par_name))
         return 
         
-    index_values = LineData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    if set(device_index) not in index_values:
+    if device_index not in case.LineData.index:
         print('line {} is not exit when get line data'.format(device_index))
         return
         
-    value = LineData.loc[str(device_index)][par_name]
+    value = case.LineData.get_value(device_index, par_name)
     return value
 
 def set_line_data(device_index, par_name, value):
@@ -642,20 +723,17 @@ def set_line_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(LineData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LineData.data:
         print('par_name {} is not exit when set line data'.format(par_name))
         return 
         
-    index_values = LineData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    
-    if set(device_index) not in index_values:
+    if device_index not in case.LineData.index:
         print('line {} is not exit when set line data'.format(device_index))
         return
         
-    LineData.loc[str(device_index)][par_name] = value
+    case.LineData.set_value(device_index, par_name, value)
+    update_network_version()  # Y matrix is out of date
     return   
 
 
@@ -666,11 +744,8 @@ def add_transformer(device_index):
         device_index, tuple, (ibus, jbus, kbus)
     Rets: None
     '''
-    columns_name = list(TransData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0)
-    TransData.loc[str(device_index)] = columns_value
+    case = get_case()
+    case.TransData.add_row(device_index)
     return 
     
 def get_all_transformers():
@@ -680,10 +755,8 @@ def get_all_transformers():
     Rets: 
         transformers, tuple, (ibus, jbus)
     '''
-    index_values = TransData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = eval(index_values[i])
-    return index_values
+    case = get_case()
+    return list(case.TransData.get_keys())
 
 def get_transformer_data(device_index, par_name):
     '''
@@ -694,19 +767,16 @@ def get_transformer_data(device_index, par_name):
     Rets:
         value, model parameter.
     '''
-    columns_name = list(TransData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.TransData.data:
         print('par_name {} is not exit when get transformer sequence data'.format(par_name))
         return 
         
-    index_values = TransData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    if set(device_index) not in index_values:
+    if device_index not in case.TransData.index:
         print('line {} is not exit when get transformer sequence data'.format(device_index))
         return
         
-    value = TransData.loc[str(device_index)][par_name]
+    value = case.TransData.get_value(device_index, par_name)
     return value
 
 def set_transformer_data(device_index, par_name, value):
@@ -718,20 +788,17 @@ def set_transformer_data(device_index, par_name, value):
     Rets:
         value, model parameter.
     '''
-    columns_name = list(TransData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.TransData.data:
         print('par_name {} is not exit when set transformer sequence data'.format(par_name))
         return 
         
-    index_values = TransData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    
-    if set(device_index) not in index_values:
+    if device_index not in case.TransData.index:
         print('line {} is not exit when set line transformer data'.format(device_index))
         return
         
-    TransData.loc[str(device_index)][par_name] = value
+    case.TransData.set_value(device_index, par_name, value)
+    update_network_version()  # Y matrix is out of date
     return    
 
 def add_hvdc(device_index):
@@ -741,11 +808,8 @@ def add_hvdc(device_index):
         device_index, tuple, (ibus, jbus)
     Rets: None
     '''
-    columns_name = list(HvdcData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0)
-    HvdcData.loc[str(device_index)] = columns_value
+    case = get_case()
+    case.HvdcData.add_row(device_index)
     return 
 
 def get_all_hvdcs():
@@ -755,10 +819,8 @@ def get_all_hvdcs():
     Rets: 
         hvdcs, tuple, all hvdcs number
     '''
-    index_values = HvdcData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = eval(index_values[i])
-    return index_values
+    case = get_case()
+    return list(case.HvdcData.get_keys())
 
 def get_hvdc_data(device_index, par_name):
     '''
@@ -769,19 +831,16 @@ def get_hvdc_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(HvdcData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.HvdcData.data:
         print('par_name {} is not exit when get hvdc data'.format(par_name))
         return 
         
-    index_values = HvdcData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    if set(device_index) not in index_values:
+    if device_index not in case.HvdcData.index:
         print('hvdc {} is not exit when get hvdc data'.format(device_index))
         return
         
-    value = HvdcData.loc[str(device_index)][par_name]
+    value = case.HvdcData.get_value(device_index, par_name)
     return value
 
 def set_hvdc_data(device_index, par_name, value):
@@ -793,20 +852,16 @@ def set_hvdc_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(HvdcData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.HvdcData.data:
         print('par_name {} is not exit when set hvdc data'.format(par_name))
         return 
         
-    index_values = HvdcData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    
-    if set(device_index) not in index_values:
+    if device_index not in case.HvdcData.index:
         print('hvdc {} is not exit when set hvdc data'.format(device_index))
         return
         
-    HvdcData.loc[str(device_index)][par_name] = value
+    case.HvdcData.set_value(device_index, par_name, value)
     return   
 
 def get_device_model_data(ibus, model, par_name):
@@ -819,12 +874,13 @@ def get_device_model_data(ibus, model, par_name):
     Rets:
         value, model parameter
     '''
+    case = get_case()
     if model == 'GENERATOR':
-        tmp = SyncGenMd
+        tmp = case.SyncGenMd
     elif model == 'EXCITATION':
-        tmp = ExciterMd
+        tmp = case.ExciterMd
     elif model == 'TURBINE':
-        tmp = TurGovMd
+        tmp = case.TurGovMd
     else:
         print('model {} is not existential'.format(model))
         return tuple(value)  
@@ -850,12 +906,13 @@ def set_device_model_data(ibus, model, par_name, value):
         (4) value, value of model parameter
     Rets: None
     '''
+    case = get_case()
     if model == 'GENERATOR':
-        model_data = SyncGenMd
+        model_data = case.SyncGenMd
     elif model == 'EXCITATION':
-        model_data = ExciterMd
+        model_data = case.ExciterMd
     elif model == 'TURBINE':
-        model_data = TurGovMd
+        model_data = case.TurGovMd
     else:
         print('model {} is not existential'.format(model))
         return tuple(value)
@@ -870,4 +927,4 @@ def set_device_model_data(ibus, model, par_name, value):
             setattr(item, par_name, value)
         else:
             print('parameter {} in model {} at bus {} is not exsit'.format(par_name, model, ibus))
-    return 
\ No newline at end of file
+    return 
\ No newline at end of file
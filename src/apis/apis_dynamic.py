@@ -2,30 +2,54 @@
 import sys
 sys.path.append('..')
 
-from database import GenStateVar, ExcStateVar, TurStateVar, BusStateVar
+from database import get_case
 
 
+def get_dynamic_state(model):
+    '''
+    Get the state variable storage of a model.
+    Args:
+        model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+    Rets:
+        state, DynamicState, state variables of all devices of the model, None if the model is wrong.
+    '''
+    case = get_case()
+    states = {'GENERATOR': case.GenStateVar, 'EXCITATION': case.ExcStateVar, 'TURBINE': case.TurStateVar, 'BUS': case.BusStateVar}
+    state = states.get(model)
+    return state
+
 def add_model_state_variable(generator, model, value):
     '''
     Add a model variable data in database
     Args:
-        (1) model, model type, str
-        (2) value, model state variables, dict
+        (1) generator, the bus number model connected, int
+        (2) model, model type, str
+        (3) value, model state variables, dict, the estimated value ends with '0'
     Rets: None
     '''
-    if model == 'GENERATOR':
-        statevar = GenStateVar
-    elif model == 'EXCITATION':
-        statevar = ExcStateVar
-    elif model == 'TURBINE':
-        statevar = TurStateVar
-    elif model == 'BUS':
-        statevar = BusStateVar
-    else:
+    state = get_dynamic_state(model)
+    if state is None:
+        print('model {} is wrong'.format(model))
+        return None
+        
+    state.add_device(generator, value)
+    return
+
+def add_model_state_variables(generators, model, value):
+    '''
+    Add the model variable data of several devices in database in one call.
+    Args:
+        (1) generators, list, the bus numbers model connected.
+        (2) model, str, model type.
+        (3) value, dict, model state variable arrays in the order of generators, the estimated value ends with '0'.
+    Rets: None
+    '''
+    state = get_dynamic_state(model)
+    if state is None:
         print('model {} is wrong'.format(model))
         return None
         
-    statevar[generator] = value    
+    state.add_devices(generators, value)
     return
 
 # The following APIs are used to obtain and set state variables in transient simulation
@@ -77,33 +101,24 @@ def get_model_state_variable_data(generator, model, par_type, par_name):
     Rets:
         value, the value of state variables
     '''
-    if model == 'GENERATOR':
-        statevar = GenStateVar
-    elif model == 'EXCITATION':
-        statevar = ExcStateVar
-    elif model == 'TURBINE':
-        statevar = TurStateVar
-    elif model == 'BUS':
-        statevar = BusStateVar
-    else:
+    state = get_dynamic_state(model)
+    if state is None:
         print('model {} is wrong'.format(model))
         return None
     
-    if generator not in statevar.keys():
+    if generator not in state:
         print('Failed to get model state variable data in generator {}'.format(generator))
         return
-    par = statevar[generator]
     
-    if par_name not in par.keys():
+    if par_name not in state.variables:
         print('Failed to get model state variable data in generator {} with parameter {}'.format(generator, par_name))
         value = None
     else:
-        if par_type is True:
-            value = par[par_name]
-        elif par_type is False:
-            value = par[par_name + '0']
+        table = state.get_buffer(par_type)
+        if table is None:
+            value = None
         else:
-            value = None        
+            value = table.get_value(generator, par_name)
     return value
     
 def set_model_state_variable_data(generator, model, par_type, par_name, value):
@@ -117,38 +132,139 @@ def set_model_state_variable_data(generator, model, par_type, par_name, value):
         (5) value, the value of state variables
     Rets: None
     '''
-    if model == 'GENERATOR':
-        statevar = GenStateVar
-    elif model == 'EXCITATION':
-        statevar = ExcStateVar
-    elif model == 'TURBINE':
-        statevar = TurStateVar
-    elif model == 'BUS':
-        statevar = BusStateVar
-    else:
+    state = get_dynamic_state(model)
+    if state is None:
         print('model {} is wrong'.format(model))
         return None
         
-    if generator not in statevar.keys():
+    if generator not in state:
         print('Failed to set model state variable data in generator {}'.format(generator))
         return        
-    par = statevar[generator]
 
-    if par_name not in par.keys():
+    if par_name not in state.variables:
         print('Failed to set model state variable data in generator {} with parameter {}'.format(generator, par_name))
         return
             
     else:
-        if par_type is True:
-            par[par_name] = value
-
-        elif par_type is False:
-            par[par_name + '0'] = value
-        else:
+        table = state.get_buffer(par_type)
+        if table is None:
             print('The par_type is wrong')
+        else:
+            table.set_value(generator, par_name, value)
             
     return
+
+def get_model_state_variable_array(model, par_type, par_name, generators=None):
+    '''
+    Get a state variable of all devices or a subset of devices of a model in one array.
+    Args:
+        (1) model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, the name of state variable.
+        (4) generators, list, the bus numbers model connected, all devices in adding order if None.
+    Rets:
+        value, array, state variable values in the order of generators.
+    '''
+    state = get_dynamic_state(model)
+    if state is None:
+        print('model {} is wrong'.format(model))
+        return None
+    
+    table = state.get_buffer(par_type)
+    if par_name not in state.variables or table is None:
+        print('Failed to get model state variable array of {} with parameter {}'.format(model.lower(), par_name))
+        return
+    
+    value = table.get_array(par_name, generators)
+    return value
+
+def set_model_state_variable_array(model, par_type, par_name, value, generators=None):
+    '''
+    Set a state variable of all devices or a subset of devices of a model from one array.
+    Args:
+        (1) model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, the name of state variable.
+        (4) value, array or scalar, state variable values in the order of generators.
+        (5) generators, list, the bus numbers model connected, all devices in adding order if None.
+    Rets: None
+    '''
+    state = get_dynamic_state(model)
+    if state is None:
+        print('model {} is wrong'.format(model))
+        return None
+    
+    table = state.get_buffer(par_type)
+    if par_name not in state.variables or table is None:
+        print('Failed to set model state variable array of {} with parameter {}'.format(model.lower(), par_name))
+        return
+    
+    table.set_array(par_name, value, generators)
+    return
+
+def get_model_state_variable_rows(model, generators):
+    '''
+    Get the rows of devices in the state arrays of a model, the rows are kept until the devices are added again.
+    Args:
+        (1) model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+        (2) generators, list, the bus numbers model connected.
+    Rets:
+        rows, array, rows of devices in the order of generators.
+    '''
+    state = get_dynamic_state(model)
+    if state is None:
+        print('model {} is wrong'.format(model))
+        return None
+    
+    for generator in generators:
+        if generator not in state:
+            print('Failed to get model state variable rows in generator {}'.format(generator))
+            return
     
+    rows = state.get_buffer(True).get_rows(generators)
+    return rows
 
+def take_model_state_variable_array(model, par_type, par_name, rows):
+    '''
+    Get a state variable of devices at rows got by get_model_state_variable_rows, the rows are not checked.
+    Args:
+        (1) model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, the name of state variable.
+        (4) rows, array, rows of devices.
+    Rets:
+        value, array, state variable values in the order of rows.
+    '''
+    table = get_dynamic_state(model).get_buffer(par_type)
+    value = table.get_column(par_name)[rows]
+    return value
+
+def put_model_state_variable_array(model, par_type, par_name, value, rows):
+    '''
+    Set a state variable of devices at rows got by get_model_state_variable_rows, the rows are not checked.
+    Args:
+        (1) model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, the name of state variable.
+        (4) value, array or scalar, state variable values in the order of rows.
+        (5) rows, array, rows of devices.
+    Rets: None
+    '''
+    table = get_dynamic_state(model).get_buffer(par_type)
+    table.get_column(par_name)[rows] = value
+    return
+
+def swap_model_state_buffers(model):
+    '''
+    Swap the actual value buffer and estimated value buffer of a model, the state arrays are exchanged without copying.
+    Args:
+        model, str, model name including 'GENERATOR', 'EXCITATION', 'TURBINE', 'BUS'.
+    Rets: None
+    '''
+    state = get_dynamic_state(model)
+    if state is None:
+        print('model {} is wrong'.format(model))
+        return None
     
-   
+    state.swap()
+    return
@@ -1,7 +1,7 @@
 import sys
 sys.path.append('..')
 
-from database import SyncGenMd, ExciterMd, TurGovMd
+from database import get_case
 
 
 def get_generator_related_model_data(generator, model_type, par_name):
@@ -14,14 +14,15 @@ def get_generator_related_model_data(generator, model_type, par_name):
     Rets:
         value, value of parameter. If model type or parameter name is not supported, None is returned.
     '''
+    case = get_case()
     if model_type == 'GEN':
-        model_data = SyncGenMd
+        model_data = case.SyncGenMd
         
     elif model_type == 'AVR':
-        model_data = ExciterMd
+        model_data = case.ExciterMd
 
     elif model_type == 'GOV':
-        model_data = TurGovMd
+        model_data = case.TurGovMd
 
     else:
         print('Failed to get generator ralated model in model_type {} at generator {}'.format(model_type, generator))
@@ -48,14 +49,15 @@ def set_generator_related_model_data(generator, model_type, par_name, value):
         (4) value, value of parameter.
     Rets: None
     '''
+    case = get_case()
     if model_type == 'GEN':
-        model_data = SyncGenMd
+        model_data = case.SyncGenMd
         
     elif model_type == 'AVR':
-        model_data = ExciterMd
+        model_data = case.ExciterMd
         
     elif model_type == 'GOV':
-        model_data = TurGovMd
+        model_data = case.TurGovMd
         
     else:
         print('Failed to set generator ralated model in model_type {}'.format(model_type))
@@ -63,6 +65,29 @@ def set_generator_related_model_data(generator, model_type, par_name, value):
     model_data[generator][par_name] = value
     return
     
+def get_generator_related_models(model_type):
+    '''
+    Get all generator related models of a model type.
+    Args:
+        model_type, str of model type, including GEN, AVR, GOV.
+    Rets:
+        model_data, dict, model data in format of {generator: {par_name: value}}, None if model type is not supported.
+    '''
+    case = get_case()
+    if model_type == 'GEN':
+        model_data = case.SyncGenMd
+        
+    elif model_type == 'AVR':
+        model_data = case.ExciterMd
+        
+    elif model_type == 'GOV':
+        model_data = case.TurGovMd
+        
+    else:
+        print('Failed to get generator ralated models in model type {}'.format(model_type))
+        return
+    return model_data
+
 def add_generator_related_model(generator, model_type):
     '''
     Add generator ralated model in database.
@@ -71,14 +96,15 @@ def add_generator_related_model(generator, model_type):
         (2) model_type, str of model type, including GEN, AVR, GOV.
     Rets: None
     '''
+    case = get_case()
     if model_type == 'GEN':
-        model_data = SyncGenMd
+        model_data = case.SyncGenMd
         
     elif model_type == 'AVR':
-        model_data = ExciterMd
+        model_data = case.ExciterMd
         
     elif model_type == 'GOV':
-        model_data = TurGovMd
+        model_data = case.TurGovMd
         
     else:
         print('Failed to add generator ralated model in model type {}'.format(model_type))
@@ -86,4 +112,29 @@ def add_generator_related_model(generator, model_type):
         
     model_data[generator] = {}
     return
-    
\ No newline at end of file
+
+def get_generator_model_arrays(model_name=None):
+    '''
+    Get the parameter arrays of generator model types built at the start of dynamic simulation.
+    Args:
+        model_name, str, generator model name such as GENCLS and GENTRA, all model types if None.
+    Rets:
+        model_arrays, dict, parameter arrays in format of {par_name: array} of the model type, 
+            or {model_name: {par_name: array}} of all model types, None if the model type is not built.
+    '''
+    case = get_case()
+    if model_name is None:
+        return case.GenModelArray
+    model_arrays = case.GenModelArray.get(model_name)
+    return model_arrays
+
+def set_generator_model_arrays(model_arrays):
+    '''
+    Set the parameter arrays of all generator model types.
+    Args:
+        model_arrays, dict, parameter arrays in format of {model_name: {par_name: array}}.
+    Rets: None
+    '''
+    case = get_case()
+    case.GenModelArray = model_arrays
+    return
@@ -1,7 +1,7 @@
 import sys
 sys.path.append('..')
 
-from database import LoadSqData, ShuntSqData, GenSqData, LineSqData, TransSqData, BusSqData
+from database import get_case
 
 
 def add_device_sequence_model(device_index, device):
@@ -34,6 +34,44 @@ def add_device_sequence_model(device_index, device):
         print('device {} is not exit'.format(device))
     return
 
+def get_device_sequence_table(device):
+    '''
+    Get the sequence data table of a device type.
+    Args:
+        device, str, device type.
+    Rets:
+        table, DeviceTable, device sequence data table, None if the device type is wrong.
+    '''
+    case = get_case()
+    device_tables = {'BUS': case.BusSqData, 'GENERATOR': case.GenSqData, 'LOAD': case.LoadSqData, 'LINE': case.LineSqData,
+        'TRANSFORMER': case.TransSqData, 'SHUNT': case.ShuntSqData}
+    table = device_tables.get(device)
+    return table
+
+def add_device_sequence_models(device_index, device, data=None):
+    '''
+    Add sequence models of a device type in one call, an existing model is reset.
+    Args:
+        (1) device_index, list, device indexes.
+        (2) device, str, device type.
+        (3) data, dict, sequence data arrays in the order of device_index, keyed by parameter name. 
+            The default value is used for the parameter not given.
+    Rets: None
+    '''
+    table = get_device_sequence_table(device)
+    if table is None:
+        print('device {} is not exit'.format(device))
+        return
+        
+    if data is not None:
+        for par_name in data.keys():
+            if par_name not in table.data:
+                print('par_name {} is not exit when add {} sequence models'.format(par_name, device.lower()))
+                return
+                
+    table.add_rows(list(device_index), data)
+    return
+
 def get_device_sequence_data(device_index, device, par_name):
     '''
     Get a device sequence model data in database.
@@ -105,11 +143,8 @@ def add_bus_sequence_model(device_index):
         device_index, int, bus number.
     Rets: None
     '''
-    columns_name = list(BusSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0 + 0.0j)
-    BusSqData.loc[device_index] = columns_value
+    case = get_case()
+    case.BusSqData.add_row(device_index)
     return
 
 def get_bus_sequence_data(device_index, par_name):
@@ -121,17 +156,16 @@ def get_bus_sequence_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(BusSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.BusSqData.data:
         print('par_name {} is not exit when get bus sequence data'.format(par_name))
         return 
         
-    index_values = BusSqData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.BusSqData.index:
         print('bus {} is not exit when get bus sequence data'.format(device_index))
         return
         
-    value = BusSqData.loc[device_index][par_name]
+    value = case.BusSqData.get_value(device_index, par_name)
     return value
 
 def set_bus_sequence_data(device_index, par_name, value):
@@ -143,17 +177,16 @@ def set_bus_sequence_data(device_index, par_name, value):
         (3) value, value of the parameter.
     Rets: None
     '''    
-    columns_name = list(BusSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.BusSqData.data:
         print('par_name {} is not exit when set bus sequence data'.format(par_name))
         return 
         
-    index_values = BusSqData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.BusSqData.index:
         print('bus {} is not exit when set bus sequence data'.format(device_index))
         return
         
-    BusSqData.loc[device_index][par_name] = value
+    case.BusSqData.set_value(device_index, par_name, value)
     return 
 
 def add_generator_sequence_model(ibus):   
@@ -163,11 +196,8 @@ def add_generator_sequence_model(ibus):
         ibus, int, generator bus number.
     Rets: None
     '''
-    columns_name = list(GenSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    GenSqData.loc[ibus] = columns_value
+    case = get_case()
+    case.GenSqData.add_row(ibus)
     return
 
 def get_generator_sequence_data(ibus, par_name):
@@ -179,17 +209,16 @@ def get_generator_sequence_data(ibus, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(GenSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.GenSqData.data:
         print('par_name {} is not exit'.format(par_name))
         return 
         
-    index_values = GenSqData.index.values.tolist()
-    if ibus not in index_values:
+    if ibus not in case.GenSqData.index:
         print('generator {} is not exit'.format(ibus))
         return
         
-    value = GenSqData.loc[ibus][par_name]
+    value = case.GenSqData.get_value(ibus, par_name)
     return value
 
 def set_generator_sequence_data(ibus, par_name, value):
@@ -201,17 +230,16 @@ def set_generator_sequence_data(ibus, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(GenSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.GenSqData.data:
         print('par_name {} is not exit'.format(par_name))
         return 
         
-    index_values = GenSqData.index.values.tolist()
-    if ibus not in index_values:
+    if ibus not in case.GenSqData.index:
         print('generator {} is not exit'.format(ibus))
         return
         
-    GenSqData.loc[ibus][par_name] = value
+    case.GenSqData.set_value(ibus, par_name, value)
 
     return 
 
@@ -222,11 +250,8 @@ def add_load_sequence_model(ibus):
         ibus, int, load bus number
     Rets: None
     '''
-    columns_name = list(LoadSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    LoadSqData.loc[ibus] = columns_value
+    case = get_case()
+    case.LoadSqData.add_row(ibus)
     return
 
 def get_load_sequence_data(ibus, par_name):
@@ -238,17 +263,16 @@ def get_load_sequence_data(ibus, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(LoadSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LoadSqData.data:
         print('par_name {} is not exit'.format(par_name))
         return 
         
-    index_values = LoadSqData.index.values.tolist()
-    if ibus not in index_values:
+    if ibus not in case.LoadSqData.index:
         print('generator {} is not exit'.format(ibus))
         return
         
-    value = LoadSqData.loc[ibus][par_name]
+    value = case.LoadSqData.get_value(ibus, par_name)
     return value
 
 def set_load_sequence_data(ibus, par_name, value):
@@ -260,17 +284,16 @@ def set_load_sequence_data(ibus, par_name, value):
         (3) value, value of the parameter.
     Rets: None
     '''    
-    columns_name = list(LoadSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LoadSqData.data:
         print('par_name {} is not exit'.format(par_name))
         return 
         
-    index_values = LoadSqData.index.values.tolist()
-    if ibus not in index_values:
+    if ibus not in case.LoadSqData.index:
         print('load {} is not exit'.format(ibus))
         return
         
-    LoadSqData.loc[ibus][par_name] = value
+    case.LoadSqData.set_value(ibus, par_name, value)
     return 
 
 def add_shunt_sequence_model(device_index):
@@ -280,12 +303,9 @@ def add_shunt_sequence_model(device_index):
         device_index, tuple, shunt conneted bus number
     Rets: None
     '''
-    columns_name = list(ShuntSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    ShuntSqData.loc[device_index] = columns_value
-    print(ShuntSqData)
+    case = get_case()
+    case.ShuntSqData.add_row(device_index)
+    print(case.ShuntSqData)
     return
     
 def get_shunt_sequence_data(device_index, par_name):
@@ -297,17 +317,16 @@ def get_shunt_sequence_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(ShuntSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.ShuntSqData.data:
         print('par_name {} is not exitwhen get shunt {} data'.format(par_name, device_index))
         return 0.0
         
-    index_values = ShuntSqData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.ShuntSqData.index:
         print('shunt {} is not exit when get shunt data parameter {}'.format(device_index, par_name))
         return 0.0
         
-    value = ShuntSqData.loc[device_index][par_name]
+    value = case.ShuntSqData.get_value(device_index, par_name)
     
     return value
 
@@ -320,17 +339,16 @@ def set_shunt_sequence_data(device_index, par_name, value):
         (3) value, value of the parameter.
     Rets: None
     '''    
-    columns_name = list(ShuntSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.ShuntSqData.data:
         print('par_name {} is not exit when set shunt sequence data'.format(par_name))
         return 
         
-    index_values = ShuntSqData.index.values.tolist()
-    if device_index not in index_values:
+    if device_index not in case.ShuntSqData.index:
         print('shunt {} is not exit when set shunt sequence data'.format(device_index))
         return
         
-    ShuntSqData.loc[device_index][par_name] = value
+    case.ShuntSqData.set_value(device_index, par_name, value)
     return
     
 def add_line_sequence_model(device_index):
@@ -340,11 +358,8 @@ def add_line_sequence_model(device_index):
         device_index, tuple, (ibus, jbus, ckt)
     Rets: None
     '''
-    columns_name = list(LineSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0.0)
-    LineSqData.loc[str(device_index)] = columns_value
+    case = get_case()
+    case.LineSqData.add_row(device_index)
     return
 
 def get_line_sequence_data(device_index, par_name):
@@ -356,19 +371,16 @@ def get_line_sequence_data(device_index, par_name):
     Rets:
         value, model parameter
     '''
-    columns_name = list(LineSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LineSqData.data:
         print('par_name {} is not exit when get line sequence data'.format(par_name))
         return 
         
-    index_values = LineSqData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    if set(device_index) not in index_values:
+    if device_index not in case.LineSqData.index:
         print('line {} is not exit'.format(device_index))
         return
         
-    value = LineSqData.loc[str(device_index)][par_name]
+    value = case.LineSqData.get_value(device_index, par_name)
     return value
 
 def set_line_sequence_data(device_index, par_name, value):
@@ -380,20 +392,16 @@ def set_line_sequence_data(device_index, par_name, value):
         (3) value, value of the parameter
     Rets: None
     '''    
-    columns_name = list(LineSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.LineSqData.data:
         print('par_name {} is not exit when set line sequence data'.format(par_name))
         return 
         
-    index_values = LineSqData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    
-    if set(device_index) not in index_values:
+    if device_index not in case.LineSqData.index:
         print('line {} is not exit when set line sequence data'.format(device_index))
         return
         
-    LineSqData.loc[str(device_index)][par_name] = value
+    case.LineSqData.set_value(device_index, par_name, value)
     return
     
 def add_transformer_sequence_model(device_index):
@@ -403,11 +411,8 @@ def add_transformer_sequence_model(device_index):
         device_index, tuple, (ibus, jbus, ckt)
     Rets: None
     '''
-    columns_name = list(TransSqData)
-    columns_value = []
-    for i in range(len(columns_name)):
-        columns_value.append(0)
-    TransSqData.loc[str(device_index)] = columns_value
+    case = get_case()
+    case.TransSqData.add_row(device_index)
     return   
     
 def get_transformer_sequence_data(device_index, par_name):
@@ -419,19 +424,16 @@ def get_transformer_sequence_data(device_index, par_name):
     Rets:
         value, model parameter.
     '''
-    columns_name = list(TransSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.TransSqData.data:
         print('par_name {} is not exit when get transformer sequence data'.format(par_name))
         return 
         
-    index_values = TransSqData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    if set(device_index) not in index_values:
+    if device_index not in case.TransSqData.index:
         print('line {} is not exit when get transformer sequence data'.format(device_index))
         return
         
-    value = TransSqData.loc[str(device_index)][par_name]
+    value = case.TransSqData.get_value(device_index, par_name)
     return value
 
 def set_transformer_sequence_data(device_index, par_name, value): 
@@ -443,18 +445,14 @@ def set_transformer_sequence_data(device_index, par_name, value):
     Rets:
         value, model parameter.
     '''
-    columns_name = list(TransSqData)   
-    if par_name not in columns_name:
+    case = get_case()
+    if par_name not in case.TransSqData.data:
         print('par_name {} is not exit when set transformer sequence data'.format(par_name))
         return 
         
-    index_values = TransSqData.index.values.tolist()
-    for i in range(len(index_values)):
-        index_values[i] = set(eval(index_values[i]))
-    
-    if set(device_index) not in index_values:
+    if device_index not in case.TransSqData.index:
         print('line {} is not exit when set line transformer data'.format(device_index))
         return
         
-    TransSqData.loc[str(device_index)][par_name] = value
+    case.TransSqData.set_value(device_index, par_name, value)
     return
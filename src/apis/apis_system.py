@@ -1,9 +1,10 @@
 # system
 import numpy as np
+import scipy.sparse as sp
 import sys
 sys.path.append('..')
 
-from database import Base, YMatrix, PowFlowPar, DynSimPar
+from database import get_case
 
 
 def prepare_dynamic_output_meter(device_index, device, par_name):
@@ -15,7 +16,8 @@ def prepare_dynamic_output_meter(device_index, device, par_name):
         (3) par_name, str, model state parameter.
     Rets: None
     '''
-    meter = DynSimPar['meter']
+    case = get_case()
+    meter = case.DynSimPar['meter']
     meter.append({'index': device_index, 'device': device, 'par_name': par_name})
     return
 
@@ -26,7 +28,8 @@ def get_all_dynamic_output_meters():
     Rets: 
         meter, list, all device meters
     '''
-    meter = DynSimPar['meter']
+    case = get_case()
+    meter = case.DynSimPar['meter']
     return meter
     
 def get_simulator_parameter(par_type, par_name):
@@ -37,11 +40,12 @@ def get_simulator_parameter(par_type, par_name):
     Rets:
         value: Value of parameter.
     '''    
+    case = get_case()
     if par_type == 'dynamic':
-        simvar = DynSimPar
+        simvar = case.DynSimPar
         
     elif par_type == 'powerflow':
-        simvar = PowFlowPar
+        simvar = case.PowFlowPar
         
     else:
         print('par_type {} is wrong when getting simulator parameter'.format(par_type))
@@ -61,10 +65,11 @@ def set_simulator_parameter(par_type, par_name, value):
         par_name: String of parameter name.
     Rets: None
     '''    
+    case = get_case()
     if par_type == 'dynamic':
-        simvar = DynSimPar
+        simvar = case.DynSimPar
     elif par_type == 'powerflow':
-        simvar = PowFlowPar
+        simvar = case.PowFlowPar
     else:
         print('par_type {} is wrong when setting simulator parameter'.format(par_type))
         
@@ -83,8 +88,8 @@ def get_bus_num_after_renumber(ibus):
     Rets:
         ibus, bus number after renumbering
     '''
-    BusSqNum = Base['BusSqNum']
-    ibus = BusSqNum.index(ibus)
+    case = get_case()
+    ibus = case.BusIndex['forward'][ibus]
     return ibus
 
 def get_bus_num_before_renumber(ibus):
@@ -95,32 +100,145 @@ def get_bus_num_before_renumber(ibus):
     Rets:
         ibus, bus number before renumbering
     '''
-    BusSqNum = Base['BusSqNum']
-    ibus = BusSqNum[ibus]
+    case = get_case()
+    ibus = case.BusIndex['reverse'][ibus]
     return ibus
+
+def build_bus_renumber_index(BusSqNum):
+    '''
+    Build the bus renumbering index from the renumbered bus sequence.
+    Args:
+        BusSqNum, list, bus numbers in renumbered order.
+    Rets: None
+    '''
+    case = get_case()
+    reverse = np.array(BusSqNum, dtype=int)
+    order = np.argsort(reverse, kind='stable')
+    case.BusIndex['forward'] = {bus: i for i, bus in enumerate(BusSqNum)}
+    case.BusIndex['reverse'] = reverse
+    case.BusIndex['sorted_bus'] = reverse[order]
+    case.BusIndex['sorted_internal'] = order
+    case.BusIndex['device'].clear()
+    case.BusPartition.clear()
+    return
+
+def map_buses_to_internal(buses):
+    '''
+    Map bus numbers to the bus numbers after renumbering.
+    Args:
+        buses, array, bus numbers before renumbering.
+    Rets:
+        index, array, bus numbers after renumbering.
+    '''
+    case = get_case()
+    buses = np.asarray(buses, dtype=int)
+    sorted_bus = case.BusIndex['sorted_bus']
+    if buses.size == 0:
+        return np.zeros(buses.shape, dtype=int)
+    if sorted_bus.size == 0:
+        print('bus {} is not exit when mapping buses to internal'.format(buses.tolist()))
+        return
+        
+    position = np.minimum(np.searchsorted(sorted_bus, buses), sorted_bus.size - 1)
+    missing = sorted_bus[position] != buses
+    if np.any(missing):
+        print('bus {} is not exit when mapping buses to internal'.format(buses[missing].tolist()))
+        return
+        
+    index = case.BusIndex['sorted_internal'][position]
+    return index
+
+def map_internal_to_buses(index):
+    '''
+    Map bus numbers after renumbering to bus numbers.
+    Args:
+        index, array, bus numbers after renumbering.
+    Rets:
+        buses, array, bus numbers before renumbering.
+    '''
+    case = get_case()
+    buses = case.BusIndex['reverse'][np.asarray(index, dtype=int)]
+    return buses
+
+def get_device_internal_bus_index(device):
+    '''
+    Get the renumbered bus index arrays of all devices of a type, in the order of get_all_devices.
+    The arrays are built once and kept until the buses are renumbered or a device is added.
+    Args:
+        device, str, device type.
+    Rets:
+        index, array for one-bus devices; tuple of arrays (i, j) for 'LINE' and 'HVDC', (i, j, k) for 'TRANSFORMER',
+            where k is -1 for two winding transformer.
+    '''
+    case = get_case()
+    from .apis_device import get_all_devices
+    
+    cache = case.BusIndex['device']
+    if device in cache:
+        return cache[device]
+    
+    devices = get_all_devices(device)
+    if device == 'LINE' or device == 'HVDC':
+        i = map_buses_to_internal([key[0] for key in devices])
+        j = map_buses_to_internal([key[1] for key in devices])
+        index = (i, j)
+        
+    elif device == 'TRANSFORMER':
+        i = map_buses_to_internal([key[0] for key in devices])
+        j = map_buses_to_internal([key[1] for key in devices])
+        k = np.full(len(devices), -1, dtype=int)
+        three = np.array([key[2] != 0 for key in devices], dtype=bool)
+        k[three] = map_buses_to_internal([key[2] for key in devices if key[2] != 0])
+        index = (i, j, k)
+        
+    else:
+        index = map_buses_to_internal(devices)
+    
+    cache[device] = index
+    return index
   
 def get_system_bus_number(par_type):
     '''
     Get the PQ or PV bus number in system.
-    Args: None.
+    Args: 
+        par_type, str, 'PQ', 'PV' or 'swing'.
     Rets: number, int, 
     '''
-    from .apis_device import get_all_devices, get_device_data
-    value = 0
-    if par_type == 'PQ':
-        bus_type = 1
-    elif par_type == 'PV':
-        bus_type = 2
+    partition = get_system_bus_partition()
+    if par_type == 'PQ' or par_type == 'PV' or par_type == 'swing':
+        value = partition[par_type + '_num']
     else:
-        bus_type = 0
-        
-    buses = get_all_devices('BUS')
-    for bus in buses:
-        IDE = get_device_data(bus, 'BUS', 'IDE')
-        if IDE == bus_type:
-            value = value + 1
+        value = partition['other_num']
     return value
 
+def get_system_bus_partition():
+    '''
+    Get the bus type partition in system. It is built from bus type once and kept until a bus type
+    actually changes, a bus is added or buses are renumbered. The masks follow the current bus type, 
+    so they stay right when a bus type changes without renumbering.
+    Args: None
+    Rets:
+        partition, dict, 
+            'PQ_num', 'PV_num', 'swing_num', 'other_num', int, bus number of each type, 
+            'PQ_mask', 'PV_mask', 'swing_mask', array, bool mask of each type over the renumbered buses.
+    '''
+    case = get_case()
+    if case.BusPartition:
+        return case.BusPartition
+    
+    IDE = case.BusData.get_column('IDE')
+    case.BusPartition['PQ_num'] = int(np.count_nonzero(IDE == 1))
+    case.BusPartition['PV_num'] = int(np.count_nonzero(IDE == 2))
+    case.BusPartition['swing_num'] = int(np.count_nonzero(IDE == 3))
+    case.BusPartition['other_num'] = int(np.count_nonzero(IDE == 0))
+    
+    rows = case.BusData.get_rows(case.Base.get('BusSqNum', []))
+    IDE = IDE[rows]
+    case.BusPartition['PQ_mask'] = IDE == 1
+    case.BusPartition['PV_mask'] = IDE == 2
+    case.BusPartition['swing_mask'] = IDE == 3
+    return case.BusPartition
+
 def get_system_base_data(par_name):
     '''
     Get system basic data, including based frquency, based power
@@ -129,12 +247,13 @@ def get_system_base_data(par_name):
     Rets:
         value, value of base parameter
     '''
-    par_keys = Base.keys()
+    case = get_case()
+    par_keys = case.Base.keys()
     if par_name not in par_keys:
         value = None
         print('The par_name is wrong when getting Y matrix')
     else:
-        value = Base[par_name]
+        value = case.Base[par_name]
     return value  
 
 def set_system_base_data(par_name, value):
@@ -145,56 +264,215 @@ def set_system_base_data(par_name, value):
     Rets:
         value, value of base parameter.
     '''
-    Base[par_name] = value
+    case = get_case()
+    case.Base[par_name] = value
+    if par_name == 'BusSqNum':
+        build_bus_renumber_index(value)
+    if par_name == 'BusSqNum' or par_name == 'SBASE':
+        update_network_version()
     return value  
 
+def copy_case(derived=True):
+    '''
+    Copy the active case, the copy is activated by "with case:".
+    Args:
+        derived, bool, False to drop the values derived from Y matrixes, such as factors, so that the copy can be sent to another process.
+    Rets:
+        case, Case, copied case.
+    '''
+    case = get_case().copy()
+    if derived is False:
+        case.YMatrixCache['derived'] = {}
+    return case
+
+def get_powerflow_solution():
+    '''
+    Get the last converged power flow solution.
+    Args: None
+    Rets:
+        solution, dict, {'method', 'start', 'buses', 'Um', 'Ua', 'iterations', 'flat_iterations'}, empty if no solution.
+    '''
+    case = get_case()
+    return case.PowFlowSol
+
+def set_powerflow_solution(solution):
+    '''
+    Set the last converged power flow solution.
+    Args:
+        solution, dict, {'method', 'start', 'buses', 'Um', 'Ua', 'iterations', 'flat_iterations'}, 
+            buses are in renumbered order of Um and Ua.
+    Rets: None
+    '''
+    case = get_case()
+    case.PowFlowSol = solution
+    return
+
 def get_system_Y_network_matrix(par_name):
     '''
-    Get Y matrix in database
+    Get Y matrix in database. The stored sparse matrix is returned without copy, 
+    so change it by set_system_Y_network_matrix instead of in place.
     Args:
-        par_name, str, Y matrix name, including 'powerflow', 'dynamic', 'positive', 'negetive', 'zero'
+        par_name, str, Y matrix name, including 'basic', 'B1', 'B2', 'dynamic', 'positive', 'negetive', 'zero'
     Rets:
-        Y_mat, array, Y matrix
+        Y_mat, csr_matrix, Y matrix
     '''
-    from .apis_device import get_all_devices
-    
-    buses = get_all_devices('BUS')
-    par_keys = YMatrix.keys()
+    case = get_case()
+    par_keys = case.YMatrix.keys()
     if par_name not in par_keys:
         print('The par_name is wrong when getting Y matrix')
         Y_mat = None
         
     else:
-        value = YMatrix[par_name]
-        index_values = value.index.values.tolist()
-        Y_mat = np.zeros((len(buses), len(buses)), dtype=complex)
-        for index in index_values:
-            i = int(value.loc[index]['row'])
-            j = int(value.loc[index]['column'])
-            real = value.loc[index]['real']
-            imag = value.loc[index]['imag']
-            Y_mat[i, j] = real + 1j * imag
+        Y_mat = case.YMatrix[par_name]
     return Y_mat 
 
+def get_system_Y_network_matrix_dense(par_name):
+    '''
+    Get the dense view of Y matrix in database. The view is built once for each Y matrix and is read only,
+    so copy it before changing.
+    Args:
+        par_name, str, Y matrix name, including 'basic', 'B1', 'B2', 'dynamic', 'positive', 'negetive', 'zero'
+    Rets:
+        Y_mat, array, Y matrix
+    '''
+    Y_mat = get_system_Y_network_matrix_cache(par_name, 'dense', build_read_only_dense_matrix)
+    return Y_mat 
+
+def get_system_Y_network_matrix_block(par_name, size):
+    '''
+    Get the upper left block of Y matrix, such as B' of PQ and PV buses or B'' of PQ buses. 
+    The block is built once for each Y matrix and size, and is shared, so do not change it in place.
+    Args:
+        (1) par_name, str, Y matrix name.
+        (2) size, int, block size, the buses are renumbered in order of PQ, PV and swing.
+    Rets:
+        Y_block, csr_matrix, Y matrix block.
+    '''
+    Y_block = get_system_Y_network_matrix_cache(par_name, ('block', size), lambda Y_mat: Y_mat[:size, :size].tocsr())
+    return Y_block
+
+def build_read_only_dense_matrix(Y_mat):
+    '''
+    Build a read only dense array of a sparse matrix.
+    Args:
+        Y_mat, csr_matrix, sparse matrix.
+    Rets:
+        Y_dense, array, dense matrix.
+    '''
+    Y_dense = Y_mat.toarray()
+    Y_dense.setflags(write=False)
+    return Y_dense
+
+def get_system_Y_network_matrix_cache(par_name, key, build):
+    '''
+    Get a value derived from Y matrix, such as dense view, sub block or factorization. 
+    The value is built by build(Y_mat) on the first call and kept until the Y matrix is set again.
+    Args:
+        (1) par_name, str, Y matrix name.
+        (2) key, hashable, name of the derived value.
+        (3) build, function, build the derived value from the Y matrix.
+    Rets:
+        value, derived value.
+    '''
+    case = get_case()
+    Y_mat = get_system_Y_network_matrix(par_name)
+    if Y_mat is None:
+        return
+        
+    derived = case.YMatrixCache['derived'].setdefault(par_name, {})
+    if key in derived:
+        count_system_Y_matrix_cache(par_name, True)
+        return derived[key]
+    
+    count_system_Y_matrix_cache(par_name, False)
+    value = build(Y_mat)
+    derived[key] = value
+    return value
+
+def get_system_Y_matrix_cache_statistics(par_name=None):
+    '''
+    Get hit and miss counters of Y matrix cache. A hit is a derived value or a Y matrix build reused, 
+    a miss is a derived value or a Y matrix built.
+    Args:
+        par_name, str, Y matrix name, all Y matrixes if None.
+    Rets:
+        statistics, dict, {'hit': int, 'miss': int}, or {par_name: {'hit': int, 'miss': int}} for all.
+    '''
+    case = get_case()
+    if par_name is None:
+        statistics = {name: dict(value) for name, value in case.YMatrixCache['statistics'].items()}
+    else:
+        statistics = dict(case.YMatrixCache['statistics'].get(par_name, {'hit': 0, 'miss': 0}))
+    return statistics
+
+def count_system_Y_matrix_cache(par_name, hit):
+    '''
+    Count a hit or miss of Y matrix cache.
+    Args:
+        (1) par_name, str, Y matrix name.
+        (2) hit, bool, True for hit, False for miss.
+    Rets: None
+    '''
+    case = get_case()
+    statistics = case.YMatrixCache['statistics'].setdefault(par_name, {'hit': 0, 'miss': 0})
+    if hit is True:
+        statistics['hit'] = statistics['hit'] + 1
+    else:
+        statistics['miss'] = statistics['miss'] + 1
+    return
+
+def get_network_version():
+    '''
+    Get network version, which is increased by every branch, shunt, load, bus and fault edit.
+    Args: None
+    Rets:
+        version, int, network version.
+    '''
+    case = get_case()
+    version = case.YMatrixCache['version']
+    return version
+
+def update_network_version():
+    '''
+    Increase network version after a network edit, so Y matrixes built before are out of date.
+    Args: None
+    Rets: None
+    '''
+    case = get_case()
+    case.YMatrixCache['version'] = case.YMatrixCache['version'] + 1
+    return
+
+def is_system_Y_network_matrix_current(par_name):
+    '''
+    Check whether Y matrix is built at the current network version.
+    Args:
+        par_name, str, Y matrix name.
+    Rets:
+        value, bool, True if Y matrix is up to date.
+    '''
+    case = get_case()
+    value = case.YMatrixCache['stamp'].get(par_name) == case.YMatrixCache['version']
+    return value
+
 def set_system_Y_network_matrix(par_name, Y_mat):
     '''
     Set Y matrix in database
     Args:
-        (1) par_name, str, Y matrix name, including 'basic', 'dynamic', 'positive', 'negetive', 'zero'
-        (2) Y_mat, array, Y matrix
+        (1) par_name, str, Y matrix name, including 'basic', 'B1', 'B2', 'dynamic', 'positive', 'negetive', 'zero'
+        (2) Y_mat, array or sparse matrix, Y matrix
     Rets: None
     '''
-    YMatrix[par_name].drop(YMatrix[par_name].index, inplace=True)
-    n = Y_mat.shape[0]
-    a = 0
-    value = YMatrix[par_name]
-    for i in range(n):
-        for j in range(n):
-            if Y_mat[i, j] != 0:
-                value.loc[a] = [i, j, Y_mat[i, j].real, Y_mat[i, j].imag]
-                a = a + 1
-    
-    value['row'] = value['row'].astype('int')
-    value['column'] = value['column'].astype('int')
+    case = get_case()
+    par_keys = case.YMatrix.keys()
+    if par_name not in par_keys:
+        print('The par_name is wrong when setting Y matrix')
+        return
+        
+    Y_mat = sp.csr_matrix(Y_mat, copy=True)
+    Y_mat.eliminate_zeros()
+    Y_mat.sort_indices()
+    case.YMatrix[par_name] = Y_mat
+    case.YMatrixCache['stamp'][par_name] = case.YMatrixCache['version']
+    case.YMatrixCache['derived'].pop(par_name, None)
     return  
     
\ No newline at end of file
@@ -4,8 +4,26 @@ sys.path.append('..')
 from .parse_psse_pf import init_powerflow_data
 from .parse_psse_sq import init_sequence_data
 from .parse_psse_dm import init_dynamic_data
+from . import case_cache
 
-def load_simulation_data(file, par_type):
+def load_simulation_data(file, par_type, use_cache=True):
+    '''
+    Load raw, seq, dyr data. The parsed data is saved to a binary cache next to the file and reused while the file is unchanged.
+    Args:
+        (1) file, str, file path.
+        (2) par_type, file type, 'powerflow' for .raw data, 'sequence' for .seq data, 'dynamic' for .dyr data.
+        (3) use_cache, bool, use the binary case cache if the case holds no data of the file type.
+    Rets: None
+    '''
+    if par_type not in ('powerflow', 'sequence', 'dynamic'):
+        return
+    
+    use_cache = use_cache and case_cache.is_case_empty(par_type)
+    if use_cache:
+        file_hash = case_cache.get_file_hash(file)
+        if case_cache.load_case_cache(file, par_type, file_hash):
+            return
+    
     if par_type == 'powerflow':
         init_powerflow_data(file)
 
@@ -15,7 +33,6 @@ def load_simulation_data(file, par_type):
     elif par_type == 'dynamic':
         init_dynamic_data(file)
         
-    else:
-        pass
+    if use_cache:
+        case_cache.save_case_cache(file, par_type, file_hash)
     return
-    
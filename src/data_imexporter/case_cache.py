@@ -0,0 +1,199 @@
+# Binary case cache
+# A parsed raw/seq/dyr file is saved next to the source as <file>.cache.npz. The columns of a device table with the same 
+# dtype are stacked into one 2-D array, so a table is read with one or two zip members, and a json meta entry keeps the
+# device keys and column order. The cache is keyed by the sha256 of the source file, so an edited file is parsed again.
+import sys
+sys.path.append('..')
+import os
+import json
+import hashlib
+import numpy as np
+
+import apis
+from apis import apis_system
+from apis.apis_device import get_device_table
+from apis.apis_sequence import get_device_sequence_table
+
+from .parse_psse_pf import check_network, renumber_bus_node
+from .parse_psse_sq import init_bus_sequence_voltage
+
+CACHE_VERSION = 2
+
+CACHE_DEVICES = {'powerflow': ('BUS', 'LOAD', 'SHUNT', 'GENERATOR', 'WT GENERATOR', 'PV UNIT', 'LINE', 'TRANSFORMER', 'HVDC'),
+    'sequence': ('GENERATOR', 'LOAD', 'LINE', 'TRANSFORMER', 'SHUNT'),
+    'dynamic': ()}
+
+CACHE_MODELS = {'powerflow': (), 'sequence': (), 'dynamic': ('GEN', 'AVR', 'GOV')}
+
+
+def get_cache_file(file):
+    '''
+    Get the cache file path of a source file.
+    Args:
+        file, str, source data file.
+    Rets:
+        cache_file, str, cache file path.
+    '''
+    cache_file = file + '.cache.npz'
+    return cache_file
+
+def get_file_hash(file):
+    '''
+    Get the sha256 hash of a source file.
+    Args:
+        file, str, source data file.
+    Rets:
+        file_hash, str, hex digest of file content.
+    '''
+    with open(file, 'rb') as f:
+        file_hash = hashlib.sha256(f.read()).hexdigest()
+    return file_hash
+
+def get_cache_table(device, par_type):
+    '''
+    Get the device table cached for a file type.
+    Args:
+        (1) device, str, device type.
+        (2) par_type, str, file type, 'powerflow', 'sequence' or 'dynamic'.
+    Rets:
+        table, DeviceTable, device data table.
+    '''
+    if par_type == 'sequence':
+        return get_device_sequence_table(device)
+    return get_device_table(device)
+
+def is_case_empty(par_type):
+    '''
+    Check whether the data of a file type is empty in the active case, only then the cache is used.
+    Args:
+        par_type, str, file type, 'powerflow', 'sequence' or 'dynamic'.
+    Rets:
+        flag, bool, True if no device or model of the file type is loaded.
+    '''
+    for device in CACHE_DEVICES[par_type]:
+        if len(get_cache_table(device, par_type)) != 0:
+            return False
+    for model_type in CACHE_MODELS[par_type]:
+        if apis.get_generator_related_models(model_type):
+            return False
+    return True
+
+def encode_key(key):
+    '''
+    Convert a device key to json value, tuple key is stored as list.
+    '''
+    if isinstance(key, tuple):
+        return [encode_key(item) for item in key]
+    if isinstance(key, np.generic):
+        return key.item()
+    return key
+
+def decode_key(key):
+    '''
+    Convert a json value back to device key, list is restored as tuple.
+    '''
+    if isinstance(key, list):
+        return tuple(decode_key(item) for item in key)
+    return key
+
+def save_case_cache(file, par_type, file_hash=None):
+    '''
+    Save the data parsed from a file to its cache file. If the cache file can not be written, it is skipped.
+    Args:
+        (1) file, str, source data file.
+        (2) par_type, str, file type, 'powerflow', 'sequence' or 'dynamic'.
+        (3) file_hash, str, sha256 of the source file, computed if None.
+    Rets: None
+    '''
+    if file_hash is None:
+        file_hash = get_file_hash(file)
+
+    meta = {'version': CACHE_VERSION, 'hash': file_hash, 'par_type': par_type, 'base': {}, 'keys': {}, 'columns': {}, 'models': {}}
+    arrays = {}
+    if par_type == 'powerflow':
+        meta['base']['SBASE'] = apis_system.get_system_base_data('SBASE')
+        meta['base']['BASFRQ'] = apis_system.get_system_base_data('BASFRQ')
+
+    for device in CACHE_DEVICES[par_type]:
+        table = get_cache_table(device, par_type)
+        meta['keys'][device] = [encode_key(key) for key in table.get_keys()]
+        meta['columns'][device] = {}
+        for column in table.columns:
+            dtype = table.dtypes[column].str
+            meta['columns'][device].setdefault(dtype, []).append(column)
+        for dtype, columns in meta['columns'][device].items():
+            arrays[device + '/' + dtype] = np.stack([table.get_column(column) for column in columns])
+
+    for model_type in CACHE_MODELS[par_type]:
+        model_data = apis.get_generator_related_models(model_type)
+        meta['models'][model_type] = [[encode_key(generator), model_data[generator]] for generator in model_data.keys()]
+
+    arrays['meta'] = np.array(json.dumps(meta, default=encode_key))
+    cache_file = get_cache_file(file)
+    tmp_file = cache_file + '.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError) as error:
+        print('Failed to save case cache {}: {}'.format(cache_file, error))
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return
+
+def load_case_cache(file, par_type, file_hash=None):
+    '''
+    Load the data of a file from its cache file. The cache is used only if it is built from the same file content.
+    Args:
+        (1) file, str, source data file.
+        (2) par_type, str, file type, 'powerflow', 'sequence' or 'dynamic'.
+        (3) file_hash, str, sha256 of the source file, computed if None.
+    Rets:
+        flag, bool, True if the data is loaded from cache.
+    '''
+    cache_file = get_cache_file(file)
+    if not os.path.exists(cache_file):
+        return False
+    if file_hash is None:
+        file_hash = get_file_hash(file)
+
+    try:
+        with np.load(cache_file, allow_pickle=False) as cache:
+            meta = json.loads(str(cache['meta']))
+            if meta['version'] != CACHE_VERSION or meta['hash'] != file_hash or meta['par_type'] != par_type:
+                return False
+            arrays = {name: cache[name] for name in cache.files if name != 'meta'}
+    except (OSError, KeyError, ValueError) as error:
+        print('Failed to load case cache {}: {}'.format(cache_file, error))
+        return False
+
+    if par_type == 'powerflow':
+        apis_system.set_system_base_data('SBASE', meta['base']['SBASE'])
+        apis_system.set_system_base_data('BASFRQ', meta['base']['BASFRQ'])
+
+    for device in CACHE_DEVICES[par_type]:
+        keys = [decode_key(key) for key in meta['keys'][device]]
+        data = {}
+        for dtype, columns in meta['columns'][device].items():
+            block = arrays[device + '/' + dtype]
+            for k in range(len(columns)):
+                data[columns[k]] = block[k]
+        if par_type == 'sequence':
+            apis.add_device_sequence_models(keys, device, data)
+        else:
+            apis.add_devices(keys, device, data)
+
+    for model_type in CACHE_MODELS[par_type]:
+        for generator, pars in meta['models'][model_type]:
+            generator = decode_key(generator)
+            apis.add_generator_related_model(generator, model_type)
+            for par_name, value in pars.items():
+                apis.set_generator_related_model_data(generator, model_type, par_name, value)
+
+    if par_type == 'powerflow':
+        check_network()
+        renumber_bus_node()
+
+    elif par_type == 'sequence':
+        init_bus_sequence_voltage()
+    return True
@@ -1,6 +1,7 @@
 # 解析PSSE的dyr动态模型文件
 import sys
 sys.path.append('..')
+import re
 import apis
 
 
@@ -11,7 +12,7 @@ def init_dynamic_data(file):
         file, str, dynamic model data dyr file.
     Rets: None
     '''
-    models_data = read_psse_dyr(file)
+    models_data = iterate_psse_dyr(file)
     
     generator_models_data, exciter_models_data, turbine_governor_models_data = separate_model_data(models_data)
     
@@ -23,6 +24,8 @@ def init_dynamic_data(file):
     
     return
 
+DYR_TOKEN = re.compile(r"'[^']*'|\"[^\"]*\"|/|[^\s,/'\"]+")  # Quoted string, record end or plain token
+
 def read_psse_dyr(file):
     '''
     Read the transient model data file and do the preliminary processing.
@@ -31,26 +34,47 @@ def read_psse_dyr(file):
     Rets: 
         models_data, list, dyr model data.
     '''
-    dyr_lines_data = ''
-    with open(file, encoding = 'utf-8') as f:
-        while True:
-            text = f.readline().rstrip('\n')
-            if not text:
-                break
-            dyr_lines_data = dyr_lines_data + text
-            
-    model_dyr_data = dyr_lines_data.split('/')[:-1]
-    
-    models_data = []
-    for i in range(len(model_dyr_data)):
-        tmp_data = model_dyr_data[i].split(' ')
-        data = []
-        for item in tmp_data:
-            if len(item) != 0:
-                data.append(eval(item))
-        models_data.append(data)
+    models_data = list(iterate_psse_dyr(file))
     return models_data
 
+def iterate_psse_dyr(file):
+    '''
+    Read the transient model data file record by record, a record may take several lines and ends with '/'.
+    Tokens are separated by blank or comma, quoted token is converted to str and the others to int or float.
+    Args:
+        file, str, dynamic model data dyr file.
+    Rets: 
+        generator of model data, list of tokens of a model record.
+    '''
+    data = []
+    with open(file, encoding = 'utf-8') as f:
+        for text in f:
+            for token in DYR_TOKEN.findall(text):
+                if token == '/':
+                    if data:
+                        yield data
+                    data = []
+                else:
+                    data.append(convert_dyr_token(token))
+    return
+
+def convert_dyr_token(token):
+    '''
+    Convert a dyr token to value.
+    Args:
+        token, str, dyr token.
+    Rets:
+        value, str for quoted token, int or float for number, otherwise the token itself.
+    '''
+    if token[0] == "'" or token[0] == '"':
+        return token[1:-1]
+    if token.isdigit() or (token[0] in '+-' and token[1:].isdigit()):
+        return int(token)
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
 def separate_model_data(models_data):
     '''
     Separate generator, exciter and governor model data.
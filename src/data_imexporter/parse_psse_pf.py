@@ -1,5 +1,6 @@
 import sys
 sys.path.append('..')
+import numpy as np
 
 import apis
 from apis import apis_system
@@ -12,16 +13,11 @@ def init_powerflow_data(file):
         file, str, power flow raw file.
     Rets: None
     '''
-    data, index, a = [], [], 0
     with open(file) as f:
-        while True:
-            text = f.readline().rstrip('\n')
-            if not text:
-                break
-            if text[0] == '0' and text[1] == ' ' and a > 2: 
-                index.append(a)
-            data.append(text)
-            a = a + 1
+        data = f.read().split('\n')
+    if '' in data:  # Data ends at the first empty line
+        data = data[:data.index('')]
+    index = [a for a in range(3, len(data)) if data[a][:2] == '0 ']  # Section end lines
     
     parse_rate(data[0])
     
@@ -50,45 +46,66 @@ def check_network():
     Args: None
     Rets: None
     '''
-    wt_generators = apis.get_all_devices('WT GENERATOR')
-    for wt_generator in wt_generators:
-        IDE = apis.get_device_data(wt_generator, 'BUS', 'IDE')
-        if IDE == 2:
-            apis.set_device_data(wt_generator, 'BUS', 'IDE', 1)
-            
-    pv_units = apis.get_all_devices('PV UNIT')
-    for pv_unit in pv_units:
-        IDE = apis.get_device_data(pv_unit, 'BUS', 'IDE')
-        if IDE == 2:
-            apis.set_device_data(pv_unit, 'BUS', 'IDE', 1)    
-
+    for device in ('WT GENERATOR', 'PV UNIT'):
+        buses = apis.get_all_devices(device)
+        if len(buses) == 0:
+            continue
+        IDE = apis.get_device_data_array('BUS', 'IDE', buses)
+        PV = IDE == 2
+        if PV.any():
+            IDE[PV] = 1
+            apis.set_device_data_array('BUS', 'IDE', IDE, buses)
     return
 
 def renumber_bus_node():
     '''
-    Renumber bus node.
+    Renumber bus node in order of PQ, PV and swing bus.
     Args: None
     Rets：None
     '''
-    PQ = []
-    PV = []
-    swing = []
-    buses = apis.get_all_devices('BUS')
-    for bus in buses:
-        IDE = apis.get_device_data(bus, 'BUS', 'IDE')
-        if IDE == 1:
-            PQ.append(bus)
-        elif IDE == 2:
-            PV.append(bus)
-        elif IDE == 3:
-            swing.append(bus)
-        else:
-            pass
-    
-    node = PQ + PV + swing
-    apis_system.set_system_base_data('BusSqNum', node)
+    buses = np.array(apis.get_all_devices('BUS'), dtype=int)
+    IDE = apis.get_device_data_array('BUS', 'IDE')
+    node = np.concatenate((buses[IDE == 1], buses[IDE == 2], buses[IDE == 3]))
+    apis_system.set_system_base_data('BusSqNum', node.tolist())
     return 
 
+def split_records(data):
+    '''
+    Split records of a section into tokens.
+    Args:
+        data, list, section lines.
+    Rets:
+        records, list, tokens of each line.
+    '''
+    records = [item.split(',') for item in data]
+    return records
+
+def get_column(records, k, dtype=float):
+    '''
+    Get a column of section records as array.
+    Args:
+        (1) records, list, tokens of each line.
+        (2) k, int, token position.
+        (3) dtype, column data type.
+    Rets:
+        column, array, column values.
+    '''
+    column = np.array([record[k] for record in records], dtype=dtype)
+    return column
+
+def parse_string(token):
+    '''
+    Parse a quoted string token, such as circuit identifier.
+    Args:
+        token, str, token.
+    Rets:
+        value, str or int, unquoted string, int if token is not quoted.
+    '''
+    token = token.strip()
+    if len(token) >= 2 and token[0] == token[-1] and token[0] in '\'"':
+        return token[1:-1]
+    return int(token)
+
 def parse_rate(data):
     '''
     Parse system base reference capacity and reference frequency
@@ -108,15 +125,10 @@ def parse_bus(data):
         data, list, bus data.
     Rets: None
     '''
-    for item in data:
-        temp = item.split(',')  
-        device_index = int(temp[0]) 
-        apis.add_device(device_index, 'BUS')
-        
-        apis.set_device_data(device_index, 'BUS', 'BASKV', float(temp[2]))
-        apis.set_device_data(device_index, 'BUS', 'IDE', int(temp[3]))
-        apis.set_device_data(device_index, 'BUS', 'VM', float(temp[7]))
-        apis.set_device_data(device_index, 'BUS', 'VA', float(temp[8]))
+    records = split_records(data)
+    device_index = [int(record[0]) for record in records]
+    apis.add_devices(device_index, 'BUS', {'BASKV': get_column(records, 2), 'IDE': get_column(records, 3, int), 
+        'VM': get_column(records, 7), 'VA': get_column(records, 8), 'NVHI': get_column(records, 9), 'NVLO': get_column(records, 10)})
     return
 
 def parse_load(data):
@@ -126,13 +138,9 @@ def parse_load(data):
         data, list, load data.
     Rets: None
     '''
-    for item in data:
-        temp = item.split(',')
-        device_index = int(temp[0])
-        apis.add_device(device_index, 'LOAD')
-        
-        apis.set_device_data(device_index, 'LOAD', 'PL', float(temp[5]))
-        apis.set_device_data(device_index, 'LOAD', 'QL', float(temp[6]))        
+    records = split_records(data)
+    device_index = [int(record[0]) for record in records]
+    apis.add_devices(device_index, 'LOAD', {'PL': get_column(records, 5), 'QL': get_column(records, 6)})
     return    
 
 def parse_shunt(data):
@@ -142,64 +150,30 @@ def parse_shunt(data):
         data, list, shunt data.
     Rets: None
     '''
-    for item in data:
-        temp = item.split(',')
-        device_index = int(temp[0])
-        apis.add_device(device_index, 'SHUNT') 
-        apis.set_device_data(device_index, 'SHUNT', 'BL', float(temp[4]))        
+    records = split_records(data)
+    device_index = [int(record[0]) for record in records]
+    apis.add_devices(device_index, 'SHUNT', {'BL': get_column(records, 4)})
     return
 
 def parse_generator(data):
     '''
     Parse data of generator steady state model and add to the database.
+    The generator type is given by WMOD, 0 for generator, 2 for photovoltaic unit and 3 for wind turbine generator.
     Args:
         data, list, generator data.
     Rets: None
     '''
-    for item in data:
-        temp = item.split(',')
-        device_index = int(temp[0])
-        
-        if int(temp[26]) == 3:
-            apis.add_device(device_index, 'WT GENERATOR')
-            apis.set_device_data(device_index, 'WT GENERATOR', 'PG', float(temp[2]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'QG', float(temp[3]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'QT', float(temp[4]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'QB', float(temp[5]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'VS', float(temp[6]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'MBASE', float(temp[8]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'ZR', float(temp[9]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'ZX', float(temp[10]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'PT', float(temp[16]))
-            apis.set_device_data(device_index, 'WT GENERATOR', 'PB', float(temp[17]))   
-            
-        elif int(temp[26]) == 2:    
-            apis.add_device(device_index, 'PV UNIT')
-            apis.set_device_data(device_index, 'PV UNIT', 'PG', float(temp[2]))
-            apis.set_device_data(device_index, 'PV UNIT', 'QG', float(temp[3]))
-            apis.set_device_data(device_index, 'PV UNIT', 'QT', float(temp[4]))
-            apis.set_device_data(device_index, 'PV UNIT', 'QB', float(temp[5]))
-            apis.set_device_data(device_index, 'PV UNIT', 'VS', float(temp[6]))
-            apis.set_device_data(device_index, 'PV UNIT', 'MBASE', float(temp[8]))
-            apis.set_device_data(device_index, 'PV UNIT', 'ZR', float(temp[9]))
-            apis.set_device_data(device_index, 'PV UNIT', 'ZX', float(temp[10]))
-            apis.set_device_data(device_index, 'PV UNIT', 'PT', float(temp[16]))
-            apis.set_device_data(device_index, 'PV UNIT', 'PB', float(temp[17]))   
-            
-        elif int(temp[26]) == 0:              
-            apis.add_device(device_index, 'GENERATOR')
-            apis.set_device_data(device_index, 'GENERATOR', 'PG', float(temp[2]))
-            apis.set_device_data(device_index, 'GENERATOR', 'QG', float(temp[3]))
-            apis.set_device_data(device_index, 'GENERATOR', 'QT', float(temp[4]))
-            apis.set_device_data(device_index, 'GENERATOR', 'QB', float(temp[5]))
-            apis.set_device_data(device_index, 'GENERATOR', 'VS', float(temp[6]))
-            apis.set_device_data(device_index, 'GENERATOR', 'MBASE', float(temp[8]))
-            apis.set_device_data(device_index, 'GENERATOR', 'ZR', float(temp[9]))
-            apis.set_device_data(device_index, 'GENERATOR', 'ZX', float(temp[10]))
-            apis.set_device_data(device_index, 'GENERATOR', 'PT', float(temp[16]))
-            apis.set_device_data(device_index, 'GENERATOR', 'PB', float(temp[17]))   
-        else:   
-            pass
+    records = split_records(data)
+    devices = {0: 'GENERATOR', 2: 'PV UNIT', 3: 'WT GENERATOR'}
+    for WMOD, device in devices.items():
+        device_records = [record for record in records if int(record[26]) == WMOD]
+        if len(device_records) == 0:
+            continue
+        device_index = [int(record[0]) for record in device_records]
+        apis.add_devices(device_index, device, {'PG': get_column(device_records, 2), 'QG': get_column(device_records, 3), 
+            'QT': get_column(device_records, 4), 'QB': get_column(device_records, 5), 'VS': get_column(device_records, 6), 
+            'MBASE': get_column(device_records, 8), 'ZR': get_column(device_records, 9), 'ZX': get_column(device_records, 10), 
+            'PT': get_column(device_records, 16), 'PB': get_column(device_records, 17)})
     return
 
 def parse_line(data):
@@ -209,136 +183,67 @@ def parse_line(data):
         data, list, line data.
     Rets: None
     '''
-    for item in data:
-        temp = item.split(',')
-        device_index = (int(temp[0]), int(temp[1]), eval(temp[2]))
-        apis.add_device(device_index, 'LINE')
-        apis.set_device_data(device_index, 'LINE', 'R', float(temp[3]))
-        apis.set_device_data(device_index, 'LINE', 'X', float(temp[4]))
-        apis.set_device_data(device_index, 'LINE', 'B', float(temp[5]))
-        apis.set_device_data(device_index, 'LINE', 'BI', float(temp[10]))
-        apis.set_device_data(device_index, 'LINE', 'BJ', float(temp[12]))
+    records = split_records(data)
+    device_index = [(int(record[0]), int(record[1]), parse_string(record[2])) for record in records]
+    apis.add_devices(device_index, 'LINE', {'R': get_column(records, 3), 'X': get_column(records, 4), 'B': get_column(records, 5),
+        'BI': get_column(records, 10), 'BJ': get_column(records, 12), 'RATEA': get_column(records, 6)})
     return
 
 def parse_transformer(data):
     '''
     Parse data of transformer steady state model and add to the database.
+    A two winding transformer takes 4 lines and a three winding transformer takes 5 lines, 
+    the three winding data of a two winding transformer is left 0.
     Args:
         data, list, transformer data.
     Rets: None
     '''
-    data = iter(data)  
-    for item in data:
-        rows = [item]
-        rows.append(next(data))  
-        rows.append(next(data))
-        rows.append(next(data))
-        if int(item.split(',')[2]) != 0:  
-            rows.append(next(data))
-        
-        if len(rows) == 4:  # Two winding transformer
-            temp = rows[0].split(',')
-            device_index = (int(temp[0]), int(temp[1]), int(temp[2]))
-            apis.add_device(device_index, 'TRANSFORMER')
-            
-            apis.set_device_data(device_index, 'TRANSFORMER', 'MAG1', float(temp[7]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'MAG2', float(temp[8]))
-            
-            temp = rows[1].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'R1_2', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'X1_2', float(temp[1]))            
-            apis.set_device_data(device_index, 'TRANSFORMER', 'SBASE1_2', float(temp[2]))
-            
-            temp = rows[2].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'WINDV1', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'NOMV1', float(temp[1]))
-
-            temp = rows[3].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'WINDV2', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'NOMV2', float(temp[1]))
-
-        else:  # Three winding transformer
-            temp = rows[0].split(',')
-            device_index = (int(temp[0]), int(temp[1]), int(temp[2]))
-            apis.add_device(device_index, 'TRANSFORMER')
-            
-            apis.set_device_data(device_index, 'TRANSFORMER', 'MAG1', float(temp[7]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'MAG2', float(temp[8]))
-            
-            temp = rows[1].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'R1_2', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'X1_2', float(temp[1]))            
-            apis.set_device_data(device_index, 'TRANSFORMER', 'SBASE1_2', float(temp[2]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'R2_3', float(temp[3])) 
-            apis.set_device_data(device_index, 'TRANSFORMER', 'X2_3', float(temp[4]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'SBASE2_3', float(temp[5])) 
-            apis.set_device_data(device_index, 'TRANSFORMER', 'R3_1', float(temp[6]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'X3_1', float(temp[7])) 
-            apis.set_device_data(device_index, 'TRANSFORMER', 'SBASE3_1', float(temp[8]))
-            
-            temp = rows[2].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'WINDV1', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'NOMV1', float(temp[1]))
-            
-            temp = rows[3].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'WINDV2', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'NOMV2', float(temp[1])) 
-
-            temp = rows[4].split(',')
-            apis.set_device_data(device_index, 'TRANSFORMER', 'WINDV3', float(temp[0]))
-            apis.set_device_data(device_index, 'TRANSFORMER', 'NOMV3', float(temp[1])) 
+    heads, impedances, windings1, windings2, windings3 = [], [], [], [], []
+    k = 0
+    while k < len(data):
+        temp = data[k].split(',')
+        heads.append(temp)
+        windings1.append(data[k+2].split(','))
+        windings2.append(data[k+3].split(','))
+        if int(temp[2]) != 0:  # Three winding transformer
+            impedances.append(data[k+1].split(','))
+            windings3.append(data[k+4].split(','))
+            k = k + 5
+        else:  # Two winding transformer
+            impedances.append(data[k+1].split(',')[:3] + ['0'] * 6)
+            windings3.append(['0', '0'])
+            k = k + 4
+    
+    device_index = [(int(temp[0]), int(temp[1]), int(temp[2])) for temp in heads]
+    apis.add_devices(device_index, 'TRANSFORMER', {'MAG1': get_column(heads, 7), 'MAG2': get_column(heads, 8),
+        'R1_2': get_column(impedances, 0), 'X1_2': get_column(impedances, 1), 'SBASE1_2': get_column(impedances, 2),
+        'R2_3': get_column(impedances, 3), 'X2_3': get_column(impedances, 4), 
+        'SBASE2_3': get_column(impedances, 5), 'R3_1': get_column(impedances, 6), 
+        'X3_1': get_column(impedances, 7), 'SBASE3_1': get_column(impedances, 8),
+        'WINDV1': get_column(windings1, 0), 'NOMV1': get_column(windings1, 1), 
+        'WINDV2': get_column(windings2, 0), 'NOMV2': get_column(windings2, 1), 
+        'WINDV3': get_column(windings3, 0), 'NOMV3': get_column(windings3, 1), 'RATA1': get_column(windings1, 3)})
     return
 
 def parse_hvdc(data):
     '''
-    Parse data of hvdc steady state model and add to the database.
+    Parse data of hvdc steady state model and add to the database, every hvdc takes 3 lines.
     Args:
         data, list, hvdc data.
     Rets: None
     '''
     if len(data) == 0:
         return
-    k = 0
-    while True:
-
-        row1 = data[k].split(',')
-        row2 = data[k+1].split(',')
-        row3 = data[k+2].split(',')
-        
-        device_index = (int(row2[0]), int(row3[0]))
-        apis.add_device(device_index, 'HVDC')
-
-        apis.set_device_data(device_index, 'HVDC', 'RDC', float(row1[2]))
-        apis.set_device_data(device_index, 'HVDC', 'SETVL', float(row1[3]))
-        apis.set_device_data(device_index, 'HVDC', 'VSCHD', float(row1[4]))
-        
-        apis.set_device_data(device_index, 'HVDC', 'NBR', int(row2[1]))
-        apis.set_device_data(device_index, 'HVDC', 'ANMXR', float(row2[2]))
-        apis.set_device_data(device_index, 'HVDC', 'ANMNR', float(row2[3]))
-        apis.set_device_data(device_index, 'HVDC', 'RCR', float(row2[4]))        
-        apis.set_device_data(device_index, 'HVDC', 'XCR', float(row2[5]))
-        apis.set_device_data(device_index, 'HVDC', 'EBASR', float(row2[6]))
-        apis.set_device_data(device_index, 'HVDC', 'TRR', float(row2[7]))
-        apis.set_device_data(device_index, 'HVDC', 'TAPR', float(row2[8]))
-        apis.set_device_data(device_index, 'HVDC', 'TMXR', float(row2[9]))
-        apis.set_device_data(device_index, 'HVDC', 'TMNR', float(row2[10]))        
-        apis.set_device_data(device_index, 'HVDC', 'STPR', float(row2[11]))
-        apis.set_device_data(device_index, 'HVDC', 'XCAPR', float(row2[16]))
-        
-        apis.set_device_data(device_index, 'HVDC', 'NBI', int(row3[1]))
-        apis.set_device_data(device_index, 'HVDC', 'ANMXI', float(row3[2]))
-        apis.set_device_data(device_index, 'HVDC', 'ANMNI', float(row3[3]))
-        apis.set_device_data(device_index, 'HVDC', 'RCI', float(row3[4]))        
-        apis.set_device_data(device_index, 'HVDC', 'XCI', float(row3[5]))
-        apis.set_device_data(device_index, 'HVDC', 'EBASI', float(row3[6]))
-        apis.set_device_data(device_index, 'HVDC', 'TRI', float(row3[7]))
-        apis.set_device_data(device_index, 'HVDC', 'TAPI', float(row3[8]))
-        apis.set_device_data(device_index, 'HVDC', 'TMXI', float(row3[9]))
-        apis.set_device_data(device_index, 'HVDC', 'TMNI', float(row3[10]))        
-        apis.set_device_data(device_index, 'HVDC', 'STPI', float(row3[11]))
-        apis.set_device_data(device_index, 'HVDC', 'XCAPI', float(row3[16]))        
-        
-        k = k + 3
-        if k >= len(data):
-            break
-    return
\ No newline at end of file
+    rows1 = split_records(data[0::3])
+    rows2 = split_records(data[1::3])
+    rows3 = split_records(data[2::3])
+    
+    device_index = [(int(row2[0]), int(row3[0])) for row2, row3 in zip(rows2, rows3)]
+    apis.add_devices(device_index, 'HVDC', {'RDC': get_column(rows1, 2), 'SETVL': get_column(rows1, 3), 'VSCHD': get_column(rows1, 4),
+        'NBR': get_column(rows2, 1, int), 'ANMXR': get_column(rows2, 2), 'ANMNR': get_column(rows2, 3), 'RCR': get_column(rows2, 4),
+        'XCR': get_column(rows2, 5), 'EBASR': get_column(rows2, 6), 'TRR': get_column(rows2, 7), 'TAPR': get_column(rows2, 8),
+        'TMXR': get_column(rows2, 9), 'TMNR': get_column(rows2, 10), 'STPR': get_column(rows2, 11), 'XCAPR': get_column(rows2, 16),
+        'NBI': get_column(rows3, 1, int), 'ANMXI': get_column(rows3, 2), 'ANMNI': get_column(rows3, 3), 'RCI': get_column(rows3, 4),
+        'XCI': get_column(rows3, 5), 'EBASI': get_column(rows3, 6), 'TRI': get_column(rows3, 7), 'TAPI': get_column(rows3, 8),
+        'TMXI': get_column(rows3, 9), 'TMNI': get_column(rows3, 10), 'STPI': get_column(rows3, 11), 'XCAPI': get_column(rows3, 16)})
+    return
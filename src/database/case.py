@@ -0,0 +1,171 @@
+# Simulation case
+# A case holds all the imported data, network matrixes, solution parameters and dynamic states of one system.
+# Every thread has a stack of active cases, the apis work on the case on top of the stack.
+import copy
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from .device_table import DeviceTable
+from .dynamic_state import DynamicState
+
+
+class Case():
+    '''
+    Simulation case. Activate it with "with case:" to let the apis work on it in the current thread.
+    A case must not be activated in two threads at the same time.
+    '''
+    def __init__(self):
+        self.Base = {}  # System base data
+
+        self.BusIndex = {'forward': {}, 'reverse': np.zeros(0, dtype=int), 'sorted_bus': np.zeros(0, dtype=int), 
+            'sorted_internal': np.zeros(0, dtype=int), 'device': {}}  # Bus renumbering index, built when BusSqNum is set
+
+        self.BusPartition = {}  # Bus type partition, cleared when a bus type changes and rebuilt on next use
+
+        self.YMatrix = {'basic': sp.csr_matrix((0, 0), dtype=complex), 
+            'B1': sp.csr_matrix((0, 0)),
+            'B2': sp.csr_matrix((0, 0)),
+            'dynamic': sp.csr_matrix((0, 0), dtype=complex),
+            'positive': sp.csr_matrix((0, 0), dtype=complex),
+            'negative': sp.csr_matrix((0, 0), dtype=complex),
+            'zero': sp.csr_matrix((0, 0), dtype=complex)}  # Network matrix in CSR format
+
+        # Network version is increased by branch, shunt, load, bus and fault edits. Each Y matrix is stamped with the version 
+        # it is built at, and values derived from a Y matrix (dense view, blocks, factors) are kept until the matrix is set again.
+        self.YMatrixCache = {'version': 0, 'stamp': {}, 'derived': {}, 'statistics': {}}
+
+        # Power flow solution parameter. NR Jacobian is rebuilt by 'jacobian_update', 'always', 'interval' for every 'jacobian_interval' 
+        # iterations or a growing mismatch, or 'ratio' when the mismatch reduction ratio is larger than 'jacobian_ratio'; NR 'step' is 'newton' or 'iwamoto'.
+        self.PowFlowPar = {'k_max': 20, 'max_err': 0.00001, 'process': False, 
+            'linear_solver': 'auto', 'ordering': 'COLAMD', 'dense_size': 50,
+            'jacobian_update': 'always', 'jacobian_interval': 3, 'jacobian_ratio': 0.5, 'step': 'newton'}
+
+        self.PowFlowSol = {}  # Last converged power flow solution, used as warm start
+
+        self.DynSimPar = {'current_time': 0.000, 'time_step': 0.001, 'output_file': '', 'meter': []}
+
+        # The following storage power flow model data
+        self.BusData = DeviceTable(('BASKV', 'IDE', 'VM', 'VA', 'NVHI', 'NVLO'), dtypes={'IDE': int}, 
+            defaults={'BASKV': 100.0, 'IDE': 0, 'VM': 1.0, 'VA': 0.0, 'NVHI': 1.1, 'NVLO': 0.9}) 
+
+        self.LoadData = DeviceTable(('PL', 'QL'))
+
+        self.ShuntData = DeviceTable(('BL', ))
+
+        self.GenData = DeviceTable(('PG', 'QG', 'QT' ,'QB' ,'VS', 'MBASE', 'ZR', 'ZX', 'PT', 'PB'))
+
+        self.LineData = DeviceTable(('R', 'X', 'B', 'BI', 'BJ', 'RATEA'))
+
+        self.TransData = DeviceTable(('MAG1', 'MAG2', 'R1_2', 'X1_2', 'SBASE1_2','R2_3',
+            'X2_3', 'SBASE2_3', 'R3_1', 'X3_1', 'SBASE3_1', 'WINDV1', 'NOMV1', 'WINDV2', 'NOMV2', 'WINDV3', 'NOMV3', 'RATA1'))
+
+        self.HvdcData = DeviceTable(('RDC', 'SETVL', 'VSCHD', 
+            'NBR', 'ANMXR', 'ANMNR', 'RCR', 'XCR', 'EBASR', 'TRR', 'TAPR', 'TMXR', 'TMNR', 'STPR', 'XCAPR',
+            'NBI', 'ANMXI', 'ANMNI', 'RCI', 'XCI', 'EBASI', 'TRI', 'TAPI', 'TMXI', 'TMNI', 'STPI', 'XCAPI',), dtypes={'NBR': int, 'NBI': int})
+
+        self.WtGenData = DeviceTable(('PG', 'QG', 'QT' ,'QB' ,'VS', 'MBASE', 'ZR', 'ZX', 'PT', 'PB'))
+
+        self.PvUnitData = DeviceTable(('PG', 'QG', 'QT' ,'QB' ,'VS', 'MBASE', 'ZR', 'ZX', 'PT', 'PB'))
+
+        # The following storage sequence network model data
+        self.BusSqData = DeviceTable(('VP', 'VN', 'VZ'), dtypes={'VP': complex, 'VN': complex, 'VZ': complex})  # Store node sequence voltage 
+
+        self.GenSqData = DeviceTable(('ZRPOS', 'ZXPPDV', 'ZXPDV', 'ZXSDV', 'ZRNEG', 'ZXNEGDV', 'ZR0', 'ZX0DV', 'ZRG', 'ZXG'))
+
+        self.WtGenSqData = DeviceTable(('ZRPOS', 'ZXPPDV', 'ZXPDV', 'ZXSDV', 'ZRNEG', 'ZXNEGDV', 'ZR0', 'ZX0DV', 'ZRG', 'ZXG'))
+
+        self.PvUnitSqData = DeviceTable(('ZRPOS', 'ZXPPDV', 'ZXPDV', 'ZXSDV', 'ZRNEG', 'ZXNEGDV', 'ZR0', 'ZX0DV', 'ZRG', 'ZXG'))
+
+        self.LoadSqData = DeviceTable(('PNEG', 'QNEG', 'PZERO', 'QZERO'))
+
+        self.LineSqData = DeviceTable(('RLINZ', 'XLINZ', 'BCHZ', 'BI0', 'BJ0'))
+
+        self.ShuntSqData = DeviceTable(('BSZERO', ))
+
+        self.TransSqData = DeviceTable(('CC', 'RG1', 'XG1', 'R01', 'X01', 'RG2', 'XG2', 'R02', 'X02', 'RG3', 'XG3', 'R03', 'X03'), dtypes={'CC': int})
+
+        # The following is used for dynamic simulation
+        self.SyncGenMd = {}  # Storage generator model data
+
+        self.ExciterMd = {}  # Storage excitation model data
+
+        self.TurGovMd = {}  # Storage turbine governor model data
+
+        self.GenModelArray = {}  # Parameter arrays of each generator model type, built at the start of dynamic simulation
+
+        # The following store the model state variables during dynamic simulation
+        # The state variable of each model consists of actual value and estimated value, each kept in one array over all devices
+        self.GenStateVar = DynamicState(('delta', 'omega', 'Pm', 'Pe', 'It', 'Eqp', 'Efq'), dtypes={'It': complex})  # Generator state variables 
+
+        self.BusStateVar = DynamicState(('Vt', ), dtypes={'Vt': complex})  # Bus state variables, bus voltage
+
+        self.ExcStateVar = DynamicState(())  # State variables of excitation system
+
+        self.TurStateVar = DynamicState(('x1', 'x2', 'x3', 'x4'))  # State variable of speed control system
+
+    def copy(self):
+        '''
+        Copy the case. Device tables are copied column by column. Y matrixes and the values derived from them 
+        are shared, because they are replaced instead of changed in place. Other data are deep copied.
+        Args: None
+        Rets:
+            case, Case, copied case.
+        '''
+        case = Case.__new__(Case)
+        for name, value in vars(self).items():
+            if isinstance(value, DeviceTable):
+                value = value.copy()
+                
+            elif name == 'YMatrix':
+                value = dict(value)
+                
+            elif name == 'YMatrixCache':
+                value = {'version': value['version'], 'stamp': dict(value['stamp']), 
+                    'derived': {par_name: dict(derived) for par_name, derived in value['derived'].items()},
+                    'statistics': copy.deepcopy(value['statistics'])}
+                    
+            else:
+                value = copy.deepcopy(value)
+            setattr(case, name, value)
+        return case
+
+    def __enter__(self):
+        get_case_stack().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        get_case_stack().pop()
+        return False
+
+
+CaseLocal = threading.local()  # Stack of active cases in each thread
+
+DefaultCase = Case()  # Used when no case is activated
+
+
+def get_case_stack():
+    '''
+    Get the stack of active cases in the current thread.
+    Args: None
+    Rets:
+        stack, list, active cases.
+    '''
+    stack = getattr(CaseLocal, 'stack', None)
+    if stack is None:
+        stack = []
+        CaseLocal.stack = stack
+    return stack
+
+def get_case():
+    '''
+    Get the active case in the current thread, the default case is returned if no case is activated.
+    Args: None
+    Rets:
+        case, Case, active case.
+    '''
+    stack = get_case_stack()
+    if stack:
+        return stack[-1]
+    return DefaultCase
@@ -0,0 +1,208 @@
+# Columnar device table
+# Every column of a device table is stored as one contiguous typed numpy array,
+# and a hash index maps the device key to its row, so a scalar access is O(1).
+import numpy as np
+
+
+class DeviceTable():
+    '''
+    Device data table with one typed numpy array per column and a hash index from device key to row.
+    '''
+    def __init__(self, columns, dtypes=None, defaults=None):
+        '''
+        Args:
+            (1) columns, tuple, column names.
+            (2) dtypes, dict, column dtype, float is used for the column not given.
+            (3) defaults, dict, column default value of a new row, 0 is used for the column not given.
+        Rets: None
+        '''
+        if dtypes is None:
+            dtypes = {}
+        if defaults is None:
+            defaults = {}
+        self.columns = tuple(columns)
+        self.dtypes = {column: np.dtype(dtypes.get(column, float)) for column in self.columns}
+        self.defaults = {column: defaults.get(column, 0) for column in self.columns}
+        self.index = {}  # device key -> row
+        self.keys = []  # row -> device key
+        self.size = 0
+        self.data = {column: np.zeros(0, dtype=self.dtypes[column]) for column in self.columns}
+        self._keys_tuple = ()
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __repr__(self):
+        return 'DeviceTable(columns={}, rows={})'.format(self.columns, self.size)
+
+    def copy(self):
+        '''
+        Copy the table, every column array is copied.
+        Args: None
+        Rets:
+            table, DeviceTable, copied table.
+        '''
+        table = DeviceTable.__new__(DeviceTable)
+        table.columns = self.columns
+        table.dtypes = self.dtypes
+        table.defaults = self.defaults
+        table.index = dict(self.index)
+        table.keys = list(self.keys)
+        table.size = self.size
+        table.data = {column: self.data[column][:self.size].copy() for column in self.columns}
+        table._keys_tuple = self._keys_tuple
+        return table
+
+    def reserve(self, size):
+        '''
+        Make sure the column arrays can hold size rows, the capacity grows geometrically.
+        Args:
+            size, int, number of rows.
+        Rets: None
+        '''
+        capacity = len(self.data[self.columns[0]]) if self.columns else 0
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 8)
+        for column in self.columns:
+            array = np.zeros(capacity, dtype=self.dtypes[column])
+            array[:self.size] = self.data[column][:self.size]
+            self.data[column] = array
+        return
+
+    def add_row(self, key, values=None):
+        '''
+        Add a row, an existing row with the same key is reset.
+        Args:
+            (1) key, device key.
+            (2) values, dict, column values, the default value is used for the column not given.
+        Rets:
+            row, int, row of the device.
+        '''
+        if key in self.index:
+            row = self.index[key]
+        else:
+            row = self.size
+            self.reserve(row + 1)
+            self.index[key] = row
+            self.keys.append(key)
+            self.size = row + 1
+            self._keys_tuple = None
+        for column in self.columns:
+            if values is not None and column in values:
+                self.data[column][row] = values[column]
+            else:
+                self.data[column][row] = self.defaults[column]
+        return row
+
+    def add_rows(self, keys, values=None):
+        '''
+        Add rows in one call, an existing row with the same key is reset.
+        Args:
+            (1) keys, list, device keys.
+            (2) values, dict, column values in the order of keys, the default value is used for the column not given.
+        Rets:
+            rows, array, rows of devices in the order of keys.
+        '''
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self.index]
+        if new_keys:
+            self.reserve(self.size + len(new_keys))
+            for key in new_keys:
+                self.index[key] = self.size
+                self.keys.append(key)
+                self.size = self.size + 1
+            self._keys_tuple = None
+            
+        rows = self.get_rows(keys)
+        for column in self.columns:
+            if values is not None and column in values:
+                self.data[column][rows] = values[column]
+            else:
+                self.data[column][rows] = self.defaults[column]
+        return rows
+
+    def get_keys(self):
+        '''
+        Get all device keys in row order.
+        Args: None
+        Rets:
+            keys, tuple, device keys.
+        '''
+        if self._keys_tuple is None:
+            self._keys_tuple = tuple(self.keys)
+        return self._keys_tuple
+
+    def get_value(self, key, column):
+        '''
+        Get a value of a device.
+        Args:
+            (1) key, device key.
+            (2) column, str, column name.
+        Rets:
+            value, column value.
+        '''
+        return self.data[column][self.index[key]]
+
+    def set_value(self, key, column, value):
+        '''
+        Set a value of a device.
+        Args:
+            (1) key, device key.
+            (2) column, str, column name.
+            (3) value, column value.
+        Rets: None
+        '''
+        self.data[column][self.index[key]] = value
+        return
+
+    def get_column(self, column):
+        '''
+        Get the column array of all rows, the array is a view of storage.
+        Args:
+            column, str, column name.
+        Rets:
+            array, column values in row order.
+        '''
+        return self.data[column][:self.size]
+
+    def get_rows(self, keys):
+        '''
+        Get rows of devices.
+        Args:
+            keys, list, device keys.
+        Rets:
+            rows, array, rows of devices in the order of keys.
+        '''
+        index = self.index
+        return np.fromiter((index[key] for key in keys), dtype=int, count=len(keys))
+
+    def get_array(self, column, keys=None):
+        '''
+        Get values of all devices or a subset of devices, the array is a copy of storage.
+        Args:
+            (1) column, str, column name.
+            (2) keys, list, device keys, all rows if None.
+        Rets:
+            array, column values in the order of keys.
+        '''
+        if keys is None:
+            return self.data[column][:self.size].copy()
+        return self.data[column][self.get_rows(keys)]
+
+    def set_array(self, column, values, keys=None):
+        '''
+        Set values of all devices or a subset of devices.
+        Args:
+            (1) column, str, column name.
+            (2) values, array or scalar, column values in the order of keys.
+            (3) keys, list, device keys, all rows if None.
+        Rets: None
+        '''
+        if keys is None:
+            self.data[column][:self.size] = values
+        else:
+            self.data[column][self.get_rows(keys)] = values
+        return
@@ -0,0 +1,82 @@
+# Dynamic state storage
+# The state variables of a model group are kept in two device tables with the same rows, one holds the actual values and
+# the other holds the predicted (estimated) values. A state variable of all devices is one contiguous array in each table,
+# and the two buffers are swapped by exchanging the tables instead of copying them.
+from .device_table import DeviceTable
+
+
+class DynamicState():
+    '''
+    State variables of a model group with an actual buffer and a predicted buffer.
+    '''
+    def __init__(self, variables, dtypes=None):
+        '''
+        Args:
+            (1) variables, tuple, state variable names.
+            (2) dtypes, dict, state variable dtype, float is used for the variable not given.
+        Rets: None
+        '''
+        self.variables = tuple(variables)
+        self.buffers = [DeviceTable(self.variables, dtypes), DeviceTable(self.variables, dtypes)]  # Actual and predicted
+
+    def __len__(self):
+        return len(self.buffers[0])
+
+    def __contains__(self, key):
+        return key in self.buffers[0]
+
+    def __repr__(self):
+        return 'DynamicState(variables={}, rows={})'.format(self.variables, len(self))
+
+    def get_buffer(self, par_type):
+        '''
+        Get the buffer of actual or predicted values.
+        Args:
+            par_type, bool, True for actual value and False for predicted value.
+        Rets:
+            table, DeviceTable, state buffer, None if par_type is wrong.
+        '''
+        if par_type is True:
+            return self.buffers[0]
+        elif par_type is False:
+            return self.buffers[1]
+        return
+
+    def add_device(self, key, value):
+        '''
+        Add the state variables of a device, an existing device is reset.
+        Args:
+            (1) key, device key.
+            (2) value, dict, actual value by name and predicted value by name ending with '0', 
+                the actual value is used if the predicted value is not given.
+        Rets: None
+        '''
+        actual = {name: value[name] for name in self.variables if name in value}
+        predicted = {name: value.get(name + '0', actual[name]) for name in actual}
+        self.buffers[0].add_row(key, actual)
+        self.buffers[1].add_row(key, predicted)
+        return
+
+    def add_devices(self, keys, value):
+        '''
+        Add the state variables of devices in one call, an existing device is reset.
+        Args:
+            (1) keys, list, device keys.
+            (2) value, dict, actual values by name and predicted values by name ending with '0' in the order of keys, 
+                the actual values are used if the predicted values are not given.
+        Rets: None
+        '''
+        actual = {name: value[name] for name in self.variables if name in value}
+        predicted = {name: value.get(name + '0', actual[name]) for name in actual}
+        self.buffers[0].add_rows(keys, actual)
+        self.buffers[1].add_rows(keys, predicted)
+        return
+
+    def swap(self):
+        '''
+        Swap the actual buffer and the predicted buffer, the arrays are not copied.
+        Args: None
+        Rets: None
+        '''
+        self.buffers.reverse()
+        return
@@ -1,6 +1,7 @@
 # disturbance in dynamic simulation
 import sys
 sys.path.append('..')
+import scipy.sparse as sp
 
 import apis
 from apis import apis_system
@@ -18,8 +19,8 @@ def set_bus_fault(bus, Yf):
     '''    
     i = apis_system.get_bus_num_after_renumber(bus)
     Y_mat = apis_system.get_system_Y_network_matrix('dynamic')
-    Y_mat[i, i] = Y_mat[i, i] + Yf
-    apis_system.set_system_Y_network_matrix('dynamic', Y_mat)
+    Y_fault = sp.csr_matrix(([Yf], ([i], [i])), shape=Y_mat.shape, dtype=complex)
+    apis_system.set_system_Y_network_matrix('dynamic', Y_mat + Y_fault)
     current_time = apis.get_simulator_parameter('dynamic', 'current_time')
     print('--------set bus {} three phase short circuit at time {:.4f}--------'.format(bus, current_time))
     #solve_dynamic_bus_voltage(True)
@@ -35,8 +36,8 @@ def clear_bus_fault(bus, Yf):
     '''
     i = apis_system.get_bus_num_after_renumber(bus)
     Y_mat = apis_system.get_system_Y_network_matrix('dynamic')
-    Y_mat[i, i] = Y_mat[i, i] - Yf
-    apis_system.set_system_Y_network_matrix('dynamic', Y_mat)
+    Y_fault = sp.csr_matrix(([Yf], ([i], [i])), shape=Y_mat.shape, dtype=complex)
+    apis_system.set_system_Y_network_matrix('dynamic', Y_mat - Y_fault)
     current_time = apis.get_simulator_parameter('dynamic', 'current_time')
     print('--------Clear bus {} three phase short circuit at time {:.4f}--------'.format(bus, current_time))
     return 
@@ -62,11 +63,8 @@ def trip_line(line):
     Yi = 0.5j * B + 1j * BI
     Yj = 0.5j * B + 1j * BJ    
     
-    Y_mat[i, i] = Y_mat[i, i] - Yi
-    Y_mat[j, j] = Y_mat[j, j] - Yj
-    Y_mat[i, i] = Y_mat[i, i] - Yij - Yi 
-    Y_mat[j, j] = Y_mat[j, j] - Yij - Yj
-    apis_system.set_system_Y_network_matrix('dynamic', Y_mat)
+    Y_trip = sp.csr_matrix(([Yi + Yij + Yi, Yj + Yij + Yj], ([i, j], [i, j])), shape=Y_mat.shape, dtype=complex)
+    apis_system.set_system_Y_network_matrix('dynamic', Y_mat - Y_trip)
     current_time = apis.get_simulator_parameter('dynamic', 'current_time')
     print('--------Trip line {} at time {:.4f}--------'.format(line, current_time))    
     return
\ No newline at end of file
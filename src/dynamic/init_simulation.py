@@ -2,13 +2,18 @@
 # Parameters with 0 at the end represent estimates value
 import sys
 sys.path.append('..')
+from math import pi
+import numpy as np
 
 import apis
 from apis import apis_basic
 from apis import apis_system
 from apis import apis_dynamic
 
+import network
+
 from .network_solution import solve_dynamic_bus_voltage
+from .models import GENERATOR_MODELS
 
 
 def init_system_state_parameter():
@@ -18,14 +23,13 @@ def init_system_state_parameter():
     Rets: None
     '''
     buses = apis.get_all_devices('BUS')
-    for bus in buses:
-        VM = apis.get_device_data(bus, 'BUS', 'VM')
-        VA = apis.get_device_data(bus, 'BUS', 'VA')
-        VA = apis_basic.convert_deg_to_rad(VA)
-        Vt = apis_basic.build_complex_value(VM, VA)
-        
-        value = {'Vt': Vt, 'Vt0': Vt}
-        apis_dynamic.add_model_state_variable(bus, 'BUS', value) 
+    VM = apis.get_device_data_array('BUS', 'VM', buses)
+    VA = apis.get_device_data_array('BUS', 'VA', buses)
+    VA = apis_basic.convert_deg_to_rad(VA)
+    Vt = VM * np.exp(1j * VA)
+    
+    value = {'Vt': Vt, 'Vt0': Vt}
+    apis_dynamic.add_model_state_variables(buses, 'BUS', value) 
     
     init_generators_model_state_parameter()
     
@@ -53,6 +57,7 @@ def init_generators_model_state_parameter():
             continue
             
         apis_dynamic.add_model_state_variable(generator, 'GENERATOR', value) 
+    init_generators_model_parameter()
     # network equation solution to reduce the calculation error
     solve_dynamic_bus_voltage(True) 
     for generator in generators:
@@ -63,6 +68,55 @@ def init_generators_model_state_parameter():
         
     return
     
+def init_generators_model_parameter():
+    '''
+    Build the parameter arrays of each generator model type, so that the equations of all machines of a model type
+    are solved in one call. Reactances are converted to system base here once.
+    Args: None
+    Rets: None
+    '''
+    SBASE = apis_system.get_system_base_data('SBASE')
+    BASFRQ = apis_system.get_system_base_data('BASFRQ')
+    generators = apis.get_all_devices('GENERATOR')
+    GMN = [apis.get_generator_related_model_data(generator, 'GEN', 'GMN') for generator in generators]
+    
+    model_arrays = {}
+    for model_name in GENERATOR_MODELS:
+        model_generators = [generator for generator, name in zip(generators, GMN) if name == model_name]
+        if len(model_generators) == 0:
+            continue
+            
+        MBASE = apis.get_device_data_array('GENERATOR', 'MBASE', model_generators)
+        H = get_generators_model_data_array(model_generators, 'H')
+        par = {'generators': model_generators, 
+            'rows': apis_dynamic.get_model_state_variable_rows('GENERATOR', model_generators),
+            'bus': apis_system.map_buses_to_internal(model_generators),
+            'omegas': 2 * pi * BASFRQ,
+            'Tj': 2 * H * MBASE / SBASE,
+            'YGp': np.array([network.calculate_generator_internal_admittance(generator) for generator in model_generators], dtype=complex),
+            'KG': np.array([network.calculate_generator_saliency_factor(generator) for generator in model_generators], dtype=complex)}
+        
+        if model_name == 'GENTRA':
+            par['Td0p'] = get_generators_model_data_array(model_generators, 'Td0p')
+            par['Xd'] = get_generators_model_data_array(model_generators, 'Xd') * SBASE / MBASE
+            par['Xdp'] = get_generators_model_data_array(model_generators, 'Xdp') * SBASE / MBASE
+        model_arrays[model_name] = par
+    
+    apis.set_generator_model_arrays(model_arrays)
+    return
+
+def get_generators_model_data_array(generators, par_name):
+    '''
+    Get a GEN model parameter of generators in one array.
+    Args:
+        (1) generators, list, generator connected bus numbers.
+        (2) par_name, str, parameter name.
+    Rets:
+        value, array, parameter values in the order of generators.
+    '''
+    value = np.array([apis.get_generator_related_model_data(generator, 'GEN', par_name) for generator in generators], dtype=float)
+    return value
+    
 def init_exciters_model_state_parameter():
     '''
     Initialize excitation model state parameters.
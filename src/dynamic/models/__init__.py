@@ -1,23 +1,20 @@
 # The solution of differential equation of the model
 
-from .sync_generator import solve_generator_model_state_variable
+from .sync_generator import GENERATOR_MODELS, solve_generators_model_state_variables
 from .exciter import solve_exciter_model_state_variable
 from .turbine_governor import solve_turbine_governor_model_state_variable
 
 
 def solve_model_state_variables(generator, model, par_type):
     '''
-    Solve model state variables at generator.
+    Solve model state variables at generator. GEN models of all generators are solved by solve_generators_model_state_variables.
     Args:
         (1) generator, int, generator connected bus number.
-        (2) model, str, model name, including GEN, AVR, GOV.
+        (2) model, str, model name, including AVR, GOV.
         (3) par_type, bool, state variables type. True for actual value and False for estimated value.
     Rets: None
     '''
-    if model == 'GEN':
-        solve_generator_model_state_variable(generator, par_type)
-        
-    elif model == 'AVR':
+    if model == 'AVR':
         solve_exciter_model_state_variable(generator, par_type)
     
     elif model == 'GOV':
@@ -1,127 +1,140 @@
 # Solving state variables of generator model.
+# The model equations of all machines of a model type are solved in one call with the parameter arrays
+# built by init_generators_model_parameter at the start of dynamic simulation.
 import sys
 sys.path.append('../..')
 from math import pi
+import numpy as np
 
 import apis
 from apis import apis_basic
 from apis import apis_system
 from apis import apis_dynamic
 
+GENERATOR_MODELS = ('GENCLS', 'GENTRA')  # Generator model types solved in dynamic simulation
 
-def solve_generator_model_state_variable(generator, par_type):
+
+def solve_generators_model_state_variables(par_type):
     '''
-    Solve generator model state variables.
+    Solve generator model state variables of all machines, one call for each model type.
     Args:
-        (1) generator, int, generator connected bus number.
-        (2) par_type, bool, state variables type. True for actual value and False for estimated value.
+        par_type, bool, state variables type. True for actual value and False for estimated value.
     Rets: None
     '''
-    GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
-    if GMN == 'GENTRA':
-        if par_type is True:
-            solve_GENTRA_model_state_actual_value(generator)
-        else:
-            solve_GENTRA_model_state_estimated_value(generator)
-            
-    elif GMN == 'GENCLS':
-        if par_type is True:
-            solve_GENCLS_model_state_actual_value(generator)
+    model_arrays = apis.get_generator_model_arrays()
+    for GMN, par in model_arrays.items():
+        if GMN == 'GENTRA':
+            if par_type is True:
+                solve_GENTRA_model_state_actual_value(par)
+            else:
+                solve_GENTRA_model_state_estimated_value(par)
+                
+        elif GMN == 'GENCLS':
+            if par_type is True:
+                solve_GENCLS_model_state_actual_value(par)
+            else:
+                solve_GENCLS_model_state_estimated_value(par)
+                
         else:
-            solve_GENCLS_model_state_estimated_value(generator)
-            
-    else:
-        pass
+            pass
     return
-    
-def solve_GENTRA_model_state_estimated_value(generator):
+
+def get_generators_state_data(par, par_type, par_name):
+    '''
+    Get a state variable of all machines of a model type.
+    Args:
+        (1) par, dict, parameter arrays of the model type.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, state variable name.
+    Rets:
+        value, array, state variable values in the order of par['generators'].
+    '''
+    value = apis_dynamic.take_model_state_variable_array('GENERATOR', par_type, par_name, par['rows'])
+    return value
+
+def set_generators_state_data(par, par_type, par_name, value):
+    '''
+    Set a state variable of all machines of a model type.
+    Args:
+        (1) par, dict, parameter arrays of the model type.
+        (2) par_type, bool, True for actual value and False for estimated value.
+        (3) par_name, str, state variable name.
+        (4) value, array, state variable values in the order of par['generators'].
+    Rets: None
+    '''
+    apis_dynamic.put_model_state_variable_array('GENERATOR', par_type, par_name, value, par['rows'])
+    return
+
+def solve_GENTRA_model_state_estimated_value(par):
     '''
     Solve the estimated value of state variables in GENTRA model
     Args: 
-        generator, int, GENTRA model connected bus number
+        par, dict, parameter arrays of GENTRA model.
     Rets: None
     '''
-    delta = apis_dynamic.get_generator_state_data(generator, True, 'delta')
-    omega = apis_dynamic.get_generator_state_data(generator, True, 'omega')
-    Pm = apis_dynamic.get_generator_state_data(generator, True, 'Pm')
-    Pe = apis_dynamic.get_generator_state_data(generator, True, 'Pe')
-    Eqp = apis_dynamic.get_generator_state_data(generator, True, 'Eqp')
-    Efq = apis_dynamic.get_generator_state_data(generator, True, 'Efq')
-    It = apis_dynamic.get_generator_state_data(generator, True, 'It')
-    
-    SBASE = apis.get_system_base_data('SBASE')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-    BASFRQ = apis.get_system_base_data('BASFRQ')
-    omegas = 2 * pi * BASFRQ
+    delta = get_generators_state_data(par, True, 'delta')
+    omega = get_generators_state_data(par, True, 'omega')
+    Pm = get_generators_state_data(par, True, 'Pm')
+    Pe = get_generators_state_data(par, True, 'Pe')
+    Eqp = get_generators_state_data(par, True, 'Eqp')
+    Efq = get_generators_state_data(par, True, 'Efq')
+    It = get_generators_state_data(par, True, 'It')
+    
+    omegas = par['omegas']
     time_step = apis.get_simulator_parameter('dynamic', 'time_step')
-    
-    H = apis.get_generator_related_model_data(generator, 'GEN', 'H')
-    Tj = 2 * H *MBASE / SBASE
-    Td0p = apis.get_generator_related_model_data(generator, 'GEN', 'Td0p')
-    Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xd')
-    Xd = Xd * SBASE / MBASE
-    Xdp = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
-    Xdp = Xdp * SBASE / MBASE
-    Id, Iq = apis_basic.convert_xy_to_dq(delta, It.real, It.imag)
+    Tj = par['Tj']
+    Td0p = par['Td0p']
+    Xd = par['Xd']
+    Xdp = par['Xdp']
+    Id = np.sin(delta) * It.real - np.cos(delta) * It.imag  # d-axis component, see convert_xy_to_dq
     
     ddelta = omegas * (omega - 1)
     domega = 1 / Tj * (Pm - Pe)
     dEqp = 1 / Td0p * (-Eqp - (Xd - Xdp) * Id + Efq)    
-    #print('GENTRA model ddelta {} and domega {}'.format(ddelta, domega))
     delta0 = delta + ddelta * time_step
     omega0 = omega + domega * time_step
     Eqp0 = Eqp + dEqp * time_step
     
-    apis_dynamic.set_generator_state_data(generator, False, 'Eqp', Eqp0)
-    apis_dynamic.set_generator_state_data(generator, False, 'omega', omega0)
-    apis_dynamic.set_generator_state_data(generator, False, 'delta', delta0)
-
+    set_generators_state_data(par, False, 'Eqp', Eqp0)
+    set_generators_state_data(par, False, 'omega', omega0)
+    set_generators_state_data(par, False, 'delta', delta0)
     return   
     
-def solve_GENTRA_model_state_actual_value(generator):
+def solve_GENTRA_model_state_actual_value(par):
     '''
     Solve the actual value of state variables in GENTRA model
     Args: 
-        generator, int, GENTRA model connected bus number
+        par, dict, parameter arrays of GENTRA model.
     Rets: None
     '''
-    delta = apis_dynamic.get_generator_state_data(generator, True, 'delta')
-    omega = apis_dynamic.get_generator_state_data(generator, True, 'omega')
-    Pm = apis_dynamic.get_generator_state_data(generator, True, 'Pm')
-    Pe = apis_dynamic.get_generator_state_data(generator, True, 'Pe')
-    Eqp = apis_dynamic.get_generator_state_data(generator, True, 'Eqp')
-    Efq = apis_dynamic.get_generator_state_data(generator, True, 'Efq')
-    It = apis_dynamic.get_generator_state_data(generator, True, 'It')
-    
+    delta = get_generators_state_data(par, True, 'delta')
+    omega = get_generators_state_data(par, True, 'omega')
+    Pm = get_generators_state_data(par, True, 'Pm')
+    Pe = get_generators_state_data(par, True, 'Pe')
+    Eqp = get_generators_state_data(par, True, 'Eqp')
+    Efq = get_generators_state_data(par, True, 'Efq')
+    It = get_generators_state_data(par, True, 'It')
+    
+    omegas = par['omegas']
     time_step = apis.get_simulator_parameter('dynamic', 'time_step')    
-    SBASE = apis.get_system_base_data('SBASE')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-    BASFRQ = apis.get_system_base_data('BASFRQ')
-    omegas = 2 * pi * BASFRQ
-    
-    H = apis.get_generator_related_model_data(generator, 'GEN', 'H')
-    Tj = 2 * H *MBASE / SBASE
-    Td0p = apis.get_generator_related_model_data(generator, 'GEN', 'Td0p')
-    Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xd')
-    Xd = Xd * SBASE / MBASE
-    Xdp = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
-    Xdp = Xdp * SBASE / MBASE
-    
-    Id, Iq = apis_basic.convert_xy_to_dq(delta, It.real, It.imag)
+    Tj = par['Tj']
+    Td0p = par['Td0p']
+    Xd = par['Xd']
+    Xdp = par['Xdp']
+    Id = np.sin(delta) * It.real - np.cos(delta) * It.imag
     
     ddelta = omegas * (omega - 1)  
     domega = 1 / Tj * (Pm - Pe)
     dEqp = 1 / Td0p * (-Eqp - (Xd - Xdp) * Id + Efq) 
     
-    delta0 = apis_dynamic.get_generator_state_data(generator, False, 'delta')
-    omega0 = apis_dynamic.get_generator_state_data(generator, False, 'omega')
-    Pm0 = apis_dynamic.get_generator_state_data(generator, False, 'Pm')
-    Pe0 = apis_dynamic.get_generator_state_data(generator, False, 'Pe')
-    Eqp0 = apis_dynamic.get_generator_state_data(generator, False, 'Eqp')
-    Efq0 = apis_dynamic.get_generator_state_data(generator, False, 'Efq')
-    It0 = apis_dynamic.get_generator_state_data(generator, False, 'It')
-    
-    Id0, Iq0 = apis_basic.convert_xy_to_dq(delta0, It0.real, It0.imag)
+    delta0 = get_generators_state_data(par, False, 'delta')
+    omega0 = get_generators_state_data(par, False, 'omega')
+    Pm0 = get_generators_state_data(par, False, 'Pm')
+    Pe0 = get_generators_state_data(par, False, 'Pe')
+    Eqp0 = get_generators_state_data(par, False, 'Eqp')
+    Efq0 = get_generators_state_data(par, False, 'Efq')
+    It0 = get_generators_state_data(par, False, 'It')
+    Id0 = np.sin(delta0) * It0.real - np.cos(delta0) * It0.imag
     
     ddelta0 = omegas * (omega0 - 1)
     domega0 = 1 / Tj * (Pm0 - Pe0)
@@ -131,30 +144,26 @@ def solve_GENTRA_model_state_actual_value(generator):
     omega = omega + (domega + domega0) * 0.5 * time_step
     Eqp = Eqp + (dEqp + dEqp0) * 0.5 * time_step
     
-    apis_dynamic.set_generator_state_data(generator, True, 'Eqp', Eqp)
-    apis_dynamic.set_generator_state_data(generator, True, 'omega', omega)
-    apis_dynamic.set_generator_state_data(generator, True, 'delta', delta)
+    set_generators_state_data(par, True, 'Eqp', Eqp)
+    set_generators_state_data(par, True, 'omega', omega)
+    set_generators_state_data(par, True, 'delta', delta)
     return  
     
-def solve_GENCLS_model_state_estimated_value(generator): 
+def solve_GENCLS_model_state_estimated_value(par): 
     '''
     Solve the estimated value of state variables in GENCLS model
     Args: 
-        generator, int, GENCLS model connected bus number
+        par, dict, parameter arrays of GENCLS model.
     Rets: None
     '''
-    delta = apis_dynamic.get_generator_state_data(generator, True, 'delta')
-    omega = apis_dynamic.get_generator_state_data(generator, True, 'omega')
-    Pm = apis_dynamic.get_generator_state_data(generator, True, 'Pm')
-    Pe = apis_dynamic.get_generator_state_data(generator, True, 'Pe')
+    delta = get_generators_state_data(par, True, 'delta')
+    omega = get_generators_state_data(par, True, 'omega')
+    Pm = get_generators_state_data(par, True, 'Pm')
+    Pe = get_generators_state_data(par, True, 'Pe')
     time_step = apis.get_simulator_parameter('dynamic', 'time_step')    
     
-    SBASE = apis_system.get_system_base_data('SBASE')
-    BASFRQ = apis_system.get_system_base_data('BASFRQ')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-    H = apis.get_generator_related_model_data(generator, 'GEN', 'H')
-    Tj = 2 * H * MBASE / SBASE    
-    omegas = 2 * pi * BASFRQ    
+    Tj = par['Tj']
+    omegas = par['omegas']
 
     ddelta = omegas * (omega - 1)
     domega = 1 / Tj * (Pm - Pe)   
@@ -162,37 +171,33 @@ def solve_GENCLS_model_state_estimated_value(generator):
     omega0 = omega + domega * time_step
     delta0 = delta + ddelta * time_step
 
-    apis_dynamic.set_generator_state_data(generator, False, 'omega', omega0)
-    apis_dynamic.set_generator_state_data(generator, False, 'delta', delta0)
+    set_generators_state_data(par, False, 'omega', omega0)
+    set_generators_state_data(par, False, 'delta', delta0)
     return 
 
-def solve_GENCLS_model_state_actual_value(generator):
+def solve_GENCLS_model_state_actual_value(par):
     '''
     Solve the actual value of state variables in GENCLS model.
     Args: 
-        generator, int, GENCLS model connected bus number
+        par, dict, parameter arrays of GENCLS model.
     Rets: None
     '''
-    SBASE = apis_system.get_system_base_data('SBASE')
-    BASFRQ = apis_system.get_system_base_data('BASFRQ')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-    H = apis.get_generator_related_model_data(generator, 'GEN', 'H')
-    Tj = 2 * H * MBASE / SBASE    
-    omegas = 2 * pi * BASFRQ  
-    
-    delta = apis_dynamic.get_generator_state_data(generator, True, 'delta')
-    omega = apis_dynamic.get_generator_state_data(generator, True, 'omega')
-    Pm = apis_dynamic.get_generator_state_data(generator, True, 'Pm')
-    Pe = apis_dynamic.get_generator_state_data(generator, True, 'Pe')
+    Tj = par['Tj']
+    omegas = par['omegas']
+    
+    delta = get_generators_state_data(par, True, 'delta')
+    omega = get_generators_state_data(par, True, 'omega')
+    Pm = get_generators_state_data(par, True, 'Pm')
+    Pe = get_generators_state_data(par, True, 'Pe')
     time_step = apis.get_simulator_parameter('dynamic', 'time_step') 
     
     ddelta = omegas * (omega - 1)  
     domega = 1 / Tj * (Pm - Pe) 
     
-    delta0 = apis_dynamic.get_generator_state_data(generator, False, 'delta')
-    omega0 = apis_dynamic.get_generator_state_data(generator, False, 'omega')
-    Pm0 = apis_dynamic.get_generator_state_data(generator, False, 'Pm')
-    Pe0 = apis_dynamic.get_generator_state_data(generator, False, 'Pe')
+    delta0 = get_generators_state_data(par, False, 'delta')
+    omega0 = get_generators_state_data(par, False, 'omega')
+    Pm0 = get_generators_state_data(par, False, 'Pm')
+    Pe0 = get_generators_state_data(par, False, 'Pe')
     
     ddelta0 = omegas * (omega0 - 1)
     domega0 = 1 / Tj * (Pm0 - Pe0) 
@@ -200,8 +205,8 @@ def solve_GENCLS_model_state_actual_value(generator):
     delta = delta + (ddelta + ddelta0) * 0.5 * time_step
     omega = omega + (domega + domega0) * 0.5 * time_step
     
-    apis_dynamic.set_generator_state_data(generator, True, 'omega', omega)
-    apis_dynamic.set_generator_state_data(generator, True, 'delta', delta)
+    set_generators_state_data(par, True, 'omega', omega)
+    set_generators_state_data(par, True, 'delta', delta)
     return  
     
   
@@ -1,8 +1,9 @@
 # network solution in dynamic simulation
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
 import sys
 sys.path.append('..')
-from math import sin, cos, pi
 
 import apis
 from apis import apis_system
@@ -16,35 +17,56 @@ def solve_dynamic_bus_voltage(par_type):
         par_type, bool, bool, type of state variables, True represent actual voltage, False repersent estimated voltage
     Rets: None
     '''
-    Y_mat = apis_system.get_system_Y_network_matrix('dynamic')  
+    Y_LU = get_dynamic_Y_matrix_factor()  
     max_net_iter = 15
     
     I1 = calculate_generators_injection_current_I1(par_type)  
-    buses = apis.get_all_devices('BUS')
-    U0 = np.zeros(len(buses), dtype=complex)  # Bus voltage estimated value
-
-    for bus in buses:
-        i = apis_system.get_bus_num_after_renumber(bus)
-        U0[i] = apis_dynamic.get_bus_state_data(bus, par_type, 'Vt')
+    U0 = get_dynamic_bus_voltage(par_type)  # Bus voltage estimated value
     
     for i in range(max_net_iter):
         I2 = calculate_generators_injection_current_I2(U0, par_type)  
         I = I1 + I2
 
-        U1 = np.linalg.solve(Y_mat, I)  
+        U1 = Y_LU.solve(I)  # Only triangular solves, the factor is reused between disturbances
         if np.max(np.abs(U1-U0)) < 1e-12:  # Convergence error of network equation
             break
         else:
             U0 = U1.copy()  
     
     # Update network bus voltage
-    for bus in buses:
-        i = apis_system.get_bus_num_after_renumber(bus)
-        apis_dynamic.set_bus_state_data(bus, par_type, 'Vt', U1[i])  
+    buses = apis.get_all_devices('BUS')
+    index = apis_system.get_device_internal_bus_index('BUS')
+    apis_dynamic.set_model_state_variable_array('BUS', par_type, 'Vt', U1[index], buses)  
 
     update_generators_electromagnetic_power(par_type)
     return 
 
+def get_dynamic_bus_voltage(par_type):
+    '''
+    Get the dynamic voltage of all buses.
+    Args:
+        par_type, bool, True represent actual voltage, False repersent estimated voltage.
+    Rets:
+        U, array, bus complex voltage in renumbered bus order.
+    '''
+    buses = apis.get_all_devices('BUS')
+    index = apis_system.get_device_internal_bus_index('BUS')
+    U = np.zeros(len(buses), dtype=complex)
+    U[index] = apis_dynamic.get_model_state_variable_array('BUS', par_type, 'Vt', buses)
+    return U
+
+def get_dynamic_Y_matrix_factor():
+    '''
+    Get the sparse LU factor of dynamic Y matrix. The factor is kept in Y matrix cache, so it is built once and 
+    rebuilt only after a disturbance sets the dynamic Y matrix again.
+    Args: None
+    Rets:
+        Y_LU, SuperLU, sparse LU factor of dynamic Y matrix.
+    '''
+    build = lambda Y_mat: spla.splu(sp.csc_matrix(Y_mat), permc_spec='COLAMD')
+    Y_LU = apis_system.get_system_Y_network_matrix_cache('dynamic', ('factor', ), build)
+    return Y_LU
+
 def update_generators_electromagnetic_power(par_type):
     '''
     Update the electromagnetic power of generators
@@ -52,26 +74,20 @@ def update_generators_electromagnetic_power(par_type):
         par_type, bool, type of state variables, True represent actual value, False repersent estimated value.
     Rets: None
     '''      
-    buses = apis.get_all_devices('BUS')
-    U0 = np.zeros(len(buses), dtype=complex)  
-    for bus in buses:
-        i = apis_system.get_bus_num_after_renumber(bus)
-        U0[i] = apis_dynamic.get_bus_state_data(bus, par_type, 'Vt')   
+    U0 = get_dynamic_bus_voltage(par_type)
  
     I1 = calculate_generators_injection_current_I1(par_type)  # Generator injection current I1 vector
     I2 = calculate_generators_injection_current_I2(U0, par_type) # Generator injection current I2 vector
 
-    generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        Vt = apis_dynamic.get_bus_state_data(generator, par_type, 'Vt')
-        YGp = calculate_generator_internal_admittance(generator)
-        
-        i = apis_system.get_bus_num_after_renumber(generator)
-        It = I1[i] + I2[i] - YGp * Vt 
+    model_arrays = apis.get_generator_model_arrays()
+    for par in model_arrays.values():
+        i = par['bus']
+        Vt = U0[i]
+        It = I1[i] + I2[i] - par['YGp'] * Vt 
         Pe = (Vt * It.conjugate()).real
         
-        apis_dynamic.set_generator_state_data(generator, par_type, 'Pe', Pe)
-        apis_dynamic.set_generator_state_data(generator, par_type, 'It', It)
+        apis_dynamic.put_model_state_variable_array('GENERATOR', par_type, 'Pe', Pe, par['rows'])
+        apis_dynamic.put_model_state_variable_array('GENERATOR', par_type, 'It', It, par['rows'])
 
     return
     
@@ -83,125 +99,53 @@ def calculate_generators_injection_current_I1(par_type):
     Rets: 
         gens_I1, array, generators injection current I1 vector.
     '''    
-    buses = apis.get_all_devices('BUS')
-    gens_I1 = np.zeros(len(buses), dtype=complex)
+    gens_I1 = np.zeros(len(apis_system.get_system_base_data('BusSqNum')), dtype=complex)
     
-    generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        Ed, Eq = get_generator_internal_ralated_potential(generator, par_type) 
-        delta = apis_dynamic.get_generator_state_data(generator, par_type, 'delta')
-
-        Ex = Ed * sin(delta) + Eq * cos(delta)
-        Ey = -Ed * cos(delta) + Eq * sin(delta)
-        E = Ex + 1j * Ey 
-        
-        i = apis_system.get_bus_num_after_renumber(generator)
-        YGp = calculate_generator_internal_admittance(generator)
-        gens_I1[i] = YGp * E
+    model_arrays = apis.get_generator_model_arrays()
+    for par in model_arrays.values():
+        E, delta = calculate_generators_internal_potential(par, par_type)
+        gens_I1[par['bus']] = par['YGp'] * E
         
     return gens_I1
     
 def calculate_generators_injection_current_I2(bus_v, par_type):
     '''
-    Calculate generators injection current I1 vector.
+    Calculate generators injection current I2 vector caused by saliency, it is zero for GENCLS model.
     Args: 
         (1) bus_v, array, bus voltage.
         (2) par_type: bool, True represent actual value, False repersent estimated value.
-    输出: 
+    Rets: 
         gens_I2, array, generators injection current I2 vector.
     ''' 
-    buses = apis.get_all_devices('BUS')
-    gens_I2 = np.zeros(len(buses), dtype=complex)  
+    gens_I2 = np.zeros(len(bus_v), dtype=complex)  
     
-    SBASE = apis_system.get_system_base_data('SBASE')
-    generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        i = apis_system.get_bus_num_after_renumber(generator)
-        GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
-        MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-        
+    model_arrays = apis.get_generator_model_arrays()
+    for GMN, par in model_arrays.items():
         if GMN == 'GENCLS':
-            gens_I2[i] = 0.0 + 0.0j
+            continue
         
-        else:        
-            if GMN == 'GENROU' or GMN == 'GENSAL':
-                Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdpp')
-                Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xqpp')
-            
-            elif GMN == 'GENTRA':
-                Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
-                Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xq')        
-            else:
-                Xd = 0.0
-                Xq = 0.0        
-
-            Xd = Xd * SBASE / MBASE
-            Xq = Xq * SBASE / MBASE
-            Ed, Eq = get_generator_internal_ralated_potential(generator, par_type)
-            delta = apis_dynamic.get_generator_state_data(generator, par_type, 'delta')
-        
-            Ex = Ed * sin(delta) + Eq * cos(delta)
-            Ey = -Ed * cos(delta) + Eq * sin(delta)
-            E = Ex + 1j * Ey
- 
-            gens_I2[i] = 0.5j * (Xd - Xq) / (Xd * Xq) * (E.conjugate() - bus_v[i].conjugate()) * (cos(2*delta) + 1j*sin(2*delta))
+        i = par['bus']
+        E, delta = calculate_generators_internal_potential(par, par_type)
+        gens_I2[i] = par['KG'] * (E.conjugate() - bus_v[i].conjugate()) * (np.cos(2*delta) + 1j*np.sin(2*delta))
     
     return gens_I2  
     
-def get_generator_internal_ralated_potential(generator, par_type):
+def calculate_generators_internal_potential(par, par_type):
     '''
-    Get the internal potential of the generator.
+    Calculate the internal potential of all machines of a generator model type in xy frame.
     Args: 
-        (1) generator, model bus number.
-        (2) par_type, par_type, bool, True is for actual value, False is for estimated value.
+        (1) par, dict, parameter arrays of the generator model type.
+        (2) par_type, bool, True is for actual value, False is for estimated value.
     Rets: 
-        (1) Ed, d-axis potential. 
-        (2) Eq, q-axis potential.   
+        (1) E, array, complex internal potential. 
+        (2) delta, array, rotor angle in rad.
     '''
-    GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
-    if GMN == 'GENTRA' or GMN == 'GENCLS':
-        Ed = 0.0
-        Eq = apis_dynamic.get_generator_state_data(generator, par_type, 'Eqp')
-
-    elif GMN == 'GENROU' or GMN == 'GENSAL':
-        Ed = apis_dynamic.get_generator_state_data(generator, par_type, 'Edpp')
-        Eq = apis_dynamic.get_generator_state_data(generator, par_type, 'Eqpp')
+    rows = par['rows']
+    delta = apis_dynamic.take_model_state_variable_array('GENERATOR', par_type, 'delta', rows)
+    Eq = apis_dynamic.take_model_state_variable_array('GENERATOR', par_type, 'Eqp', rows)  # GENCLS and GENTRA
+    Ed = np.zeros(len(rows))
     
-    else:
-        Ed = 0.0
-        Eq = 0.0      
-        
-    return Ed, Eq 
-
-def calculate_generator_internal_admittance(generator):
-    '''
-    Calculate the internal admittance YGP of generator connected to grid
-    Args:
-        generator, int, generator bus number.
-    Rets:
-        YGp, float, complex, generator internal admittance connected to grid.
-    '''
-    GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
-    SBASE = apis_system.get_system_base_data('SBASE')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
-    if GMN == 'GENCLS':
-        ZX = apis.get_device_data(generator, 'GENERATOR', 'ZX')
-        Xd = ZX * SBASE / MBASE
-        YGp = 1.0 / (1j * Xd)
-        
-    else:
-        if GMN == 'GENROU' or GMN == 'GENSAL':
-            Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdpp')
-            Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xqpp')
-            
-        elif GMN == 'GENTRA':
-            Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
-            Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xq')        
-        else:
-            Xd = 0.0
-            Xq = 0.0
-        Xd = Xd * SBASE / MBASE
-        Xq = Xq * SBASE / MBASE
-        YGp = -0.5j * (Xd + Xq) / (Xd * Xq)
-        
-    return YGp
\ No newline at end of file
+    Ex = Ed * np.sin(delta) + Eq * np.cos(delta)
+    Ey = -Ed * np.cos(delta) + Eq * np.sin(delta)
+    E = Ex + 1j * Ey 
+    return E, delta
@@ -10,7 +10,7 @@ from apis import apis_dynamic
 
 import network
 
-from .models import solve_model_state_variables
+from .models import GENERATOR_MODELS, solve_model_state_variables, solve_generators_model_state_variables
 from .network_solution import solve_dynamic_bus_voltage
 from .init_simulation import init_system_state_parameter
 
@@ -23,6 +23,7 @@ def start_dynamic_simulation():
     '''
     print('------ Start dynamic simulation -------')
     init_dynamic_output_file()
+    check_generators_model()
     
     network.build_network_Y_matrix('dynamic')  # calculation of nodal admittance matrix after load equivalence
     
@@ -35,6 +36,23 @@ def start_dynamic_simulation():
     print(data)
     return 
 
+def check_generators_model():
+    '''
+    Check the model of generators before dynamic simulation, the generators whose model is not solved 
+    in dynamic simulation would have no state variables.
+    Args: None
+    Rets: None
+    '''
+    unsupported = []
+    for generator in apis.get_all_devices('GENERATOR'):
+        GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
+        if GMN not in GENERATOR_MODELS:
+            unsupported.append('{} at generator {}'.format(GMN, generator))
+    if unsupported:
+        raise ValueError('Generator model {} is not supported in dynamic simulation, supported models are {}'.format(
+            ', '.join(unsupported), ', '.join(GENERATOR_MODELS)))
+    return
+
 def run_dynamic_simulation_to_time(stop_time):
     '''
     Run the simulation to a certain time
@@ -64,14 +82,14 @@ def run_dynamic_simulation_to_a_step():
     generators = apis.get_all_devices('GENERATOR')
     
     solve_dynamic_bus_voltage(True)  # Solving the actual transient voltage of system bus
+    solve_generators_model_state_variables(False)  # Generator models are solved before exciters and governors
     for generator in generators:
-        solve_model_state_variables(generator, 'GEN', False)
         solve_model_state_variables(generator, 'AVR', False)
         solve_model_state_variables(generator, 'GOV', False)
     
     solve_dynamic_bus_voltage(False)  # Solving the estimated transient voltage of system bus
+    solve_generators_model_state_variables(True)
     for generator in generators:
-        solve_model_state_variables(generator, 'GEN', True)
         solve_model_state_variables(generator, 'AVR', True)
         solve_model_state_variables(generator, 'GOV', True) 
     
@@ -80,7 +80,7 @@ def get_network_Z_matrix_element(row, column, par_type):
     Rets:
         value, Z matrix value located at (row, column).
     '''
-    Y_mat = apis_system.get_system_Y_network_matrix(par_type)
+    Y_mat = apis_system.get_system_Y_network_matrix_dense(par_type)
     buses = apis.get_all_devices('BUS')
     I = np.zeros(len(buses))
     I[row] = 1.0
@@ -4,8 +4,9 @@ import sys
 sys.path.append('..')
 from apis import apis_system
 
-from .net_dm import calculate_dynamic_Y_matrix
-from .net_pf import calculate_network_Y_matrix
+from .net_dm import calculate_dynamic_Y_matrix, calculate_generator_internal_admittance, calculate_generator_saliency_factor
+from .net_pf import calculate_network_Y_matrix, get_network_branch_data, assemble_network_Y_matrix, get_dc_branch_data
+from .net_pf import get_branch_circuit_data, assemble_branch_Y_matrix
 from .net_sq import calculate_sequence_Y_matrix
 
 
@@ -16,6 +17,12 @@ def build_network_Y_matrix(par_type):
         par_type, str, Y matrix type, including basic, B1, B2, positive, negative, zero, dynamic.
     Rets: None
     '''
+    if par_type in ('basic', 'B1', 'B2'):  # Only depend on network, reuse it if no network edit since built
+        current = apis_system.is_system_Y_network_matrix_current(par_type)
+        apis_system.count_system_Y_matrix_cache(par_type, current)
+        if current is True:
+            return
+        
     if par_type == 'basic':
         Y_mat = calculate_network_Y_matrix()
         apis_system.set_system_Y_network_matrix('basic', Y_mat)
@@ -49,6 +56,40 @@ def build_network_Y_matrix(par_type):
         pass
     return
 
+def build_powerflow_network_matrix():
+    '''
+    Build the basic, B' and B'' matrixes for power flow with one gather of branch data, and store them in database.
+    A matrix is reused if no network edit since built.
+    Args: None
+    Rets:
+        (1) Y_mat, csr_matrix, basic Y matrix.
+        (2) B1_mat, csr_matrix, B' matrix of PQ and PV buses.
+        (3) B2_mat, csr_matrix, B'' matrix of PQ buses.
+    '''
+    options = {'basic': (True, True), 'B1': (False, True), 'B2': (True, False)}
+    par_types = []
+    for par_type in options.keys():
+        current = apis_system.is_system_Y_network_matrix_current(par_type)
+        apis_system.count_system_Y_matrix_cache(par_type, current)
+        if current is False:
+            par_types.append(par_type)
+    
+    if par_types:
+        branch_data = get_network_branch_data()
+        for par_type in par_types:
+            c, r = options[par_type]
+            Y_mat = assemble_network_Y_matrix(branch_data, c, r)
+            if par_type != 'basic':
+                Y_mat = Y_mat.imag
+            apis_system.set_system_Y_network_matrix(par_type, Y_mat)
+    
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
+    Y_mat = apis_system.get_system_Y_network_matrix('basic')
+    B1_mat = apis_system.get_system_Y_network_matrix_block('B1', PQ_num + PV_num)
+    B2_mat = apis_system.get_system_Y_network_matrix_block('B2', PQ_num)
+    return Y_mat, B1_mat, B2_mat
+
 def save_network_Y_matrix(file, par_type):
     '''
     Save the network node admittance matrix.
@@ -59,13 +100,14 @@ def save_network_Y_matrix(file, par_type):
     Y_mat = apis_system.get_system_Y_network_matrix(par_type)
     
     data = []
-    for i in range(Y_mat.shape[0]):
-        for j in range(Y_mat.shape[1]):
-            if Y_mat[i, j] != 0:
+    for i in range(Y_mat.shape[0]):  # Nonzero elements row by row
+        for a in range(Y_mat.indptr[i], Y_mat.indptr[i + 1]):
+            j, value = Y_mat.indices[a], Y_mat.data[a]
+            if value != 0:
                 m = apis_system.get_bus_num_before_renumber(i)
                 n = apis_system.get_bus_num_before_renumber(j)
-                g = round(Y_mat[i, j].real, 6)
-                b = round(Y_mat[i, j].imag, 6)
+                g = round(value.real, 6)
+                b = round(value.imag, 6)
                 data.append([i, m, j, n, g, b])
                 
     with open(file, 'w', newline='') as f:
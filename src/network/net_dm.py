@@ -2,6 +2,7 @@
 import sys
 sys.path.append('..')
 import numpy as np
+import scipy.sparse as sp
 
 import apis
 from apis import apis_basic
@@ -13,58 +14,83 @@ def calculate_dynamic_Y_matrix():
     Calculate the network node admittance matrix needed for dynamic simulation.
     The load is equivalent to a constant admittance and incorporated into the generator impedance
     Args: None
-    Rets: None
+    Rets:
+        Y_mat, csr_matrix, dynamic Y matrix in renumbered bus order.
     '''
     Y_mat = apis_system.get_system_Y_network_matrix('basic')
     SBASE = apis_system.get_system_base_data('SBASE')
     loads = apis.get_all_devices('LOAD')
-    for load in loads:
-        VM = apis.get_device_data(load, 'BUS', 'VM')
-        PL = apis.get_device_data(load, 'LOAD', 'PL')
-        QL = apis.get_device_data(load, 'LOAD', 'QL')
-        
-        i = apis_system.get_bus_num_after_renumber(load)
-        Y_mat[i, i] = Y_mat[i, i] + (PL - 1j*QL) / SBASE / VM**2
+    VM = apis.get_device_data_array('BUS', 'VM', loads)
+    PL = apis.get_device_data_array('LOAD', 'PL')
+    QL = apis.get_device_data_array('LOAD', 'QL')
+    i_load = apis_system.get_device_internal_bus_index('LOAD')
+    Y_load = (PL - 1j*QL) / SBASE / VM**2
         
     generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        YGp = calculate_generator_internal_admittance(generator)
-        i = apis_system.get_bus_num_after_renumber(generator)
-        Y_mat[i, i] = Y_mat[i, i] + YGp
+    i_gen = apis_system.get_device_internal_bus_index('GENERATOR')
+    YGp = np.array([calculate_generator_internal_admittance(generator) for generator in generators], dtype=complex)
     
+    i = np.concatenate((i_load, i_gen))
+    Y_shunt = sp.csr_matrix((np.concatenate((Y_load, YGp)), (i, i)), shape=Y_mat.shape, dtype=complex)  # Duplicate entries are summed
+    Y_mat = Y_mat + Y_shunt
     return Y_mat
     
-def calculate_generator_internal_admittance(generator):
+def get_generator_internal_reactance(generator):
     '''
-    Calculate the internal admittance YGP of generator connected to grid
+    Get the d-axis and q-axis reactance of generator behind its internal potential, in system base.
     Args:
-        generator, generator bus number, int
+        generator, int, generator bus number.
     Rets:
-        YGp, generator internal admittance connected to grid, float, complex
+        (1) Xd, float, d-axis reactance, None if the generator model is not supported.
+        (2) Xq, float, q-axis reactance, equal to Xd for GENCLS model, None if the generator model is not supported.
     '''
     GMN = apis.get_generator_related_model_data(generator, 'GEN', 'GMN')
-    SBASE = apis_system.get_system_base_data('SBASE')
-    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
     if GMN == 'GENCLS':
         # The d-axis reactance of the second order model is stored in the power flow database.
         Xd = apis.get_device_data(generator, 'GENERATOR', 'ZX')
-        Xd = Xd * SBASE / MBASE  # Convert reactance from machine base to system base.
-        YGp = 1.0 / (1j * Xd)
+        Xq = Xd
         
-    else:
-        if GMN == 'GENROU' or GMN == 'GENSAL':
-            Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdpp')
-            Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xqpp')
-            
-        elif GMN == 'GENTRA':
-            Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
-            Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xq')
-            
-        else:
-            Xd = 0.0
-            Xq = 0.0
-        Xd = Xd * SBASE / MBASE  # Convert reactance from machine base to system base.
-        Xq = Xq * SBASE / MBASE
-        YGp = -0.5j * (Xd + Xq) / (Xd * Xq)
+    elif GMN == 'GENROU' or GMN == 'GENSAL':
+        Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdpp')
+        Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xqpp')
+        
+    elif GMN == 'GENTRA':
+        Xd = apis.get_generator_related_model_data(generator, 'GEN', 'Xdp')
+        Xq = apis.get_generator_related_model_data(generator, 'GEN', 'Xq')
         
+    else:
+        return None, None
+    
+    SBASE = apis_system.get_system_base_data('SBASE')
+    MBASE = apis.get_device_data(generator, 'GENERATOR', 'MBASE')
+    Xd = Xd * SBASE / MBASE  # Convert reactance from machine base to system base.
+    Xq = Xq * SBASE / MBASE
+    return Xd, Xq
+
+def calculate_generator_internal_admittance(generator):
+    '''
+    Calculate the internal admittance YGP of generator connected to grid
+    Args:
+        generator, generator bus number, int
+    Rets:
+        YGp, generator internal admittance connected to grid, complex, zero if the generator model is not supported.
+    '''
+    Xd, Xq = get_generator_internal_reactance(generator)
+    if Xd is None:
+        return 0.0 + 0.0j
+    YGp = -0.5j * (Xd + Xq) / (Xd * Xq)  # 1 / (jXd) when Xd equals Xq
     return YGp
+
+def calculate_generator_saliency_factor(generator):
+    '''
+    Calculate the saliency factor KG of generator, the injection current I2 is KG * (E* - Vt*) * exp(j2delta).
+    Args:
+        generator, int, generator bus number.
+    Rets:
+        KG, complex, saliency factor, zero for GENCLS model or if the generator model is not supported.
+    '''
+    Xd, Xq = get_generator_internal_reactance(generator)
+    if Xd is None:
+        return 0.0 + 0.0j
+    KG = 0.5j * (Xd - Xq) / (Xd * Xq)
+    return KG
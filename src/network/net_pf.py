@@ -1,5 +1,6 @@
 import sys
 import numpy as np
+import scipy.sparse as sp
 sys.path.append('..')
 
 import apis
@@ -13,157 +14,258 @@ def calculate_network_Y_matrix(c=True, r=True):
         (1) c, bool, considering the charging capacitance and the nonstandard transformer ratio.
         (2) r, bool, considering branch resistance.
     Rest:
-        Y_mat: nodal admittance matrix, array.
+        Y_mat: nodal admittance matrix, csr_matrix.
     '''
-    buses = apis.get_all_devices('BUS')
-    Y_mat = np.zeros((len(buses), len(buses)), dtype = complex)  
-    lines = apis.get_all_devices('LINE')
-    transformers = apis.get_all_devices('TRANSFORMER')
+    branch_data = get_network_branch_data()
+    Y_mat = assemble_network_Y_matrix(branch_data, c, r)
+    return Y_mat
+
+def get_network_branch_data():
+    '''
+    Gather the parameter arrays and renumbered bus indexes of lines, transformers and shunts in one call.
+    Args: None
+    Rets:
+        branch_data, dict, {'LINE': {par_name: array}, 'TRANSFORMER': {par_name: array}, 'SHUNT': {par_name: array}, 'bus_num': int}, 
+            the renumbered bus index arrays are stored as 'i', 'j' and 'k', k is -1 for two winding transformer.
+    '''
+    branch_data = {'bus_num': len(apis.get_all_devices('BUS'))}
     
-    for line in lines:  
-        i = apis_system.get_bus_num_after_renumber(line[0])
-        j = apis_system.get_bus_num_after_renumber(line[1])
- 
-        Yij, Yi, Yj = build_line_equivalent_circuit(line, c, r)
-        
-        Y_mat[i, j] = Y_mat[i, j] - Yij 
-        Y_mat[j, i] = Y_mat[j, i] - Yij
-        Y_mat[i, i] = Y_mat[i, i] + Yij + Yi 
-        Y_mat[j, j] = Y_mat[j, j] + Yij + Yj 
-    
-    for transformer in transformers:
-        if transformer[2] == 0:
-            i = apis_system.get_bus_num_after_renumber(transformer[0])
-            j = apis_system.get_bus_num_after_renumber(transformer[1])
-            
-            Yij, Yi, Yj = build_transformer2_equivalent_circuit(transformer, c, r)
-        
-            Y_mat[i, j] = Y_mat[i, j] - Yij
-            Y_mat[j, i] = Y_mat[j, i] - Yij
-            Y_mat[i, i] = Y_mat[i, i] + Yij + Yi   
-            Y_mat[j, j] = Y_mat[j, j] + Yij + Yj 
-            
-        else:
-            i = apis_system.get_bus_num_after_renumber(transformer[0])
-            j = apis_system.get_bus_num_after_renumber(transformer[1])   
-            k = apis_system.get_bus_num_after_renumber(transformer[2])
-            
-            trans3_Y_mat = build_transformer3_equivalent_circuit(transformer, c, r)
-        
-            Y_mat[i, i] = Y_mat[i, i] + trans3_Y_mat[0, 0]
-            Y_mat[i, j] = Y_mat[i, j] + trans3_Y_mat[0, 1]
-            Y_mat[i, k] = Y_mat[i, k] + trans3_Y_mat[0, 2]
-            Y_mat[j, i] = Y_mat[j, i] + trans3_Y_mat[1, 0]
-            Y_mat[j, j] = Y_mat[j, j] + trans3_Y_mat[1, 1]
-            Y_mat[j, k] = Y_mat[j, k] + trans3_Y_mat[1, 2]
-            Y_mat[k, i] = Y_mat[k, i] + trans3_Y_mat[2, 0]
-            Y_mat[k, j] = Y_mat[k, j] + trans3_Y_mat[2, 1]
-            Y_mat[k, k] = Y_mat[k, k] + trans3_Y_mat[2, 2]
+    line_data = {}
+    line_data['i'], line_data['j'] = apis_system.get_device_internal_bus_index('LINE')
+    for par_name in ('R', 'X', 'B', 'BI', 'BJ'):
+        line_data[par_name] = apis.get_device_data_array('LINE', par_name)
+    branch_data['LINE'] = line_data
+    
+    transformer_data = {}
+    transformer_data['i'], transformer_data['j'], transformer_data['k'] = apis_system.get_device_internal_bus_index('TRANSFORMER')
+    for par_name in ('MAG1', 'MAG2', 'R1_2', 'X1_2', 'R2_3', 'X2_3', 'R3_1', 'X3_1', 'WINDV1', 'WINDV2', 'WINDV3'):
+        transformer_data[par_name] = apis.get_device_data_array('TRANSFORMER', par_name)
+    branch_data['TRANSFORMER'] = transformer_data
+    
+    shunt_data = {}
+    shunt_data['i'] = apis_system.get_device_internal_bus_index('SHUNT')
+    shunt_data['BL'] = apis.get_device_data_array('SHUNT', 'BL')
+    branch_data['SHUNT'] = shunt_data
+    return branch_data
 
+def assemble_network_Y_matrix(branch_data, c=True, r=True):
+    '''
+    Assemble system Y matrix from branch data with one COO to CSR construction, duplicate entries are summed.
+    Args:
+        (1) branch_data, dict, branch data gathered by get_network_branch_data.
+        (2) c, bool, considering the charging capacitance and the nonstandard transformer ratio.
+        (3) r, bool, considering branch resistance.
+    Rets:
+        Y_mat: nodal admittance matrix, csr_matrix.
+    '''
+    rows, cols, values = [], [], []
+    
+    line_data = branch_data['LINE']
+    i, j = line_data['i'], line_data['j']
+    Yij, Yi, Yj = build_line_equivalent_circuit(line_data, c, r)
+    rows.extend([i, j, i, j])
+    cols.extend([j, i, i, j])
+    values.extend([- Yij, - Yij, Yij + Yi, Yij + Yj])
+    
+    transformer_data = branch_data['TRANSFORMER']
+    two = transformer_data['k'] < 0
+    three = ~ two
+    i, j = transformer_data['i'][two], transformer_data['j'][two]
+    Yij, Yi, Yj = build_transformer2_equivalent_circuit(select_branch_data(transformer_data, two), c, r)
+    rows.extend([i, j, i, j])
+    cols.extend([j, i, i, j])
+    values.extend([- Yij, - Yij, Yij + Yi, Yij + Yj])
+    
+    nodes = (transformer_data['i'][three], transformer_data['j'][three], transformer_data['k'][three])
+    trans3_Y_mat = build_transformer3_equivalent_circuit(select_branch_data(transformer_data, three), c, r)
+    for m in range(3):
+        for n in range(3):
+            rows.append(nodes[m])
+            cols.append(nodes[n])
+            values.append(trans3_Y_mat[:, m, n])
+    
     if c is True:
-        shunts = apis.get_all_devices('SHUNT')
-        for shunt in shunts:  
-            i = apis_system.get_bus_num_after_renumber(shunt)
-            BL = apis.get_device_data(shunt, 'SHUNT', 'BL')
-            SBASE = apis_system.get_system_base_data('SBASE')
-            Y_mat[i, i] = Y_mat[i, i] + 1j * BL / SBASE
+        shunt_data = branch_data['SHUNT']
+        SBASE = apis_system.get_system_base_data('SBASE')
+        rows.append(shunt_data['i'])
+        cols.append(shunt_data['i'])
+        values.append(1j * shunt_data['BL'] / SBASE)
+    
+    n = branch_data['bus_num']
+    rows = np.concatenate(rows).astype(int)
+    cols = np.concatenate(cols).astype(int)
+    values = np.concatenate(values).astype(complex)
+    Y_mat = sp.coo_matrix((values, (rows, cols)), shape=(n, n)).tocsr()
+    return Y_mat
 
+def get_dc_branch_data(branch_data=None):
+    '''
+    Get the lines and two winding transformers with the series susceptance used by B', 
+    the DC power flow of a branch is b * (Ua[i] - Ua[j]).
+    Args:
+        branch_data, dict, branch data gathered by get_network_branch_data, gathered if None.
+    Rets:
+        dc_branch_data, dict, {'keys': list, 'i': array, 'j': array, 'b': array, 'bus_num': int}, 
+            lines come first and then two winding transformers, in the order of get_all_devices.
+    '''
+    if branch_data is None:
+        branch_data = get_network_branch_data()
+        
+    line_data = branch_data['LINE']
+    Yline, _, _ = build_line_equivalent_circuit(line_data, False, True)
+    
+    transformer_data = branch_data['TRANSFORMER']
+    two = transformer_data['k'] < 0
+    Ytrans, _, _ = build_transformer2_equivalent_circuit(select_branch_data(transformer_data, two), False, True)
+    transformers = apis.get_all_devices('TRANSFORMER')
+    
+    dc_branch_data = {'bus_num': branch_data['bus_num']}
+    dc_branch_data['keys'] = list(apis.get_all_devices('LINE')) + [transformers[a] for a in np.flatnonzero(two)]
+    dc_branch_data['i'] = np.concatenate((line_data['i'], transformer_data['i'][two])).astype(int)
+    dc_branch_data['j'] = np.concatenate((line_data['j'], transformer_data['j'][two])).astype(int)
+    dc_branch_data['b'] = - np.concatenate((Yline, Ytrans)).astype(complex).imag
+    return dc_branch_data
+
+def get_branch_circuit_data(branch_data=None):
+    '''
+    Get the pi equivalent circuits of lines and two winding transformers, to calculate branch power flow.
+    Args:
+        branch_data, dict, branch data gathered by get_network_branch_data, gathered if None.
+    Rets:
+        circuit_data, dict, {'device': list, 'keys': list, 'i': array, 'j': array, 'Yij': array, 'Yi': array, 'Yj': array, 'RATE': array},
+            lines come first and then two winding transformers, in the order of get_all_devices, RATE is RATEA or RATA1 in MVA.
+    '''
+    if branch_data is None:
+        branch_data = get_network_branch_data()
+    
+    line_data = branch_data['LINE']
+    Yline = build_line_equivalent_circuit(line_data, True, True)
+    lines = apis.get_all_devices('LINE')
+    
+    transformer_data = branch_data['TRANSFORMER']
+    two = transformer_data['k'] < 0
+    Ytrans = build_transformer2_equivalent_circuit(select_branch_data(transformer_data, two), True, True)
+    transformers = apis.get_all_devices('TRANSFORMER')
+    transformers = [transformers[a] for a in np.flatnonzero(two)]
+    
+    circuit_data = {'device': ['LINE'] * len(lines) + ['TRANSFORMER'] * len(transformers), 'keys': list(lines) + transformers}
+    circuit_data['i'] = np.concatenate((line_data['i'], transformer_data['i'][two])).astype(int)
+    circuit_data['j'] = np.concatenate((line_data['j'], transformer_data['j'][two])).astype(int)
+    for a, name in enumerate(('Yij', 'Yi', 'Yj')):
+        circuit_data[name] = np.concatenate((Yline[a], Ytrans[a])).astype(complex)
+    RATA1 = apis.get_device_data_array('TRANSFORMER', 'RATA1')[two]
+    circuit_data['RATE'] = np.concatenate((apis.get_device_data_array('LINE', 'RATEA'), RATA1))
+    return circuit_data
+
+def assemble_branch_Y_matrix(branch_data, device, rows):
+    '''
+    Assemble the Y matrix of some lines or transformers only, it is the change of system Y matrix when they are out of service.
+    Args:
+        (1) branch_data, dict, branch data gathered by get_network_branch_data.
+        (2) device, str, 'LINE' or 'TRANSFORMER'.
+        (3) rows, array, rows of devices in the order of get_all_devices.
+    Rets:
+        Y_mat, csr_matrix, Y matrix of the branches.
+    '''
+    branch_Y_data = {'bus_num': branch_data['bus_num'], 'SHUNT': {'i': np.zeros(0, dtype=int), 'BL': np.zeros(0)}}
+    for name in ('LINE', 'TRANSFORMER'):
+        mask = np.zeros(len(branch_data[name]['i']), dtype=bool)
+        if name == device:
+            mask[rows] = True
+        branch_Y_data[name] = select_branch_data(branch_data[name], mask)
+    Y_mat = assemble_network_Y_matrix(branch_Y_data)
     return Y_mat
+
+def select_branch_data(data, mask):
+    '''
+    Select a subset of branch data.
+    Args:
+        (1) data, dict, branch parameter arrays.
+        (2) mask, array, bool mask of selected branches.
+    Rets:
+        data, dict, selected branch parameter arrays.
+    '''
+    return {par_name: value[mask] for par_name, value in data.items()}
     
-def build_line_equivalent_circuit(line, c, r):
+def build_line_equivalent_circuit(line_data, c, r):
     '''
-    Build equivalent circuit of transmission line.
+    Build equivalent circuit of transmission lines.
     Args:
-        (1) line, tuple, (IBUS, JBUS, CKT).
+        (1) line_data, dict, line parameter arrays, including R, X, B, BI, BJ.
         (2) c, bool, considering the charging capacitance and the nonstandard transformer ratio.
         (3) r, bool, considering branch resistance.
     Rets:
-        (1) Yij, mutual admittance.
-        (2) Yi, I-side self admittance.
-        (3) Yj, J-side self admittance.
+        (1) Yij, array, mutual admittance.
+        (2) Yi, array, I-side self admittance.
+        (3) Yj, array, J-side self admittance.
     '''
-    R = apis.get_device_data(line, 'LINE', 'R')
-    X = apis.get_device_data(line, 'LINE', 'X')
-    Yij = 1.0 / complex(R, X)
+    R, X = line_data['R'], line_data['X']
+    Yij = 1.0 / (R + 1j * X)
     if r is False:
         Yij = 1.0 / (1j * X)
         
-    B = apis.get_device_data(line, 'LINE', 'B') 
-    BI = apis.get_device_data(line, 'LINE', 'BI')
-    BJ = apis.get_device_data(line, 'LINE', 'BJ')
-    
+    B, BI, BJ = line_data['B'], line_data['BI'], line_data['BJ']
     Yi = 0.5j * B + 1j * BI
     Yj = 0.5j * B + 1j * BJ
     if c is False:
-        Yi, Yj = 0.0, 0.0
+        Yi, Yj = np.zeros(len(R)), np.zeros(len(R))
         
     return Yij, Yi, Yj 
     
-def build_transformer2_equivalent_circuit(transformer, c, r):
+def build_transformer2_equivalent_circuit(transformer_data, c, r):
     '''
-    Build equivalent circuit of two winding transformer.
+    Build equivalent circuit of two winding transformers.
     Args:
-        (1) transformer, tuple, (IBUS, JBUS, KBUS).
+        (1) transformer_data, dict, transformer parameter arrays, including MAG1, MAG2, R1_2, X1_2, WINDV1, WINDV2.
         (2) c, bool, considering the charging capacitance and the nonstandard transformer ratio.
         (3) r, bool, considering branch resistance.      
     Rets:
-        (1) Yij, mutual admittance.
-        (2) Yi, I-side self admittance.
-        (3) Yj, J-side self admittance.
+        (1) Yij, array, mutual admittance.
+        (2) Yi, array, I-side self admittance.
+        (3) Yj, array, J-side self admittance.
     '''
-    MAG1 = apis.get_device_data(transformer, 'TRANSFORMER', 'MAG1')
-    MAG2 = apis.get_device_data(transformer, 'TRANSFORMER', 'MAG2')
-    exci_admit = complex(MAG1, MAG2) 
+    exci_admit = transformer_data['MAG1'] + 1j * transformer_data['MAG2']
     
-    R1_2 = apis.get_device_data(transformer, 'TRANSFORMER', 'R1_2')
-    X1_2 = apis.get_device_data(transformer, 'TRANSFORMER', 'X1_2')    
-    Zps = complex(R1_2, X1_2)  
+    R1_2, X1_2 = transformer_data['R1_2'], transformer_data['X1_2']
+    Zps = R1_2 + 1j * X1_2
     if r is False:
         Zps = 1j * X1_2
 
-    WINDV1 = apis.get_device_data(transformer, 'TRANSFORMER', 'WINDV1')
-    WINDV2 = apis.get_device_data(transformer, 'TRANSFORMER', 'WINDV2')        
-    k = WINDV1 / WINDV2  
+    k = transformer_data['WINDV1'] / transformer_data['WINDV2']
     if c is False:
-        k = 1.0
-        exci_admit = 0.0
+        k = np.ones(len(k))
+        exci_admit = np.zeros(len(k))
     Yij = 1 / (k * Zps)  
     Yj = (k - 1) / (k * Zps) 
     Yi = (1 - k) / (k ** 2 * Zps) + exci_admit  
     
     return Yij, Yi, Yj
     
-def build_transformer3_equivalent_circuit(transformer, c, r):
+def build_transformer3_equivalent_circuit(transformer_data, c, r):
     '''
-    Build the equivalent circuit of three winding transformer.
+    Build the equivalent circuit of three winding transformers.
     Args:
-        (1) transformer, tuple, (IBUS, JBUS, KBUS).
+        (1) transformer_data, dict, transformer parameter arrays, including R1_2, X1_2, R2_3, X2_3, R3_1, X3_1, WINDV1, WINDV2, WINDV3.
         (2) c, bool, True is to include non-standard transformation ratio.
         (3) r, bool, True is represent branch resistance.        
     Rets:
-        trans3_Y_mat, array, Admittance matrix of three winding transformer. 
-    '''
-    R1_2 = apis.get_device_data(transformer, 'TRANSFORMER', 'R1_2')
-    X1_2 = apis.get_device_data(transformer, 'TRANSFORMER', 'X1_2')        
-    R3_1 = apis.get_device_data(transformer, 'TRANSFORMER', 'R3_1')
-    X3_1 = apis.get_device_data(transformer, 'TRANSFORMER', 'X3_1')
-    R2_3 = apis.get_device_data(transformer, 'TRANSFORMER', 'R2_3')        
-    X2_3 = apis.get_device_data(transformer, 'TRANSFORMER', 'X2_3')
-    
-    Zp = 0.5 * (complex(R1_2, X1_2) + complex(R3_1, X3_1) - complex(R2_3, X2_3))  
-    Zs = 0.5 * (complex(R1_2, X1_2) + complex(R2_3, X2_3) - complex(R3_1, X3_1))
-    Zt = 0.5 * (complex(R3_1, X3_1) + complex(R2_3, X2_3) - complex(R1_2, X1_2))
+        trans3_Y_mat, array, admittance matrixes of three winding transformers in shape of (number, 3, 3). 
+    '''
+    R1_2, X1_2 = transformer_data['R1_2'], transformer_data['X1_2']
+    R2_3, X2_3 = transformer_data['R2_3'], transformer_data['X2_3']
+    R3_1, X3_1 = transformer_data['R3_1'], transformer_data['X3_1']
+    
+    Zp = 0.5 * ((R1_2 + 1j * X1_2) + (R3_1 + 1j * X3_1) - (R2_3 + 1j * X2_3))  
+    Zs = 0.5 * ((R1_2 + 1j * X1_2) + (R2_3 + 1j * X2_3) - (R3_1 + 1j * X3_1))
+    Zt = 0.5 * ((R3_1 + 1j * X3_1) + (R2_3 + 1j * X2_3) - (R1_2 + 1j * X1_2))
     if r is False:  
         Zp = 0.5 * (1j * X1_2 + 1j * X3_1 - 1j * X2_3)  
         Zs = 0.5 * (1j * X1_2 + 1j * X2_3 - 1j * X3_1)
         Zt = 0.5 * (1j * X3_1 + 1j * X2_3 - 1j * X1_2) 
         
-    WINDV1 = apis.get_device_data(transformer, 'TRANSFORMER', 'WINDV1')
-    WINDV2 = apis.get_device_data(transformer, 'TRANSFORMER', 'WINDV2')        
-    WINDV3 = apis.get_device_data(transformer, 'TRANSFORMER', 'WINDV3') 
-    kp, ks, kt = WINDV1, WINDV2, WINDV3
+    kp, ks, kt = transformer_data['WINDV1'], transformer_data['WINDV2'], transformer_data['WINDV3']
     if c is False:  
-        kp, ks, kt = 1.0, 1.0, 1.0
+        kp, ks, kt = np.ones(len(kp)), np.ones(len(kp)), np.ones(len(kp))
         
     Yeq1, Yeq2, Yeq3 = 1 / (kp * Zp), 1 / (ks * Zs), 1 / (kt * Zt)
     Yeq22 = (1 - ks) / (ks ** 2 * Zs)
@@ -172,17 +274,15 @@ def build_transformer3_equivalent_circuit(transformer, c, r):
     Yeq31 = (kt - 1) / (kt * Zt)
     
     temp = Yeq1 + Yeq2 + Yeq3 + Yeq21 + Yeq31  #Eliminating star node of three winding transformer
-    Y11 = Yeq1 - Yeq1 ** 2 / temp  
-    Y12 = - Yeq1 * Yeq2 / temp  
-    Y13 = - Yeq1 * Yeq3 / temp  
-    Y21 = - Yeq1 * Yeq2 / temp  
-    Y22 = Yeq2 + Yeq22 - Yeq2 ** 2 / temp  
-    Y23 = - Yeq2 * Yeq3 / temp  
-    Y31 = - Yeq3 * Yeq1 / temp  
-    Y32 = - Yeq3 * Yeq2 / temp  
-    Y33 = Yeq3 + Yeq32 - Yeq3 ** 2 / temp  
-    
-    trans3_Y_mat = np.array([[Y11, Y12, Y13], [Y21, Y22, Y23], [Y31, Y32, Y33]], dtype = complex)  
+    trans3_Y_mat = np.zeros((len(kp), 3, 3), dtype = complex)
+    trans3_Y_mat[:, 0, 0] = Yeq1 - Yeq1 ** 2 / temp  
+    trans3_Y_mat[:, 0, 1] = - Yeq1 * Yeq2 / temp  
+    trans3_Y_mat[:, 0, 2] = - Yeq1 * Yeq3 / temp  
+    trans3_Y_mat[:, 1, 0] = - Yeq1 * Yeq2 / temp  
+    trans3_Y_mat[:, 1, 1] = Yeq2 + Yeq22 - Yeq2 ** 2 / temp  
+    trans3_Y_mat[:, 1, 2] = - Yeq2 * Yeq3 / temp  
+    trans3_Y_mat[:, 2, 0] = - Yeq3 * Yeq1 / temp  
+    trans3_Y_mat[:, 2, 1] = - Yeq3 * Yeq2 / temp  
+    trans3_Y_mat[:, 2, 2] = Yeq3 + Yeq32 - Yeq3 ** 2 / temp  
     
     return trans3_Y_mat
-  
\ No newline at end of file
@@ -15,13 +15,14 @@ def save_network_admittance_matrix(par_type, file):
     Y_mat = apis_system.get_system_Y_network_matrix(par_type)
     
     data = []
-    for i in range(Y_mat.shape[0]):
-        for j in range(Y_mat.shape[1]):
-            if Y_mat[i, j] != 0:
+    for i in range(Y_mat.shape[0]):  # Nonzero elements row by row
+        for a in range(Y_mat.indptr[i], Y_mat.indptr[i + 1]):
+            j, value = Y_mat.indices[a], Y_mat.data[a]
+            if value != 0:
                 m = apis_system.get_bus_num_before_renumber(i)
                 n = apis_system.get_bus_num_before_renumber(j)
-                g = round(Y_mat[i, j].real, 6)
-                b = round(Y_mat[i, j].imag, 6)
+                g = round(value.real, 6)
+                b = round(value.imag, 6)
                 data.append([i, m, j, n, g, b])
                 
     with open(file, 'w', newline='') as f:
@@ -39,7 +39,7 @@ def calculate_positive_Y_matrix():
     Rets:
         Y_mat, array, positive nodal admittance matrix.
     '''
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
+    Y_mat = apis_system.get_system_Y_network_matrix_dense('basic').copy()
     SBASE = apis_system.get_system_base_data('SBASE')
     
     generators = apis.get_all_devices('GENERATOR')  # add generator
@@ -104,7 +104,7 @@ def calculate_negative_Y_matrix():
     Rets:
         Y_mat, array, negative nodal admittance matrix.
     '''
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
+    Y_mat = apis_system.get_system_Y_network_matrix_dense('basic').copy()
     SBASE = apis_system.get_system_base_data('SBASE')
     
     generators = apis.get_all_devices('GENERATOR')
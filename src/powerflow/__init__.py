@@ -8,32 +8,44 @@ from .method_NR import solve_powerflow_with_NR_method
 from .method_PQ import solve_powerflow_with_PQ_method
 from .method_DC import solve_powerflow_with_DC_method
 from .branch import init_powerflow_solution, update_powerflow, show_powerflow_result
+from .branch import get_powerflow_start_voltage, save_powerflow_solution
 from .powerflow_result import get_powerflow_result
+from .sensitivity import solve_dc_angle, calculate_ptdf, calculate_lodf
+from .batch import get_powerflow_injection, solve_powerflow_batch
+from .contingency import solve_contingency_analysis, save_contingency_result
 
 
-def solve_powerflow(method):
+def solve_powerflow(method, start='flat'):
     '''
     Power flow solving function.
     Args:
-        method, str, 'PQ' or 'NR', 'DC'.
+        (1) method, str, 'PQ' or 'NR', 'DC'.
+        (2) start, str or array, 'flat', 'previous' for the last converged solution, 'case' for bus data VM and VA,
+            or complex node voltage in pu in the order of get_all_devices('BUS'), not used by 'DC'.
     Rets: None
     '''
-    network.build_network_Y_matrix('basic')
-    S, Um, Ua = init_powerflow_solution()  # flat start
+    if method == 'PQ' or method == 'DC':
+        network.build_powerflow_network_matrix()  # basic, B' and B'' in one pass
+    else:
+        network.build_network_Y_matrix('basic')
+    V = None
+    if method != 'DC':
+        V = get_powerflow_start_voltage(start)
+    if V is None:
+        start = 'flat'
+    S, Um, Ua = init_powerflow_solution(V)
     
     if method == 'NR':
-        S, Um, Ua = solve_powerflow_with_NR_method(S, Um, Ua)
+        S, Um, Ua, k = solve_powerflow_with_NR_method(S, Um, Ua)
         update_powerflow(S, Um, Ua)   
+        save_powerflow_solution(method, start, Um, Ua, k)
         
     elif method == 'PQ':
-        network.build_network_Y_matrix('B1')
-        network.build_network_Y_matrix('B2')
-        S, Um, Ua = solve_powerflow_with_PQ_method(S, Um, Ua)  
+        S, Um, Ua, k = solve_powerflow_with_PQ_method(S, Um, Ua)  
         update_powerflow(S, Um, Ua) 
+        save_powerflow_solution(method, start, Um, Ua, k)
         
     elif method == 'DC':
-        network.build_network_Y_matrix('B1')
-        network.build_network_Y_matrix('B2')
         solve_powerflow_with_DC_method(S, Um, Ua)  
         
     else:
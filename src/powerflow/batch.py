@@ -0,0 +1,195 @@
+# Batch power flow
+# Many injection scenarios are solved together on one Y matrix. The node voltages of all scenarios are stacked as
+# columns, so the power mismatch is one sparse matrix product and the correction equations are solved with one 
+# factor for all scenarios. The results are returned as arrays and the device data are not changed.
+import sys
+sys.path.append('..')
+import numpy as np
+
+import apis
+import network
+from apis import apis_system
+from apis import apis_basic
+
+from .branch import calculate_node_power_injection, get_powerflow_start_voltage, get_powerflow_start_solution
+from .mismatch import calculate_node_power, calculate_power_mismatch
+from .method_NR import build_jacobian_matrix
+from .linear_solver import factorize_linear_system, solve_linear_factor, get_Y_matrix_factor
+
+
+def get_powerflow_injection():
+    '''
+    Get node complex power injection of loads, generators and HVDC, as the base of batch power flow scenarios.
+    Args: None
+    Rets:
+        injection, array, node complex power injection in MVA in the order of get_all_devices('BUS').
+    '''
+    SBASE = apis_system.get_system_base_data('SBASE')
+    bus_index = apis_system.get_device_internal_bus_index('BUS')
+    injection = calculate_node_power_injection()[bus_index] * SBASE
+    return injection
+
+def solve_powerflow_batch(injections, method='NR', start='previous'):
+    '''
+    Solve power flow of many injection scenarios together. The Y matrix and its factors are shared by all scenarios,
+    all scenarios are started from the same voltage, and a scenario stops iterating once it converges.
+    Active power of PQ and PV buses and reactive power of PQ buses are taken from injections, 
+    PV and swing bus voltage and swing bus angle are taken from bus data.
+    Args:
+        (1) injections, array, node complex power injection in MVA in shape of (scenario number, bus number), 
+            columns in the order of get_all_devices('BUS'), HVDC converter power is included.
+        (2) method, str, 'NR' or 'PQ'. NR shares the Jacobian matrix at start voltage by all scenarios, and a scenario whose mismatch 
+            reduction ratio is larger than power flow parameter 'jacobian_ratio' is corrected with its own Jacobian matrix.
+        (3) start, str or array, start voltage of all scenarios, the same as solve_powerflow.
+    Rets:
+        result, dict, {'VM': array, 'VA': array, 'S': array, 'iterations': array, 'converged': array}, 
+            VM in pu, VA in deg and S the solved node power injection in MVA in shape of (scenario number, bus number), 
+            S gives the reactive power of PV buses and the power of swing buses.
+    '''
+    injections = np.atleast_2d(np.asarray(injections, dtype=complex))
+    bus_index = apis_system.get_device_internal_bus_index('BUS')
+    if injections.ndim != 2 or injections.shape[1] != len(bus_index):
+        print('Injections of shape {} is not match {} buses when solving batch power flow'.format(injections.shape, len(bus_index)))
+        return
+    if method not in ('NR', 'PQ'):
+        print('method {} is not supported when solving batch power flow'.format(method))
+        return
+    
+    if method == 'PQ':
+        network.build_powerflow_network_matrix()  # basic, B' and B'' in one pass
+    else:
+        network.build_network_Y_matrix('basic')
+    
+    SBASE = apis_system.get_system_base_data('SBASE')
+    scenario_num = injections.shape[0]
+    S = np.zeros((len(bus_index), scenario_num), dtype=complex)
+    S[bus_index] = injections.T / SBASE
+    
+    Um, Ua = get_powerflow_start_solution(get_powerflow_start_voltage(start))
+    Um = np.repeat(Um[:, np.newaxis], scenario_num, axis=1)
+    Ua = np.repeat(Ua[:, np.newaxis], scenario_num, axis=1)
+    
+    if method == 'NR':
+        Um, Ua, k = solve_batch_with_NR_method(S, Um, Ua)
+    else:
+        Um, Ua, k = solve_batch_with_PQ_method(S, Um, Ua)
+    
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
+    S_calc = calculate_node_power(Um, Ua)
+    S[PQ_num : ] = S[PQ_num : ].real + 1j * S_calc[PQ_num : ].imag  # Reactive power injection of PV node and balance node
+    S[PQ_num + PV_num : ] = S_calc[PQ_num + PV_num : ]  # Active power injection of balance node
+    
+    k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
+    converged = k < k_max
+    print('Batch power flow of {} scenarios with {} method: {} converged, max iteration number {}'.format(
+        scenario_num, method, np.count_nonzero(converged), np.max(k)))
+    
+    result = {'VM': Um[bus_index].T, 'VA': apis_basic.convert_rad_to_deg(Ua[bus_index].T), 'S': S[bus_index].T * SBASE, 
+        'iterations': k, 'converged': converged}
+    return result
+
+def solve_batch_with_NR_method(S, Um, Ua):
+    '''
+    Solve batch power flow with Newton Raphson method, one Jacobian matrix is shared by unsolved scenarios.
+    Args:
+        (1) S, array, node complex power injection in pu in shape of (bus number, scenario number).
+        (2) Um, array, initialized node voltage in pu in the same shape.
+        (3) Ua, array, initialized node voltage phase angle in rad in the same shape.
+    Rets:
+        (1) Um, array, node voltage in pu after solution.
+        (2) Ua, array, node voltage phase angle in rad after solution.
+        (3) k, array, iteration number of each scenario.
+    '''
+    k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
+    max_err = apis_system.get_simulator_parameter('powerflow', 'max_err')
+    ratio = apis_system.get_simulator_parameter('powerflow', 'jacobian_ratio')
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
+    
+    k = np.zeros(S.shape[1], dtype=int)
+    active = np.arange(S.shape[1])  # Unsolved scenarios
+    last_err = np.full(S.shape[1], np.inf)
+    own = np.zeros(S.shape[1], dtype=bool)  # Scenarios corrected with own Jacobian matrix
+    J_factor = None
+    iteration = 0
+    while True:
+        if iteration >= k_max:
+            break
+        
+        P_err, Q_err = calculate_power_mismatch(S[:, active], Um[:, active], Ua[:, active])
+        power_err = np.vstack((P_err, Q_err))
+        err = np.max(np.abs(power_err), axis=0, initial=0.0)
+        k[active[~ np.isfinite(err)]] = k_max  # Diverged scenario is stopped
+        unsolved = (err >= max_err) & np.isfinite(err)
+        active, power_err, err = active[unsolved], power_err[:, unsolved], err[unsolved]
+        if active.size == 0:
+            break
+        
+        # The Jacobian matrix at start voltage is shared, and a scenario converging slowly with it is corrected with its own
+        # Jacobian matrix from then on.
+        own[active[err > ratio * last_err[active]]] = True
+        if J_factor is None:
+            J_mat = build_jacobian_matrix(Um[:, active[0]], Ua[:, active[0]])
+            J_factor = factorize_linear_system(- J_mat, 'Jacobian')
+        
+        slow = own[active]
+        correction = np.zeros(power_err.shape)
+        correction[:, ~ slow] = solve_linear_factor(J_factor, power_err[:, ~ slow])
+        for a in np.flatnonzero(slow):
+            J_mat = build_jacobian_matrix(Um[:, active[a]], Ua[:, active[a]])
+            correction[:, a] = solve_linear_factor(factorize_linear_system(- J_mat, 'Jacobian'), power_err[:, a])
+            
+        Ua[0 : PQ_num + PV_num, active] = Ua[0 : PQ_num + PV_num, active] + correction[0 : PQ_num + PV_num]
+        Um[0 : PQ_num, active] = Um[0 : PQ_num, active] * (1 + correction[PQ_num + PV_num : ])
+        
+        k[active] = k[active] + 1
+        last_err[active] = err
+        iteration = iteration + 1
+    return Um, Ua, k
+
+def solve_batch_with_PQ_method(S, Um, Ua):
+    '''
+    Solve batch power flow with fast decoupled method, the factors of B' and B'' are shared by all scenarios.
+    Args:
+        (1) S, array, node complex power injection in pu in shape of (bus number, scenario number).
+        (2) Um, array, initialized node voltage in pu in the same shape.
+        (3) Ua, array, initialized node voltage phase angle in rad in the same shape.
+    Rets:
+        (1) Um, array, node voltage in pu after solution.
+        (2) Ua, array, node voltage phase angle in rad after solution.
+        (3) k, array, iteration number of each scenario.
+    '''
+    k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
+    max_err = apis_system.get_simulator_parameter('powerflow', 'max_err')
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
+    n = PQ_num + PV_num
+    B1_factor = get_Y_matrix_factor('B1', n, "B'")
+    B2_factor = get_Y_matrix_factor('B2', PQ_num, 'B"')
+    
+    k = np.zeros(S.shape[1], dtype=int)
+    active = np.arange(S.shape[1])  # Unsolved scenarios
+    iteration = 0
+    while True:
+        if iteration >= k_max:
+            break
+        
+        S_active, Um_active, Ua_active = S[:, active], Um[:, active], Ua[:, active]
+        P_err = (S_active.real[0 : n] - calculate_node_power(Um_active, Ua_active).real[0 : n]) / Um_active[0 : n]
+        Ua_active[0 : n] = Ua_active[0 : n] + solve_linear_factor(B1_factor, P_err) / Um_active[0 : n]
+        
+        Q_err = (S_active.imag[0 : PQ_num] - calculate_node_power(Um_active, Ua_active).imag[0 : PQ_num]) / Um_active[0 : PQ_num]
+        Um_active[0 : PQ_num] = Um_active[0 : PQ_num] + solve_linear_factor(B2_factor, Q_err)
+        Um[:, active], Ua[:, active] = Um_active, Ua_active
+        
+        err = np.max(np.abs(np.vstack((P_err, Q_err))), axis=0, initial=0.0)
+        k[active[~ np.isfinite(err)]] = k_max  # Diverged scenario is stopped
+        unsolved = (err >= max_err) & np.isfinite(err)
+        active = active[unsolved]
+        if active.size == 0:
+            break
+        
+        k[active] = k[active] + 1
+        iteration = iteration + 1
+    return Um, Ua, k
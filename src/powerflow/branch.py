@@ -7,65 +7,75 @@ from apis import apis_system
 from apis import apis_basic
 
 from .hvdc import calculate_dc_line_power
+from .mismatch import calculate_node_power
 
 
-def init_powerflow_solution():
+def init_powerflow_solution(V=None):
     '''
-    Initial power flow solution with flat start.
-    Args: None
+    Initial power flow solution. PV and swing bus voltage and swing bus angle are always set by bus data, 
+    PQ bus voltage and PQ and PV bus angle are set by start voltage.
+    Args:
+        V, array, complex start voltage in pu in renumbered bus order got by get_powerflow_start_voltage, flat start if None.
     Rets:
         (1) S, array, node complex power injection in pu.
         (2) Um, array, initialized node voltage in pu.
         (3) Ua, array, node voltage phase angle in rad.
     '''
-    buses = apis.get_all_devices('BUS')
-    Um, Ua = np.ones(len(buses)), np.zeros(len(buses)) 
-    S = np.zeros(len(buses), dtype=complex)  
+    Um, Ua = get_powerflow_start_solution(V)
     
-    for bus in buses: 
-        IDE = apis.get_device_data(bus, 'BUS', 'IDE')
-        if IDE == 1:
-            apis.set_device_data(bus, 'BUS', 'VM', 1.0)
-            apis.set_device_data(bus, 'BUS', 'VA', 0.0)
-            
-        if IDE == 2:
-            apis.set_device_data(bus, 'BUS', 'VA', 0.0)
-            i = apis_system.get_bus_num_after_renumber(bus)
-            VM = apis.get_device_data(bus, 'BUS', 'VM')
-            Um[i] = VM
-            
-        if IDE == 3:
-            i = apis_system.get_bus_num_after_renumber(bus)
-            VM = apis.get_device_data(bus, 'BUS', 'VM')
-            VA = apis.get_device_data(bus, 'BUS', 'VA')
-            Um[i] = VM
-            Ua[i] = apis_basic.convert_deg_to_rad(VA)
-    
-    loads = apis.get_all_devices('LOAD')
-    for load in loads:
-        i = apis_system.get_bus_num_after_renumber(load)
-        PL = apis.get_device_data(load, 'LOAD', 'PL')
-        QL = apis.get_device_data(load, 'LOAD', 'QL')
-        S[i] = - PL - 1j * QL + S[i]  
-    
-    generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        i = apis_system.get_bus_num_after_renumber(generator)
-        PG = apis.get_device_data(generator, 'GENERATOR', 'PG')
-        S[i] = PG + S[i]
-    
-    wt_gens = apis.get_all_devices('WT GENERATOR')
-    for wt_gen in wt_gens:
-        PG = apis.get_device_data(wt_gen, 'WT GENERATOR', 'PG')
-        i = apis_system.get_bus_num_after_renumber(wt_gen)
-        S[i] = PG + S[i]  
-    
-    pv_units = apis.get_all_devices('PV UNIT')
-    for pv_unit in pv_units:
-        i = apis_system.get_bus_num_after_renumber(pv_unit)
-        PG = apis.get_device_data(pv_unit, 'PV UNIT', 'PG')
-        S[i] = PG + S[i]  
+    buses = apis_system.get_system_base_data('BusSqNum')  # buses in renumbered order
+    partition = apis_system.get_system_bus_partition()
+    VM = apis.get_device_data_array('BUS', 'VM', buses)
+    VA = apis.get_device_data_array('BUS', 'VA', buses)
+    PQ = partition['PQ_mask']
+    PQ_PV = partition['PQ_mask'] | partition['PV_mask']
+    VM[PQ] = Um[PQ]
+    VA[PQ_PV] = apis_basic.convert_rad_to_deg(Ua[PQ_PV])
+    apis.set_device_data_array('BUS', 'VM', VM, buses)
+    apis.set_device_data_array('BUS', 'VA', VA, buses)
     
+    S = calculate_node_power_injection()
+    return S, Um, Ua
+
+def get_powerflow_start_solution(V=None):
+    '''
+    Get the start node voltage of power flow solution without changing bus data. 
+    PV and swing bus voltage and swing bus angle are set by bus data, PQ bus voltage and PQ and PV bus angle are set by start voltage.
+    Args:
+        V, array, complex start voltage in pu in renumbered bus order got by get_powerflow_start_voltage, flat start if None.
+    Rets:
+        (1) Um, array, initialized node voltage in pu.
+        (2) Ua, array, node voltage phase angle in rad.
+    '''
+    buses = apis_system.get_system_base_data('BusSqNum')  # buses in renumbered order
+    partition = apis_system.get_system_bus_partition()
+    VM = apis.get_device_data_array('BUS', 'VM', buses)
+    VA = apis.get_device_data_array('BUS', 'VA', buses)
+    if V is None:
+        V = np.ones(len(buses), dtype=complex)  # Flat start
+        
+    Um = np.where(partition['PV_mask'] | partition['swing_mask'], VM, np.abs(V))
+    Ua = np.where(partition['swing_mask'], apis_basic.convert_deg_to_rad(VA), np.angle(V))
+    return Um, Ua
+
+def calculate_node_power_injection():
+    '''
+    Calculate node complex power injection of loads, generators and HVDC, HVDC power is calculated with bus data VM.
+    Args: None
+    Rets:
+        S, array, node complex power injection in pu in renumbered bus order.
+    '''
+    S = np.zeros(len(apis_system.get_system_base_data('BusSqNum')), dtype=complex)
+    i = apis_system.get_device_internal_bus_index('LOAD')
+    PL = apis.get_device_data_array('LOAD', 'PL')
+    QL = apis.get_device_data_array('LOAD', 'QL')
+    np.add.at(S, i, - PL - 1j * QL)
+
+    for device in ('GENERATOR', 'WT GENERATOR', 'PV UNIT'):
+        i = apis_system.get_device_internal_bus_index(device)
+        PG = apis.get_device_data_array(device, 'PG')
+        np.add.at(S, i, PG)
+
     hvdcs = apis.get_all_devices('HVDC')
     for hvdc in hvdcs:
         VM = apis.get_device_data(hvdc[0], 'BUS', 'VM')
@@ -85,9 +95,81 @@ def init_powerflow_solution():
     
     SBASE = apis_system.get_system_base_data('SBASE')
     S = S / SBASE  # Convert power to unit power
+    return S
+    
+def get_powerflow_start_voltage(start):
+    '''
+    Get the start node voltage of power flow solution.
+    Args:
+        start, str or array, 'flat', 'previous', 'case', or complex node voltage in pu in the order of get_all_devices('BUS').
+    Rets:
+        V, array, complex node voltage in pu in renumbered bus order, None for flat start.
+    '''
+    buses = apis_system.get_system_base_data('BusSqNum')
+    if not isinstance(start, str):
+        V = np.asarray(start, dtype=complex)
+        if V.shape != (len(buses), ):
+            print('Start voltage of {} buses is not match {} buses, flat start is used'.format(V.size, len(buses)))
+            return
+        index = apis_system.get_device_internal_bus_index('BUS')
+        V_start = np.ones(len(buses), dtype=complex)
+        V_start[index] = V
+        return V_start
+    
+    if start == 'flat':
+        return
+    
+    elif start == 'previous':
+        solution = apis_system.get_powerflow_solution()
+        if not solution:
+            print('Previous power flow solution is not exit, flat start is used')
+            return
+        index = apis_system.map_buses_to_internal(solution['buses'])
+        if index is None:
+            return
+        V_start = np.ones(len(buses), dtype=complex)  # A bus added since then is flat started
+        V_start[index] = solution['Um'] * np.exp(1j * solution['Ua'])
+        return V_start
+    
+    elif start == 'case':
+        VM = apis.get_device_data_array('BUS', 'VM', buses)
+        VA = apis.get_device_data_array('BUS', 'VA', buses)
+        V_start = VM * np.exp(1j * apis_basic.convert_deg_to_rad(VA))
+        return V_start
+    
+    print('Power flow start {} is not supported, flat start is used'.format(start))
+    return
 
-    return S, Um, Ua
+def save_powerflow_solution(method, start, Um, Ua, k):
+    '''
+    Keep a converged power flow solution in case for warm start, and show the iterations saved against flat start.
+    Args:
+        (1) method, str, 'PQ' or 'NR'.
+        (2) start, str or array, start of the solution.
+        (3) Um, array, node voltage in pu.
+        (4) Ua, array, node voltage phase angle in rad.
+        (5) k, int, iteration number.
+    Rets: None
+    '''
+    k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
+    if k >= k_max:  # Not converged, the last converged solution is kept
+        return
+    
+    solution = apis_system.get_powerflow_solution()
+    flat_iterations = dict(solution.get('flat_iterations', {}))  # Iteration number of the last flat start of each method
+    if not isinstance(start, str):
+        start = 'array'
+    if start == 'flat':
+        flat_iterations[method] = k
+    elif method in flat_iterations:
+        print('Iterations saved by {} start: {}'.format(start, flat_iterations[method] - k))
     
+    buses = np.array(apis_system.get_system_base_data('BusSqNum'), dtype=int)
+    solution = {'method': method, 'start': start, 'buses': buses, 'Um': np.array(Um), 'Ua': np.array(Ua), 'iterations': k, 
+        'flat_iterations': flat_iterations}
+    apis_system.set_powerflow_solution(solution)
+    return
+
 def update_powerflow(S, Um, Ua):
     '''
     Update component data after solving power flow.
@@ -99,31 +181,23 @@ def update_powerflow(S, Um, Ua):
     '''
     PQ_num = apis_system.get_system_bus_number('PQ')
     PV_num = apis_system.get_system_bus_number('PV')
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
-    buses = apis.get_all_devices('BUS')
-
-    for i in range(PQ_num, len(buses)):  # Calculate reactive power injection of PV node and balance node
-        ang_d = Ua[i] - Ua
-        S[i] = S[i].real + 1j * Um[i] * np.sum(Um * (Y_mat[i, :].real * np.sin(ang_d) - Y_mat[i, :].imag * np.cos(ang_d)))
-    
-    for i in range(PQ_num+PV_num, len(buses)):  # Calculate of active power injection of balance node
-        ang_d = Ua[i] - Ua
-        S[i] = 1j * S[i].imag + Um[i] * np.sum(Um * (Y_mat[i, :].real * np.cos(ang_d) + Y_mat[i, :].imag * np.sin(ang_d)))
+    S_calc = calculate_node_power(Um, Ua)
+    S[PQ_num : ] = S[PQ_num : ].real + 1j * S_calc[PQ_num : ].imag  # Reactive power injection of PV node and balance node
+    S[PQ_num + PV_num : ] = S_calc[PQ_num + PV_num : ]  # Active power injection of balance node
     
     Ua = apis_basic.convert_rad_to_deg(Ua)
-    for bus in buses:  # Update bus voltage and phase angle
-        i = apis_system.get_bus_num_after_renumber(bus)
-        apis.set_device_data(bus, 'BUS', 'VM', Um[i])
-        apis.set_device_data(bus, 'BUS', 'VA', Ua[i]) 
-    
-    generators = apis.get_all_devices('GENERATOR')
+    BusSqNum = apis_system.get_system_base_data('BusSqNum')  # Update bus voltage and phase angle
+    apis.set_device_data_array('BUS', 'VM', Um, BusSqNum)
+    apis.set_device_data_array('BUS', 'VA', Ua, BusSqNum)
+
     SBASE = apis_system.get_system_base_data('SBASE')
-    for generator in generators:  # Update the output of generator
-        i = apis_system.get_bus_num_after_renumber(generator)
-        apis.set_device_data(generator, 'GENERATOR', 'QG', S[i].imag * SBASE)
-        IDE = apis.get_device_data(generator, 'BUS', 'IDE')
-        if IDE == 3:
-            apis.set_device_data(generator, 'GENERATOR', 'PG', S[i].real * SBASE) 
+    i = apis_system.get_device_internal_bus_index('GENERATOR')
+    apis.set_device_data_array('GENERATOR', 'QG', S[i].imag * SBASE)  # Update the output of generator
+
+    swing = apis_system.get_system_bus_partition()['swing_mask'][i]
+    PG = apis.get_device_data_array('GENERATOR', 'PG')
+    PG[swing] = S[i[swing]].real * SBASE
+    apis.set_device_data_array('GENERATOR', 'PG', PG)
     return
     
 def show_powerflow_result():
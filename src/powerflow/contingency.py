@@ -0,0 +1,226 @@
+# N-1 contingency analysis
+# The Y matrix after a branch outage is the base Y matrix minus the Y matrix of the branch, and every contingency is 
+# solved by NR from the base solution. The violations of bus voltage limits and branch ratings are collected in one table.
+# Contingencies can be shared out to a process pool, every worker gets one copy of the base case at start.
+import sys
+sys.path.append('..')
+import csv
+import multiprocessing
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+import apis
+import network
+from apis import apis_system
+
+from .branch import calculate_node_power_injection, get_powerflow_start_voltage, get_powerflow_start_solution
+from .method_NR import solve_powerflow_with_NR_method
+
+ContingencyWorker = {}  # Working case and base solution of a worker process
+
+
+def solve_contingency_analysis(outages=None, processes=1):
+    '''
+    Solve AC power flow of branch outages one by one, and collect the violations of bus voltage limits NVHI and NVLO,
+    and the branch ratings RATEA of lines and RATA1 of two winding transformers, a rating of 0 is not checked.
+    Args:
+        (1) outages, list, outage line or transformer keys, all lines and transformers if None.
+        (2) processes, int, number of worker processes, contingencies are solved in this process if 1.
+    Rets:
+        result_data, list, contingency result table with head, a row for each violation, islanding or divergence.
+    '''
+    base = get_contingency_base_data()
+    if base is None:
+        return
+    
+    lines = set(apis.get_all_devices('LINE'))
+    transformers = set(apis.get_all_devices('TRANSFORMER'))
+    if outages is None:
+        outages = list(apis.get_all_devices('LINE')) + list(apis.get_all_devices('TRANSFORMER'))
+    contingencies = []
+    for outage in outages:
+        if outage in lines:
+            contingencies.append(('LINE', outage))
+        elif outage in transformers:
+            contingencies.append(('TRANSFORMER', outage))
+        else:
+            print('Branch {} is not exit when solving contingency analysis'.format(outage))
+    
+    work_case = apis_system.copy_case(derived=False)  # Power flow of contingencies changes Y matrix of the working case only
+    if processes is None or processes <= 1:
+        init_contingency_worker(work_case, base)
+        results = [solve_contingency_chunk(contingencies)]
+    else:
+        chunk_size = max(1, -(- len(contingencies) // (4 * processes)))
+        chunks = [contingencies[a : a + chunk_size] for a in range(0, len(contingencies), chunk_size)]
+        with multiprocessing.Pool(processes, initializer=init_contingency_worker, initargs=(work_case, base)) as pool:
+            results = pool.map(solve_contingency_chunk, chunks)
+    ContingencyWorker.clear()
+    
+    result_data = [['DEVICE', 'OUTAGE', 'STATUS', 'ITERATION', 'VIOLATION', 'ELEMENT', 'VALUE', 'LIMIT']]
+    statistics = {'SOLVED': 0, 'ISLAND': 0, 'DIVERGED': 0}
+    for chunk_result in results:
+        for status, rows in chunk_result:
+            statistics[status] = statistics[status] + 1
+            result_data.extend(rows)
+    print('Contingency analysis of {} outages: {} solved, {} islanding, {} diverged, {} violations'.format(len(contingencies), 
+        statistics['SOLVED'], statistics['ISLAND'], statistics['DIVERGED'], 
+        sum(1 for row in result_data[1:] if row[4] != '')))
+    return result_data
+
+def get_contingency_base_data():
+    '''
+    Solve base power flow from the last converged solution, and gather the data shared by all contingencies.
+    Args: None
+    Rets:
+        base, dict, {'S', 'Um', 'Ua', 'Y_mat', 'island_num', 'branch_data', 'circuit_data', 'buses', 'NVHI', 'NVLO'}, 
+            None if not converged.
+    '''
+    network.build_network_Y_matrix('basic')
+    V = None
+    if apis_system.get_powerflow_solution():
+        V = get_powerflow_start_voltage('previous')
+    Um, Ua = get_powerflow_start_solution(V)
+    S = calculate_node_power_injection()
+    S, Um, Ua, k = solve_powerflow_with_NR_method(S, Um, Ua, report=False)
+    if k >= apis_system.get_simulator_parameter('powerflow', 'k_max'):
+        print('Base power flow is not converged when solving contingency analysis')
+        return
+    
+    buses = apis_system.get_system_base_data('BusSqNum')
+    branch_data = network.get_network_branch_data()
+    Y_mat = apis_system.get_system_Y_network_matrix('basic')
+    base = {'S': S, 'Um': Um, 'Ua': Ua, 'Y_mat': Y_mat, 'island_num': get_network_island_number(Y_mat), 'branch_data': branch_data,
+        'circuit_data': network.get_branch_circuit_data(branch_data), 'buses': np.array(buses, dtype=int),
+        'NVHI': apis.get_device_data_array('BUS', 'NVHI', buses), 'NVLO': apis.get_device_data_array('BUS', 'NVLO', buses)}
+    return base
+
+def init_contingency_worker(work_case, base):
+    '''
+    Keep the working case and the base solution in a worker process, they are read only except Y matrix of the working case.
+    Args:
+        (1) work_case, Case, copy of the base case.
+        (2) base, dict, base data got by get_contingency_base_data.
+    Rets: None
+    '''
+    ContingencyWorker['case'] = work_case
+    ContingencyWorker['base'] = base
+    return
+
+def solve_contingency_chunk(contingencies):
+    '''
+    Solve a chunk of contingencies in the working case.
+    Args:
+        contingencies, list, (device, key) of outage branches.
+    Rets:
+        results, list, (status, rows) of each contingency, rows are violation rows of the result table.
+    '''
+    base = ContingencyWorker['base']
+    results = []
+    with ContingencyWorker['case']:
+        rows = {'LINE': {}, 'TRANSFORMER': {}}
+        for device in rows.keys():
+            rows[device] = {key: row for row, key in enumerate(apis.get_all_devices(device))}
+        for device, key in contingencies:
+            results.append(solve_contingency(base, device, rows[device][key], key))
+    return results
+
+def solve_contingency(base, device, row, key):
+    '''
+    Solve power flow of a branch outage from the base solution and check violations.
+    Args:
+        (1) base, dict, base data got by get_contingency_base_data.
+        (2) device, str, 'LINE' or 'TRANSFORMER'.
+        (3) row, int, row of the outage branch in the order of get_all_devices.
+        (4) key, tuple, outage branch key.
+    Rets:
+        (1) status, str, 'SOLVED', 'ISLAND' or 'DIVERGED'.
+        (2) rows, list, violation rows of the result table.
+    '''
+    Y_mat = base['Y_mat'] - network.assemble_branch_Y_matrix(base['branch_data'], device, [row])  # Low rank change
+    if is_network_split(Y_mat, base['island_num']) is True:
+        return 'ISLAND', [[device, key, 'ISLAND', 0, '', '', '', '']]
+    
+    apis_system.set_system_Y_network_matrix('basic', Y_mat)
+    try:
+        S, Um, Ua, k = solve_powerflow_with_NR_method(base['S'].copy(), base['Um'].copy(), base['Ua'].copy(), report=False)
+    except RuntimeError:  # Singular Jacobian matrix
+        S, Um, Ua, k = None, None, None, apis_system.get_simulator_parameter('powerflow', 'k_max')
+    if k >= apis_system.get_simulator_parameter('powerflow', 'k_max') or not np.all(np.isfinite(Um)):
+        return 'DIVERGED', [[device, key, 'DIVERGED', k, '', '', '', '']]
+    
+    rows = []
+    for violation, element, value, limit in check_contingency_violation(base, Um, Ua, device, key):
+        rows.append([device, key, 'SOLVED', k, violation, element, value, limit])
+    return 'SOLVED', rows
+
+def is_network_split(Y_mat, base_island_num):
+    '''
+    Check whether a branch outage splits the network into more islands. AC islands joined by HVDC in the base case are not counted.
+    Args:
+        (1) Y_mat, csr_matrix, Y matrix after outage.
+        (2) base_island_num, int, island number of the base network.
+    Rets:
+        flag, bool, True if the network has more islands than the base network.
+    '''
+    island_num = get_network_island_number(Y_mat)
+    return island_num > base_island_num
+
+def get_network_island_number(Y_mat):
+    '''
+    Get the number of AC islands of the network.
+    Args:
+        Y_mat, csr_matrix, Y matrix.
+    Rets:
+        island_num, int, number of connected components of the Y matrix graph.
+    '''
+    graph = sp.csr_matrix(np.abs(Y_mat) > 1e-10)
+    island_num, _ = connected_components(graph, directed=False)
+    return island_num
+
+def check_contingency_violation(base, Um, Ua, device, key):
+    '''
+    Check bus voltage limits and branch ratings after a branch outage.
+    Args:
+        (1) base, dict, base data got by get_contingency_base_data.
+        (2) Um, array, node voltage in pu.
+        (3) Ua, array, node voltage phase angle in rad.
+        (4) device, str, device type of outage branch.
+        (5) key, tuple, outage branch key.
+    Rets:
+        violations, list, (violation, element, value, limit), value and limit in pu for voltage and in MVA for branch power.
+    '''
+    violations = []
+    for a in np.flatnonzero(Um < base['NVLO']):
+        violations.append(('LOW VOLTAGE', int(base['buses'][a]), round(float(Um[a]), 6), float(base['NVLO'][a])))
+    for a in np.flatnonzero(Um > base['NVHI']):
+        violations.append(('HIGH VOLTAGE', int(base['buses'][a]), round(float(Um[a]), 6), float(base['NVHI'][a])))
+    
+    circuit_data = base['circuit_data']
+    i, j = circuit_data['i'], circuit_data['j']
+    V = Um * np.exp(1j * Ua)
+    SBASE = apis_system.get_system_base_data('SBASE')
+    Si = V[i] * np.conj((V[i] - V[j]) * circuit_data['Yij'] + V[i] * circuit_data['Yi']) * SBASE
+    Sj = V[j] * np.conj((V[j] - V[i]) * circuit_data['Yij'] + V[j] * circuit_data['Yj']) * SBASE
+    power = np.maximum(np.abs(Si), np.abs(Sj))
+    
+    rate = circuit_data['RATE']
+    for a in np.flatnonzero((rate > 0) & (power > rate)):
+        if circuit_data['device'][a] == device and circuit_data['keys'][a] == key:  # Outage branch
+            continue
+        violations.append(('OVERLOAD', circuit_data['keys'][a], round(float(power[a]), 3), float(rate[a])))
+    return violations
+
+def save_contingency_result(file, result_data):
+    '''
+    Save contingency analysis result in file.
+    Args:
+        (1) file, str, file name.
+        (2) result_data, list, contingency result table got by solve_contingency_analysis.
+    Rets: None
+    '''
+    with open(file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerows(result_data)
+    return
@@ -0,0 +1,142 @@
+# Linear solver of power flow correction equations
+# The correction equation is factorized by SuperLU with a fill-reducing column ordering, 
+# or by dense LU for small systems, and the factor can be kept to solve several right hand sides.
+# The factors of constant matrixes, such as B' and B'', are kept in the Y matrix derived cache until the network changes.
+import sys
+sys.path.append('..')
+import time
+import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from apis import apis_system
+
+ORDERINGS = ('NATURAL', 'MMD_ATA', 'MMD_AT_PLUS_A', 'COLAMD')
+
+
+def factorize_linear_system(A_mat, name=''):
+    '''
+    Factorize the coefficient matrix of a linear system. The backend is given by the power flow parameters
+    'linear_solver', 'splu', 'dense' or 'auto' for dense LU if the size is not larger than 'dense_size', 
+    and 'ordering' is the column ordering of splu.
+    Args:
+        (1) A_mat, csr_matrix or array, coefficient matrix.
+        (2) name, str, name of the linear system shown in report.
+    Rets:
+        factor, dict, {'name', 'method', 'ordering', 'LU', 'size', 'nnz', 'fill', 'factor_time', 'solve_time', 'solve_num', 'last_solve_time'}.
+    '''
+    method = apis_system.get_simulator_parameter('powerflow', 'linear_solver')
+    ordering = apis_system.get_simulator_parameter('powerflow', 'ordering')
+    dense_size = apis_system.get_simulator_parameter('powerflow', 'dense_size')
+    size = A_mat.shape[0]
+    if method == 'auto':
+        method = 'dense' if size <= dense_size else 'splu'
+    
+    if method not in ('splu', 'dense'):
+        print('linear_solver {} is not supported, splu is used'.format(method))
+        method = 'splu'
+    if ordering not in ORDERINGS:
+        print('ordering {} is not supported, COLAMD is used'.format(ordering))
+        ordering = 'COLAMD'
+    
+    nnz = A_mat.nnz if sp.issparse(A_mat) else np.count_nonzero(A_mat)
+    start = time.perf_counter()
+    if method == 'splu':
+        LU = spla.splu(sp.csc_matrix(A_mat), permc_spec=ordering)
+        fill = (LU.L.nnz + LU.U.nnz - size) / max(nnz, 1)
+    else:
+        ordering = ''
+        A_dense = A_mat.toarray() if sp.issparse(A_mat) else np.asarray(A_mat)
+        LU = la.lu_factor(A_dense)
+        fill = size * size / max(nnz, 1)
+    factor_time = time.perf_counter() - start
+    
+    factor = {'name': name, 'method': method, 'ordering': ordering, 'LU': LU, 'size': size, 'nnz': nnz, 'fill': fill, 
+        'factor_time': factor_time, 'solve_time': 0.0, 'solve_num': 0, 'last_solve_time': 0.0}
+    return factor
+
+def solve_linear_factor(factor, b):
+    '''
+    Solve a linear system with a factorized coefficient matrix.
+    Args:
+        (1) factor, dict, factor built by factorize_linear_system.
+        (2) b, array, right hand side.
+    Rets:
+        x, array, solution.
+    '''
+    start = time.perf_counter()
+    if factor['method'] == 'splu':
+        x = factor['LU'].solve(b)
+    else:
+        x = la.lu_solve(factor['LU'], b)
+    factor['last_solve_time'] = time.perf_counter() - start
+    factor['solve_time'] = factor['solve_time'] + factor['last_solve_time']
+    factor['solve_num'] = factor['solve_num'] + 1
+    return x
+
+def solve_linear_system(A_mat, b, name=''):
+    '''
+    Factorize and solve a linear system once, the factorization is reported if power flow parameter 'process' is True.
+    Args:
+        (1) A_mat, csr_matrix or array, coefficient matrix.
+        (2) b, array, right hand side.
+        (3) name, str, name of the linear system shown in report.
+    Rets:
+        x, array, solution.
+    '''
+    factor = factorize_linear_system(A_mat, name)
+    x = solve_linear_factor(factor, b)
+    if apis_system.get_simulator_parameter('powerflow', 'process') is True:
+        show_linear_factor(factor)
+    return x
+
+def get_Y_matrix_factor(par_name, size, name=''):
+    '''
+    Get the factor of the negative upper left block of a Y matrix, such as - B' of PQ and PV buses.
+    The factor is built once and kept in Y matrix cache until the Y matrix is set again or the solver parameters change.
+    Args:
+        (1) par_name, str, Y matrix name.
+        (2) size, int, block size.
+        (3) name, str, name of the linear system shown in report.
+    Rets:
+        factor, dict, factor built by factorize_linear_system.
+    '''
+    method = apis_system.get_simulator_parameter('powerflow', 'linear_solver')
+    ordering = apis_system.get_simulator_parameter('powerflow', 'ordering')
+    dense_size = apis_system.get_simulator_parameter('powerflow', 'dense_size')
+    key = ('factor', size, method, ordering, dense_size)
+    build = lambda Y_mat: factorize_linear_system(- apis_system.get_system_Y_network_matrix_block(par_name, size), name)
+    factor = apis_system.get_system_Y_network_matrix_cache(par_name, key, build)
+    return factor
+
+def show_linear_iteration(k, factor, new_factor):
+    '''
+    Show the linear solve of a power flow iteration, with factorization time and fill-in if the factor is built in the iteration.
+    Args:
+        (1) k, int, iteration number.
+        (2) factor, dict, factor built by factorize_linear_system.
+        (3) new_factor, bool, True if the factor is built in the iteration.
+    Rets: None
+    '''
+    if new_factor is True:
+        method = factor['method'] if factor['ordering'] == '' else '{}({})'.format(factor['method'], factor['ordering'])
+        print('Iteration {}, {} factorized by {}: size {}, nnz {}, fill {:.2f}, factorization {:.3f} ms, solve {:.3f} ms'.format(
+            k, factor['name'], method, factor['size'], factor['nnz'], factor['fill'], factor['factor_time'] * 1000, 
+            factor['last_solve_time'] * 1000))
+    else:
+        print('Iteration {}, {} factor reused: solve {:.3f} ms'.format(k, factor['name'], factor['last_solve_time'] * 1000))
+    return
+
+def show_linear_factor(factor):
+    '''
+    Show factorization time, fill-in and solve time of a linear system.
+    Args:
+        factor, dict, factor built by factorize_linear_system.
+    Rets: None
+    '''
+    method = factor['method'] if factor['ordering'] == '' else '{}({})'.format(factor['method'], factor['ordering'])
+    print('{} solved by {}: size {}, nnz {}, fill {:.2f}, factorization {:.3f} ms, solve {:.3f} ms in {} solves'.format(
+        factor['name'], method, factor['size'], factor['nnz'], factor['fill'], factor['factor_time'] * 1000, 
+        factor['solve_time'] * 1000, factor['solve_num']))
+    return
@@ -7,6 +7,8 @@ import apis
 from apis import apis_system
 from apis import apis_basic
 
+from .sensitivity import solve_dc_angle
+
 
 def solve_powerflow_with_DC_method(S, Um, Ua):
     '''
@@ -19,30 +21,24 @@ def solve_powerflow_with_DC_method(S, Um, Ua):
     '''
     print('Solve power flow with DC method')
     P = S.real
-    buses = apis.get_all_devices('BUS')
     PQ_num = apis_system.get_system_bus_number('PQ')
     PV_num = apis_system.get_system_bus_number('PV') 
     B1 = apis_system.get_system_Y_network_matrix('B1')
     
-    B1_ = B1[0 : PQ_num + PV_num, 0: PQ_num + PV_num]  
-    Ua = np.linalg.solve(- B1_, P[0 : PQ_num + PV_num]) # Voltage angle
+    Ua = solve_dc_angle(P)  # Voltage angle, zero at balance node
     
-    Ua = np.hstack((Ua, np.zeros(len(buses) - PQ_num - PV_num)))   
-        
-    for i in range(PQ_num + PV_num, len(buses)):  # Balance node
-        ang_d = Ua[i] - Ua
-        P[i] = Um[i] * np.sum(Um * (B1[i, :] * np.sin(ang_d)))       
+    B1_swing = B1[PQ_num + PV_num :, :].tocoo()  # Balance node
+    i = B1_swing.row + PQ_num + PV_num
+    power = B1_swing.data * Um[B1_swing.col] * np.sin(Ua[i] - Ua[B1_swing.col])
+    P[PQ_num + PV_num :] = Um[PQ_num + PV_num :] * np.bincount(B1_swing.row, power, minlength=B1_swing.shape[0])
     
-    for bus in buses:
-        i = apis_system.get_bus_num_after_renumber(bus)
-        angle = apis_basic.convert_rad_to_deg(Ua[i])
-        apis.set_device_data(bus, 'BUS', 'VA', angle)
+    BusSqNum = apis_system.get_system_base_data('BusSqNum')
+    apis.set_device_data_array('BUS', 'VA', apis_basic.convert_rad_to_deg(Ua), BusSqNum)
     
-    generators = apis.get_all_devices('GENERATOR')
-    for generator in generators:
-        IDE = apis.get_device_data(generator, 'BUS', 'IDE')
-        if IDE == 3:
-            i = apis_system.get_bus_num_after_renumber(generator)
-            SBASE = apis_system.get_system_base_data('SBASE')
-            apis.set_device_data(generator, 'GENERATOR', 'PG', P[i] * SBASE)
+    SBASE = apis_system.get_system_base_data('SBASE')
+    i = apis_system.get_device_internal_bus_index('GENERATOR')
+    swing = apis_system.get_system_bus_partition()['swing_mask'][i]
+    PG = apis.get_device_data_array('GENERATOR', 'PG')
+    PG[swing] = P[i[swing]] * SBASE
+    apis.set_device_data_array('GENERATOR', 'PG', PG)
     return
\ No newline at end of file
@@ -1,49 +1,85 @@
 import sys
 sys.path.append('..')
 import numpy as np
+import scipy.sparse as sp
 
 import apis
 from apis import apis_system
 
 from .hvdc import correct_hvdc_node_power
+from .mismatch import calculate_power_mismatch
+from .linear_solver import factorize_linear_system, solve_linear_factor, show_linear_factor, show_linear_iteration
 
+JACOBIAN_UPDATES = ('always', 'interval', 'ratio')
+STEPS = ('newton', 'iwamoto')
 
-def solve_powerflow_with_NR_method(S, Um, Ua):
+
+def solve_powerflow_with_NR_method(S, Um, Ua, report=True):
     '''
     Main function of Newton Raphson method in power flow calculation.
     Args:
         (1) S, array, node complex power injection in pu before solution.
         (2) Um, array, initialized node voltage in pu before solution.
         (3) Ua, array, node voltage phase angle in rad before solution.
+        (4) report, bool, show iteration number, False for repeated solutions such as contingencies.
     Rets:
         (1) S, array, node complex power injection in pu after solution.
         (2) Um, array, initialized node voltage in pu after solution.
         (3) Ua, array, node voltage phase angle in rad after solution.
+        (4) k, int, iteration number.
     ''' 
     k = 0  
     k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
     max_err = apis_system.get_simulator_parameter('powerflow', 'max_err')
-    
+    step = apis_system.get_simulator_parameter('powerflow', 'step')
+    if step not in STEPS:
+        print('step {} is not supported, newton is used'.format(step))
+        step = 'newton'
+    process = apis_system.get_simulator_parameter('powerflow', 'process') is True and report is True
+    
+    J_factor = None  # Factor of the Jacobian matrix in use
+    J_age = 0  # Iterations since the Jacobian matrix is built
+    J_num = 0  # Number of Jacobian matrixes built
+    last_err = None
     while True:
         if k >= k_max:
             break
             
         power_err = calculate_power_imbalance(S, Um, Ua)  
-
-        if np.max(np.abs(power_err)) < max_err:  
+        err = np.max(np.abs(power_err))
+        if err < max_err:  
             break
         
-        J_mat = build_jacobian_matrix(Um, Ua)  
+        new_factor = J_factor is None or is_jacobian_update_needed(J_age, err, last_err) is True
+        if new_factor is True:
+            J_mat = build_jacobian_matrix(Um, Ua)  
+            J_factor = factorize_linear_system(- J_mat, 'Jacobian')
+            J_age = 0
+            J_num = J_num + 1
+        
+        correction = solve_linear_factor(J_factor, power_err)
+        if process is True:
+            show_linear_iteration(k + 1, J_factor, new_factor)
+        if step == 'iwamoto':
+            correction = correction * calculate_optimal_multiplier(S, Um, Ua, power_err, correction)
             
-        Um, Ua = correct_node_voltage_and_angle(power_err, Um, Ua, J_mat)  
+        Um, Ua = correct_node_voltage_and_angle(correction, Um, Ua)  
         S = correct_hvdc_node_power(S, Um)  # Correct HVDC injection power
     
+        J_age = J_age + 1
+        last_err = err
         k = k + 1
     
+    if report is False:
+        return S, Um, Ua, k
+    
     print('------------------------------------')
     print('Iteration number of NR method: {}'.format(k))
+    if process is True and J_factor is not None:
+        print('Jacobian number of NR method: {}'.format(J_num))
+        show_linear_factor(J_factor)
     
-    return S, Um, Ua    
+    return S, Um, Ua, k    
     
 def calculate_power_imbalance(S, Um, Ua): 
     '''
@@ -55,18 +91,7 @@ def calculate_power_imbalance(S, Um, Ua):
     Rets:
         power_err, array, power unbalance in pu.
     '''
-    PQ_num = apis_system.get_system_bus_number('PQ')
-    PV_num = apis_system.get_system_bus_number('PV') 
-    p_err, q_err = np.zeros(PQ_num + PV_num), np.zeros(PQ_num)  
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
-
-    for i in range(PQ_num + PV_num):  # Calculate the active power unbalance of PQ node and PV node
-        ang_d = Ua[i] - Ua  
-        p_err[i] = S[i].real - Um[i] * np.sum(Um * (Y_mat[i, :].real * np.cos(ang_d) + Y_mat[i, :].imag * np.sin(ang_d)))
-
-    for i in range(PQ_num):  # Calculation of reactive power unbalance of PQ node 
-        ang_d = Ua[i] - Ua
-        q_err[i] = S[i].imag - Um[i] * np.sum(Um * (Y_mat[i, :].real * np.sin(ang_d) - Y_mat[i, :].imag * np.cos(ang_d)))
+    p_err, q_err = calculate_power_mismatch(S, Um, Ua)  # Active power of PQ and PV node, reactive power of PQ node
     
     power_err = np.hstack((p_err, q_err))  
     
@@ -74,87 +99,111 @@ def calculate_power_imbalance(S, Um, Ua):
     
 def build_jacobian_matrix(Um, Ua): 
     '''
-    Build Jacobian matrix for NR solution
+    Build Jacobian matrix for NR solution in sparse form, the voltage correction is relative to node voltage.
+    With S = V * conj(Y * V) and I = Y * V, the derivatives are
+        dS/dVa = 1j * diag(V) * conj(diag(I) - Y * diag(V)),
+        dS/dVm * diag(Um) = diag(V) * conj(Y * diag(V)) + conj(diag(I)) * diag(V),
+    and J = - [[Re(dS/dVa), Re(dS/dVm * diag(Um))], [Im(dS/dVa), Im(dS/dVm * diag(Um))]] over PQ and PV rows, 
+    PQ and PV angle columns and PQ voltage columns.
     Args:
         (1) Um, array, initialized node voltage in pu.
         (2) Ua, array, node voltage phase angle in rad.
     Rets：
-        J_mat, array, Jacobian matrix.
+        J_mat, csr_matrix, Jacobian matrix.
     '''
     PQ_num = apis_system.get_system_bus_number('PQ')
     PV_num = apis_system.get_system_bus_number('PV') 
     Y_mat = apis_system.get_system_Y_network_matrix('basic')
-    G, B = Y_mat.real, Y_mat.imag  
-    
-    H = np.zeros((PQ_num + PV_num, PQ_num + PV_num))  
-    N = np.zeros((PQ_num + PV_num, PQ_num))  
-    M = np.zeros((PQ_num, PQ_num + PV_num))  
-    L = np.zeros((PQ_num, PQ_num))  
-    
-    for i in range(PQ_num + PV_num):  # H matrix
-        for j in range(PQ_num + PV_num):        
-            if i != j:  
-                ang_d = Ua[i] - Ua[j]
-                H[i, j] = - Um[i] * Um[j] * (G[i, j] * np.sin(ang_d) - B[i, j] * np.cos(ang_d))  
-            else:  
-                ang_d = Ua[i] - Ua
-                H[i, i] = Um[i] * np.sum(Um * (G[i, :] * np.sin(ang_d) - B[i, :] * np.cos(ang_d))) + Um[i] ** 2 * B[i, i] 
-    
-    for i in range(PQ_num + PV_num):  # N matrix 
-        for j in range(PQ_num):
-            if i != j:  
-                ang_d = Ua[i] - Ua[j]
-                N[i, j] = - Um[i] * Um[j] * (G[i, j] * np.cos(ang_d) + B[i, j] * np.sin(ang_d)) 
-            else:  
-                ang_d = Ua[i] - Ua
-                N[i, i] = - Um[i] * np.sum(Um * (G[i, :] * np.cos(ang_d) + B[i, :] * np.sin(ang_d))) - Um[i] ** 2 * G[i, i]
-    
-    for i in range(PQ_num):  # M matrix
-        for j in range(PQ_num + PV_num):
-            if i != j:  
-                ang_d = Ua[i] - Ua[j]
-                M[i, j] = Um[i] * Um[j] * (G[i, j] * np.cos(ang_d) + B[i, j] * np.sin(ang_d))
-            else:  
-                ang_d = Ua[i] - Ua
-                M[i, i] = - Um[i] * np.sum(Um * (G[i, :] * np.cos(ang_d) + B[i, :] * np.sin(ang_d))) + Um[i] ** 2 * G[i, i]      
-    
-    for i in range(PQ_num):  # L matrix
-        for j in range(PQ_num):
-            if i != j:  
-                ang_d = Ua[i] - Ua[j]
-                L[i, j] = - Um[i] * Um[j] * (Y_mat[i, j].real * np.sin(ang_d) - Y_mat[i, j].imag * np.cos(ang_d))
-            else:  
-                ang_d = Ua[i] - Ua
-                L[i, i] = - Um[i] * np.sum(Um * (G[i, :] * np.sin(ang_d) - B[i, :] * np.cos(ang_d))) + Um[i] ** 2 * B[i, i]        
+    
+    V = Um * np.exp(1j * Ua)
+    I = Y_mat @ V
+    diag_V = sp.diags(V)
+    Y_V = Y_mat @ diag_V
+    dS_dVa = 1j * diag_V @ np.conj(sp.diags(I) - Y_V)
+    dS_dVm = diag_V @ np.conj(Y_V) + sp.diags(np.conj(I)) @ diag_V  # dS/dVm * diag(Um)
+    
+    n = PQ_num + PV_num
+    dS_dVa = dS_dVa.tocsr()[0 : n, :]
+    dS_dVm = dS_dVm.tocsr()[0 : n, :]
+    H = - dS_dVa[:, 0 : n].real
+    N = - dS_dVm[:, 0 : PQ_num].real
+    M = - dS_dVa[0 : PQ_num, 0 : n].imag
+    L = - dS_dVm[0 : PQ_num, 0 : PQ_num].imag
      
-    J_mat = np.vstack((np.hstack((H, N)), np.hstack((M, L))))  # Combine Jacobian matrix
+    J_mat = sp.bmat([[H, N], [M, L]], format='csr')  # Combine Jacobian matrix
     
     return J_mat
 
-def correct_node_voltage_and_angle(power_err, Um, Ua, J_mat):
+def is_jacobian_update_needed(J_age, err, last_err):
     '''
-    Solve the modified equation of NR method and correct the node voltage and phase angle.
+    Check whether the Jacobian matrix should be rebuilt by power flow parameter 'jacobian_update'.
     Args:
-        (1) power_err, array, power balance in pu.
+        (1) J_age, int, iterations since the Jacobian matrix is built.
+        (2) err, float, max power unbalance of this iteration in pu.
+        (3) last_err, float, max power unbalance of last iteration in pu.
+    Rets:
+        flag, bool, True if the Jacobian matrix should be rebuilt.
+    '''
+    policy = apis_system.get_simulator_parameter('powerflow', 'jacobian_update')
+    if policy == 'interval':
+        interval = apis_system.get_simulator_parameter('powerflow', 'jacobian_interval')
+        return J_age >= interval or err > last_err  # Also rebuild when the power unbalance grows
+    
+    elif policy == 'ratio':  # Rebuild when the convergence with old Jacobian matrix slows down
+        ratio = apis_system.get_simulator_parameter('powerflow', 'jacobian_ratio')
+        return err > ratio * last_err
+    
+    elif policy != 'always':
+        print('jacobian_update {} is not supported, always is used'.format(policy))
+    return True
+
+def calculate_optimal_multiplier(S, Um, Ua, power_err, correction):
+    '''
+    Calculate the optimal multiplier of Iwamoto method. The power unbalance along the correction is approximated by
+    a * (1 - mu) + c * mu ** 2, where a is the power unbalance and c is the power unbalance after the full correction,
+    and mu minimizes its square sum, a root of 2 * c.c * mu ** 3 - 3 * a.c * mu ** 2 + (a.a + 2 * a.c) * mu - a.a = 0.
+    The multiplier is not larger than 1, and it goes to 0 if the power flow has no solution.
+    Args:
+        (1) S, array, node complex power injection in pu.
         (2) Um, array, node voltage in pu.
         (3) Ua, array, node voltage angle in rad.
-        (4) J_mat, array, Jacobian matrix.
-    输出:
+        (4) power_err, array, power unbalance in pu.
+        (5) correction, array, angle and relative voltage correction.
+    Rets:
+        mu, float, step multiplier.
+    '''
+    Um_full, Ua_full = correct_node_voltage_and_angle(correction, Um.copy(), Ua.copy())
+    a = power_err
+    c = calculate_power_imbalance(S, Um_full, Ua_full)
+    aa, ac, cc = np.dot(a, a), np.dot(a, c), np.dot(c, c)
+    
+    roots = np.roots([2 * cc, - 3 * ac, aa + 2 * ac, - aa])
+    roots = roots[np.abs(roots.imag) < 1e-9].real
+    roots = roots[roots > 0]
+    if roots.size == 0:
+        return 1.0
+    residual = [np.sum((a * (1 - mu) + c * mu ** 2) ** 2) for mu in roots]
+    mu = roots[np.argmin(residual)]
+    return min(mu, 1.0)
+
+def correct_node_voltage_and_angle(angle_voltage_correction, Um, Ua):
+    '''
+    Correct the node voltage and phase angle with the solution of the modified equation of NR method.
+    Args:
+        (1) angle_voltage_correction, array, angle correction of PQ and PV buses and relative voltage correction of PQ buses.
+        (2) Um, array, node voltage in pu.
+        (3) Ua, array, node voltage angle in rad.
+    Rets:
         (1) Um, array, node voltage in pu.
         (2) Ua, array, node voltage angle in rad.
     '''
     PQ_num = apis_system.get_system_bus_number('PQ')
     PV_num = apis_system.get_system_bus_number('PV')  
     
-    angle_voltage_correction = np.linalg.solve(- J_mat, power_err)  
-    
     angle_correction = angle_voltage_correction[0 : PQ_num + PV_num]  
     voltage_correction = angle_voltage_correction[PQ_num + PV_num : ] 
     
-    for i in range(PQ_num): 
-        Um[i] = Um[i] + Um[i] * voltage_correction[i]     
-    
-    for i in range(PQ_num + PV_num): 
-        Ua[i] = Ua[i] + angle_correction[i]    
+    Um[0 : PQ_num] = Um[0 : PQ_num] + Um[0 : PQ_num] * voltage_correction
+    Ua[0 : PQ_num + PV_num] = Ua[0 : PQ_num + PV_num] + angle_correction
        
     return Um, Ua           
\ No newline at end of file
@@ -6,6 +6,8 @@ import apis
 from apis import apis_system
 
 from .hvdc import correct_hvdc_node_power
+from .mismatch import calculate_node_power
+from .linear_solver import get_Y_matrix_factor, solve_linear_factor, show_linear_factor, show_linear_iteration
 
 
 def solve_powerflow_with_PQ_method(S, Um, Ua):
@@ -19,10 +21,14 @@ def solve_powerflow_with_PQ_method(S, Um, Ua):
         (1) S, array, node complex power injection in pu after solution.
         (2) Um, array, initialized node voltage in pu after solution.
         (3) Ua, array, node voltage phase angle in rad after solution.
+        (4) k, int, iteration number.
     ''' 
     k = 0  
     k_max = apis_system.get_simulator_parameter('powerflow', 'k_max')
     max_err = apis_system.get_simulator_parameter('powerflow', 'max_err')
+    process = apis_system.get_simulator_parameter('powerflow', 'process') is True
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
     
     while True:
         if k >= k_max:
@@ -37,6 +43,9 @@ def solve_powerflow_with_PQ_method(S, Um, Ua):
         Um = correct_node_voltage(Q_err, Um, Ua)  
         
         power_err = np.hstack((P_err, Q_err))   
+        if process is True:  # A factor solved once is built in this iteration
+            for factor in (get_Y_matrix_factor('B1', PQ_num + PV_num, "B'"), get_Y_matrix_factor('B2', PQ_num, 'B"')):
+                show_linear_iteration(k + 1, factor, factor['solve_num'] == 1)
             
         S = correct_hvdc_node_power(S, Um)  
     
@@ -46,8 +55,11 @@ def solve_powerflow_with_PQ_method(S, Um, Ua):
         k = k + 1
     
     print('Iteration number of PQ method: {}'.format(k))
+    if process is True:
+        show_linear_factor(get_Y_matrix_factor('B1', PQ_num + PV_num, "B'"))
+        show_linear_factor(get_Y_matrix_factor('B2', PQ_num, 'B"'))
     
-    return S, Um, Ua
+    return S, Um, Ua, k
 
 def calculate_act_power_imbalance(P, Um, Ua): 
     '''
@@ -61,13 +73,9 @@ def calculate_act_power_imbalance(P, Um, Ua):
     '''
     PQ_num = apis_system.get_system_bus_number('PQ')
     PV_num = apis_system.get_system_bus_number('PV') 
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
-    P_err = np.zeros(PQ_num + PV_num)  
-    
-    for i in range(PQ_num + PV_num):  
-        ang_d = Ua[i] - Ua  
-        P_err[i] = P[i] - Um[i] * np.sum(Um * (Y_mat[i, :].real * np.cos(ang_d) + Y_mat[i, :].imag * np.sin(ang_d)))
-        P_err[i] = P_err[i] / Um[i]
+    n = PQ_num + PV_num
+    P_calc = calculate_node_power(Um, Ua).real
+    P_err = (P[0 : n] - P_calc[0 : n]) / Um[0 : n]
         
     return P_err 
 
@@ -81,12 +89,10 @@ def correct_node_voltage_angle(P_err, Um, Ua):
     Rets:
         Ua, array, node voltage angle in rad.
     '''
-    B1 = apis_system.get_system_Y_network_matrix('B1')
-    B1 = B1.real
-    B1 = B1[0 : np.size(P_err), 0 : np.size(P_err)]  # format B' matrix 
-    angle_correction = np.linalg.solve(- B1, P_err)
-    for i in range(np.size(P_err)):
-        Ua[i] = Ua[i] + angle_correction[i] / Um[i]  
+    B1_factor = get_Y_matrix_factor('B1', np.size(P_err), "B'")  # Factor of B' of PQ and PV buses, kept until network changes
+    angle_correction = solve_linear_factor(B1_factor, P_err)
+    n = np.size(P_err)
+    Ua[0 : n] = Ua[0 : n] + angle_correction / Um[0 : n]
         
     return Ua
     
@@ -101,13 +107,8 @@ def calculate_ract_power_imbalance(Q, Um, Ua):
         Q_err, array, node reactive power unbalance in pu.
     ''' 
     PQ_num = apis_system.get_system_bus_number('PQ')
-    Y_mat = apis_system.get_system_Y_network_matrix('basic')
-    Q_err = np.zeros(PQ_num)
-    
-    for i in range(PQ_num):
-        ang_d = Ua[i] - Ua
-        Q_err[i] = Q[i] - Um[i] * np.sum(Um * (Y_mat[i, :].real * np.sin(ang_d) - Y_mat[i, :].imag * np.cos(ang_d)))
-        Q_err[i] = Q_err[i] / Um[i]
+    Q_calc = calculate_node_power(Um, Ua).imag
+    Q_err = (Q[0 : PQ_num] - Q_calc[0 : PQ_num]) / Um[0 : PQ_num]
         
     return Q_err  
     
@@ -121,11 +122,9 @@ def correct_node_voltage(Q_err, Um, Ua):
     Rets:
         Um, array, node voltage in pu.
     '''
-    B2 = apis_system.get_system_Y_network_matrix('B2')
-    B2 = B2.real
-    B2 = B2[0 : np.size(Q_err), 0 : np.size(Q_err)]  # format B" matrix 
-    voltage_correction = np.linalg.solve(- B2, Q_err) 
-    for i in range(np.size(Q_err)):
-        Um[i] = Um[i] + voltage_correction[i] 
+    B2_factor = get_Y_matrix_factor('B2', np.size(Q_err), 'B"')  # Factor of B" of PQ buses, kept until network changes
+    voltage_correction = solve_linear_factor(B2_factor, Q_err) 
+    PQ_num = np.size(Q_err)
+    Um[0 : PQ_num] = Um[0 : PQ_num] + voltage_correction
         
     return Um
@@ -0,0 +1,39 @@
+# Power mismatch of power flow solution
+import sys
+sys.path.append('..')
+import numpy as np
+
+from apis import apis_system
+
+
+def calculate_node_power(Um, Ua):
+    '''
+    Calculate node complex power injection from node voltage, S = V * conj(Y * V), with one sparse product.
+    Args:
+        (1) Um, array, node voltage in pu.
+        (2) Ua, array, node voltage phase angle in rad.
+    Rets:
+        S_calc, array, node complex power injection in pu.
+    '''
+    Y_mat = apis_system.get_system_Y_network_matrix('basic')
+    V = Um * np.exp(1j * Ua)
+    S_calc = V * np.conj(Y_mat @ V)
+    return S_calc
+
+def calculate_power_mismatch(S, Um, Ua):
+    '''
+    Calculate the active power mismatch of PQ and PV buses and the reactive power mismatch of PQ buses.
+    Args:
+        (1) S, array, node complex power injection in pu.
+        (2) Um, array, node voltage in pu.
+        (3) Ua, array, node voltage phase angle in rad.
+    Rets:
+        (1) P_err, array, active power mismatch of PQ and PV buses in pu.
+        (2) Q_err, array, reactive power mismatch of PQ buses in pu.
+    '''
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV') 
+    S_err = S - calculate_node_power(Um, Ua)
+    P_err = S_err.real[0 : PQ_num + PV_num]
+    Q_err = S_err.imag[0 : PQ_num]
+    return P_err, Q_err
@@ -49,11 +49,10 @@ def get_bus_result():
         bus_data, list, bus volatge result.
     '''
     buses = apis.get_all_devices('BUS')
+    VM = apis.get_device_data_array('BUS', 'VM').tolist()
+    VA = apis.get_device_data_array('BUS', 'VA').tolist()
     bus_data = [['NUMBER', 'VOLTAGE/pu', 'ANGLE/deg']]  
-    for bus in buses:
-        VM = apis.get_device_data(bus, 'BUS', 'VM')
-        VA = apis.get_device_data(bus, 'BUS', 'VA')
-        bus_data.append([bus, VM, VA])
+    bus_data.extend([list(row) for row in zip(buses, VM, VA)])
     return bus_data
 
 def get_generator_result():
@@ -0,0 +1,161 @@
+# DC power flow sensitivity
+# The injection to angle solution, PTDF and LODF are solved with the B' factor kept in Y matrix cache, 
+# several right hand sides at once. Rows of the monitored branches are computed only for the branches asked,
+# and a full matrix can be written to a memory-mapped .npy file chunk by chunk.
+import sys
+sys.path.append('..')
+import numpy as np
+
+import apis
+import network
+from apis import apis_system
+
+from .linear_solver import get_Y_matrix_factor, solve_linear_factor
+
+CHUNK_SIZE = 256  # Number of right hand sides solved at once
+
+
+def solve_dc_angle(P):
+    '''
+    Solve DC voltage angles of node active power injections, several injection vectors are solved at once. 
+    B' matrix should be built before.
+    Args:
+        P, array, node active power injection in pu in renumbered bus order, in shape of (bus number,) or (bus number, vector number),
+            injections of swing buses are ignored.
+    Rets:
+        Ua, array, node voltage phase angle in rad in the same shape, zero at swing buses.
+    '''
+    PQ_num = apis_system.get_system_bus_number('PQ')
+    PV_num = apis_system.get_system_bus_number('PV')
+    B1_factor = get_Y_matrix_factor('B1', PQ_num + PV_num, "B'")  # Factor of B' of PQ and PV buses, shared with PQ method
+    
+    Ua = np.zeros(np.shape(P))
+    Ua[0 : PQ_num + PV_num] = solve_linear_factor(B1_factor, np.asarray(P, dtype=float)[0 : PQ_num + PV_num])
+    return Ua
+
+def get_dc_sensitivity_branch_data():
+    '''
+    Build B' matrix if the network is changed, and get the monitored branches of DC sensitivity.
+    Args: None
+    Rets:
+        dc_branch_data, dict, lines and two winding transformers got by network.get_dc_branch_data.
+    '''
+    network.build_powerflow_network_matrix()
+    build = lambda Y_mat: network.get_dc_branch_data()
+    dc_branch_data = apis_system.get_system_Y_network_matrix_cache('B1', ('dc_branch',), build)
+    return dc_branch_data
+
+def get_dc_branch_rows(dc_branch_data, branches):
+    '''
+    Get the rows of branches in DC sensitivity branch data.
+    Args:
+        (1) dc_branch_data, dict, lines and two winding transformers got by network.get_dc_branch_data.
+        (2) branches, list, line or two winding transformer keys, all branches if None.
+    Rets:
+        rows, array, rows of branches, the branch not exit is skipped.
+    '''
+    if branches is None:
+        return np.arange(len(dc_branch_data['keys']))
+    
+    index = {key: row for row, key in enumerate(dc_branch_data['keys'])}
+    rows = []
+    for branch in branches:
+        if branch not in index:
+            print('Branch {} is not exit when calculating DC sensitivity'.format(branch))
+            continue
+        rows.append(index[branch])
+    return np.array(rows, dtype=int)
+
+def create_sensitivity_matrix(shape, file=None):
+    '''
+    Create a sensitivity matrix in memory, or as a memory-mapped .npy file.
+    Args:
+        (1) shape, tuple, matrix shape.
+        (2) file, str, .npy file name, in memory if None.
+    Rets:
+        matrix, array or memmap, zero matrix.
+    '''
+    if file is None:
+        return np.zeros(shape)
+    return np.lib.format.open_memmap(file, mode='w+', dtype=float, shape=shape)
+
+def solve_dc_branch_transfer(dc_branch_data, rows, weight):
+    '''
+    Solve node voltage angles of unit transfers over branches, the injection is +weight at I side and -weight at J side.
+    Args:
+        (1) dc_branch_data, dict, lines and two winding transformers got by network.get_dc_branch_data.
+        (2) rows, array, rows of branches.
+        (3) weight, array, transfer of each branch.
+    Rets:
+        Ua, array, node voltage phase angle in rad in shape of (bus number, branch number).
+    '''
+    n = dc_branch_data['bus_num']
+    columns = np.arange(len(rows))
+    P = np.zeros((n, len(rows)))
+    np.add.at(P, (dc_branch_data['i'][rows], columns), weight)
+    np.add.at(P, (dc_branch_data['j'][rows], columns), - weight)
+    Ua = solve_dc_angle(P)
+    return Ua
+
+def calculate_ptdf(branches=None, file=None):
+    '''
+    Calculate the power transfer distribution factor, the active power change of a branch for unit injection at a bus 
+    withdrawn at swing bus. B' is symmetric, so a row of a branch is solved with its own right hand side.
+    Args:
+        (1) branches, list, monitored line or two winding transformer keys, all branches if None.
+        (2) file, str, .npy file name to store the matrix as memmap, in memory if None.
+    Rets:
+        (1) ptdf, array or memmap, PTDF in shape of (branch number, bus number), columns in the order of get_all_devices('BUS').
+        (2) branches, list, monitored branch keys in the order of rows.
+    '''
+    dc_branch_data = get_dc_sensitivity_branch_data()
+    rows = get_dc_branch_rows(dc_branch_data, branches)
+    bus_index = apis_system.get_device_internal_bus_index('BUS')
+    
+    ptdf = create_sensitivity_matrix((len(rows), len(bus_index)), file)
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start : start + CHUNK_SIZE]
+        Ua = solve_dc_branch_transfer(dc_branch_data, chunk, dc_branch_data['b'][chunk])
+        ptdf[start : start + len(chunk)] = Ua[bus_index].T
+        
+    if file is not None:
+        ptdf.flush()
+    branches = [dc_branch_data['keys'][row] for row in rows]
+    return ptdf, branches
+
+def calculate_lodf(branches=None, outages=None, file=None):
+    '''
+    Calculate the line outage distribution factor, the active power change of a monitored branch for unit pre-outage flow
+    of an outage branch. The factor of an outage branch to itself is -1, and it is nan if the outage splits the network.
+    Args:
+        (1) branches, list, monitored line or two winding transformer keys, all branches if None.
+        (2) outages, list, outage line or two winding transformer keys, all branches if None.
+        (3) file, str, .npy file name to store the matrix as memmap, in memory if None.
+    Rets:
+        (1) lodf, array or memmap, LODF in shape of (branch number, outage number).
+        (2) branches, list, monitored branch keys in the order of rows.
+        (3) outages, list, outage branch keys in the order of columns.
+    '''
+    dc_branch_data = get_dc_sensitivity_branch_data()
+    rows = get_dc_branch_rows(dc_branch_data, branches)
+    columns = get_dc_branch_rows(dc_branch_data, outages)
+    i, j, b = dc_branch_data['i'], dc_branch_data['j'], dc_branch_data['b']
+    
+    lodf = create_sensitivity_matrix((len(rows), len(columns)), file)
+    for start in range(0, len(columns), CHUNK_SIZE):
+        chunk = columns[start : start + CHUNK_SIZE]
+        Ua = solve_dc_branch_transfer(dc_branch_data, chunk, np.ones(len(chunk)))  # Unit transfer over outage branches
+        flow = b[rows][:, np.newaxis] * (Ua[i[rows]] - Ua[j[rows]])
+        self_flow = b[chunk] * (Ua[i[chunk], np.arange(len(chunk))] - Ua[j[chunk], np.arange(len(chunk))])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = flow / (1.0 - self_flow)
+        factor[:, np.abs(1.0 - self_flow) < 1e-8] = np.nan  # Islanding outage
+        factor[rows[:, np.newaxis] == chunk[np.newaxis, :]] = -1.0
+        lodf[:, start : start + len(chunk)] = factor
+        
+    if file is not None:
+        lodf.flush()
+    branches = [dc_branch_data['keys'][row] for row in rows]
+    outages = [dc_branch_data['keys'][column] for column in columns]
+    return lodf, branches, outages
@@ -0,0 +1,64 @@
+# Regression checks of batch power flow
+import os
+import sys
+import io
+import contextlib
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from PSATool import PSAT
+
+LOAD_SCALES = (1.0, 1.1, 1.3)  # Load of each scenario in times of base load
+
+
+def solve_scenarios_one_by_one(simulator):
+    '''
+    Solve IEEE9 power flow of each load scenario alone, the loads are set back after solution.
+    Rets: injections, VM and VA of scenarios in shape of (scenario number, bus number).
+    '''
+    PL = simulator.get_device_data_array('LOAD', 'PL')
+    QL = simulator.get_device_data_array('LOAD', 'QL')
+    injections, VM, VA = [], [], []
+    for scale in LOAD_SCALES:
+        simulator.set_device_data_array('LOAD', 'PL', PL * scale)
+        simulator.set_device_data_array('LOAD', 'QL', QL * scale)
+        injections.append(simulator.get_powerflow_injection())
+        simulator.solve_powerflow('NR', 'flat')
+        VM.append(simulator.get_device_data_array('BUS', 'VM'))
+        VA.append(simulator.get_device_data_array('BUS', 'VA'))
+        
+    simulator.set_device_data_array('LOAD', 'PL', PL)
+    simulator.set_device_data_array('LOAD', 'QL', QL)
+    simulator.solve_powerflow('NR', 'flat')
+    return np.array(injections), np.array(VM), np.array(VA)
+
+def check_batch_with_jacobian_ratio(jacobian_ratio):
+    '''
+    Compare each scenario of batch NR power flow with power flow of the scenario alone.
+    '''
+    simulator = PSAT()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator.load_simulation_data(os.path.join(ROOT, 'data', 'IEEE9-2阶.raw'), 'powerflow', use_cache=False)
+        simulator.solve_powerflow('NR')
+        injections, VM, VA = solve_scenarios_one_by_one(simulator)
+        simulator.set_simulator_parameter('powerflow', 'jacobian_ratio', jacobian_ratio)
+        result = simulator.solve_powerflow_batch(injections, 'NR', 'flat')
+        
+    assert result['converged'].all()
+    assert np.allclose(result['VM'], VM, atol=1e-5)
+    assert np.allclose(result['VA'], VA, atol=1e-3)
+
+def test_batch_with_shared_jacobian_matches_single_powerflow():
+    '''
+    All scenarios are corrected with the Jacobian matrix at start voltage.
+    '''
+    check_batch_with_jacobian_ratio(1e9)
+
+def test_batch_with_own_jacobian_matches_single_powerflow():
+    '''
+    All scenarios fall back to their own Jacobian matrix from the second iteration.
+    '''
+    check_batch_with_jacobian_ratio(1e-9)
@@ -0,0 +1,28 @@
+# Regression checks of N-1 contingency analysis
+import os
+import sys
+import io
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import apis
+from PSATool import PSAT
+from powerflow.contingency import get_contingency_base_data, solve_contingency
+
+
+def test_parallel_circuit_outage_is_solved_in_hvdc_linked_islands():
+    '''
+    example_grid is two AC islands joined by HVDC, an outage of one of two parallel circuits does not split it further.
+    '''
+    simulator = PSAT()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator.load_simulation_data(os.path.join(ROOT, 'data', 'example_grid.raw'), 'powerflow', use_cache=False)
+        simulator.solve_powerflow('NR')
+        with simulator.case:
+            base = get_contingency_base_data()
+            lines = list(apis.get_all_devices('LINE'))
+            status, rows = solve_contingency(base, 'LINE', lines.index((5, 6, '2')), (5, 6, '2'))
+    assert base['island_num'] == 2
+    assert status == 'SOLVED'
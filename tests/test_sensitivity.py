@@ -0,0 +1,79 @@
+# Regression checks of DC power flow sensitivity
+import os
+import sys
+import io
+import contextlib
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from apis import apis_system
+from PSATool import PSAT
+from powerflow.sensitivity import get_dc_sensitivity_branch_data, solve_dc_angle, calculate_ptdf, calculate_lodf
+
+
+def load_ieee9():
+    '''
+    Load IEEE9 and solve its power flow, B' matrix is built by the power flow.
+    '''
+    simulator = PSAT()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator.load_simulation_data(os.path.join(ROOT, 'data', 'IEEE9-2阶.raw'), 'powerflow', use_cache=False)
+        simulator.solve_powerflow('NR')
+    return simulator
+
+def calculate_dc_branch_flow(dc_branch_data, Ua):
+    '''
+    DC active power flow of all branches from I side to J side.
+    '''
+    return dc_branch_data['b'] * (Ua[dc_branch_data['i']] - Ua[dc_branch_data['j']])
+
+def test_ptdf_is_flow_change_of_unit_bus_injection():
+    '''
+    A PTDF column is the branch flow change of a unit injection at the bus, solved by DC power flow.
+    '''
+    simulator = load_ieee9()
+    with simulator.case:
+        ptdf, branches = calculate_ptdf()
+        dc_branch_data = get_dc_sensitivity_branch_data()
+        bus_index = apis_system.get_device_internal_bus_index('BUS')
+        P = np.linspace(-1.0, 1.0, len(bus_index))  # Any base injection, DC flow is linear
+        flow = calculate_dc_branch_flow(dc_branch_data, solve_dc_angle(P))
+        for column, i in enumerate(bus_index):
+            dP = np.zeros(len(bus_index))
+            dP[i] = 1e-3
+            flow_delta = calculate_dc_branch_flow(dc_branch_data, solve_dc_angle(P + dP))
+            assert np.allclose((flow_delta - flow) / 1e-3, ptdf[:, column], atol=1e-8)
+    assert branches == dc_branch_data['keys']
+
+def test_lodf_is_flow_change_of_branch_outage():
+    '''
+    An LODF column times the pre-outage flow of the outage branch is the flow change of DC re-solve without the branch.
+    '''
+    simulator = load_ieee9()
+    outage = (5, 7, '1')
+    with simulator.case:
+        lodf, branches, outages = calculate_lodf(outages=[outage])
+        dc_branch_data = get_dc_sensitivity_branch_data()
+        B1 = apis_system.get_system_Y_network_matrix('B1').toarray()
+        n = apis_system.get_system_bus_number('PQ') + apis_system.get_system_bus_number('PV')
+        
+    row = branches.index(outage)
+    i, j, b = dc_branch_data['i'][row], dc_branch_data['j'][row], dc_branch_data['b'][row]
+    B1_outage = B1.copy()  # Remove the branch from B'
+    B1_outage[[i, j], [i, j]] += b
+    B1_outage[[i, j], [j, i]] -= b
+    
+    P = np.linspace(-1.0, 1.0, B1.shape[0])
+    Ua = np.zeros(len(P))
+    Ua[0 : n] = np.linalg.solve(B1[0 : n, 0 : n], P[0 : n])
+    Ua_outage = np.zeros(len(P))
+    Ua_outage[0 : n] = np.linalg.solve(B1_outage[0 : n, 0 : n], P[0 : n])
+    flow = calculate_dc_branch_flow(dc_branch_data, Ua)
+    flow_outage = calculate_dc_branch_flow(dc_branch_data, Ua_outage)
+    flow_outage[row] = 0.0
+    
+    assert outages == [outage]
+    assert np.allclose(flow_outage - flow, lodf[:, 0] * flow[row], atol=1e-8)